@@ -0,0 +1,70 @@
+"""In-process LRU cache with hit/miss counters"""
+import threading
+from collections import OrderedDict
+from typing import Hashable, List
+
+
+class LRUCache:
+    """Thread-safe mapping that evicts the least recently used entry
+
+    None is not a cacheable value; get() returns None on a miss.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable):
+        """Cached value, counting the lookup as a hit or miss"""
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, key: Hashable):
+        """Cached value without touching recency or counters"""
+        with self._lock:
+            return self._items.get(key)
+
+    def put(self, key: Hashable, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, key: Hashable):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def keys(self) -> List[Hashable]:
+        with self._lock:
+            return list(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def stats(self) -> dict:
+        """Counters since creation: hits, misses, evictions, size, hit_rate"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._items),
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -1,5 +1,7 @@
 """Database connection and initialization"""
+import os
 import sqlite3
+import threading
 from pathlib import Path
 
 # Import config
@@ -7,87 +9,252 @@ import sys
 sys.path.insert(0, str(Path.home() / ".deep-reading"))
 from config import DB_PATH
 
+# Applied to every connection. WAL lets readers (the player) run alongside
+# a writer (the worker); busy_timeout waits out the writer instead of
+# failing with "database is locked".
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -16000",  # KiB, i.e. 16 MB
+    "PRAGMA mmap_size = 268435456",  # 256 MB
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000",  # ms
+    "PRAGMA recursive_triggers = ON",  # REPLACE fires delete triggers (FTS sync)
+)
+
+_local = threading.local()
+
 def get_connection() -> sqlite3.Connection:
-    """Get database connection with row factory"""
+    """Get a new database connection with row factory; the caller closes it"""
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
     conn = sqlite3.connect(str(DB_PATH))
     conn.row_factory = sqlite3.Row
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
     return conn
 
-def init_db():
-    """Initialize database schema"""
-    conn = get_connection()
+def connection() -> sqlite3.Connection:
+    """Long-lived connection for the current thread; do not close it
+
+    Reused for the life of the process, so short lookups skip the cost of
+    opening the file and re-applying pragmas. A forked child gets its own.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.pid != os.getpid():
+        conn = get_connection()
+        _local.conn = conn
+        _local.pid = os.getpid()
+    return conn
+
+def close_connection():
+    """Close the current thread's long-lived connection, if any"""
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.pid == os.getpid():
+        conn.close()
+    _local.conn = None
+
+def ensure_column(conn: sqlite3.Connection, table: str, column: str, decl: str):
+    """Add a column to a table created by an older schema"""
+    columns = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if column not in columns:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+# Schema of migration 1, as created before versioning
+BASE_SCHEMA = """
+    -- Content sources
+    CREATE TABLE IF NOT EXISTS sources (
+        id TEXT PRIMARY KEY,
+        type TEXT NOT NULL,
+        url TEXT,
+        title TEXT,
+        author TEXT,
+        duration INTEGER,
+        cache_path TEXT,
+        processing_state TEXT DEFAULT 'pending',
+        fingerprint TEXT,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- Chapters (semantic segments)
+    CREATE TABLE IF NOT EXISTS chapters (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        source_id TEXT NOT NULL,
+        start_time INTEGER NOT NULL,
+        end_time INTEGER NOT NULL,
+        title TEXT,
+        type TEXT DEFAULT 'core',
+        FOREIGN KEY (source_id) REFERENCES sources(id)
+    );
+
+    -- User marks during playback
+    CREATE TABLE IF NOT EXISTS marks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        source_id TEXT NOT NULL,
+        timestamp INTEGER NOT NULL,
+        type TEXT NOT NULL,
+        content TEXT,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (source_id) REFERENCES sources(id)
+    );
+
+    -- Generated notes
+    CREATE TABLE IF NOT EXISTS notes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        source_id TEXT,
+        type TEXT NOT NULL,
+        title TEXT NOT NULL,
+        content TEXT,
+        obsidian_path TEXT,
+        status TEXT DEFAULT 'draft',
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (source_id) REFERENCES sources(id)
+    );
+
+    -- Note links
+    CREATE TABLE IF NOT EXISTS links (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        from_note_id INTEGER NOT NULL,
+        to_note_id INTEGER NOT NULL,
+        type TEXT DEFAULT 'auto',
+        status TEXT DEFAULT 'pending',
+        FOREIGN KEY (from_note_id) REFERENCES notes(id),
+        FOREIGN KEY (to_note_id) REFERENCES notes(id)
+    );
+
+    -- Content hashes of local files, reused while size and mtime match
+    CREATE TABLE IF NOT EXISTS file_fingerprints (
+        path TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        digest TEXT NOT NULL,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- Searchable text: transcript cue groups and PDF pages
+    CREATE TABLE IF NOT EXISTS content_chunks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        source_id TEXT NOT NULL,
+        locator REAL,
+        text TEXT NOT NULL,
+        FOREIGN KEY (source_id) REFERENCES sources(id)
+    );
+
+    -- Full-text search, kept in sync by the triggers below
+    CREATE VIRTUAL TABLE IF NOT EXISTS sources_fts USING fts5(
+        source_id UNINDEXED, title, author
+    );
+    CREATE VIRTUAL TABLE IF NOT EXISTS content_fts USING fts5(
+        text, content='content_chunks', content_rowid='id'
+    );
+    CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+        title, content, content='notes', content_rowid='id'
+    );
+
+    CREATE TRIGGER IF NOT EXISTS sources_fts_insert AFTER INSERT ON sources BEGIN
+        INSERT INTO sources_fts (source_id, title, author) VALUES (new.id, new.title, new.author);
+    END;
+    CREATE TRIGGER IF NOT EXISTS sources_fts_update AFTER UPDATE OF title, author ON sources BEGIN
+        DELETE FROM sources_fts WHERE source_id = old.id;
+        INSERT INTO sources_fts (source_id, title, author) VALUES (new.id, new.title, new.author);
+    END;
+    CREATE TRIGGER IF NOT EXISTS sources_fts_delete AFTER DELETE ON sources BEGIN
+        DELETE FROM sources_fts WHERE source_id = old.id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS content_fts_insert AFTER INSERT ON content_chunks BEGIN
+        INSERT INTO content_fts (rowid, text) VALUES (new.id, new.text);
+    END;
+    CREATE TRIGGER IF NOT EXISTS content_fts_delete AFTER DELETE ON content_chunks BEGIN
+        INSERT INTO content_fts (content_fts, rowid, text) VALUES ('delete', old.id, old.text);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS notes_fts_insert AFTER INSERT ON notes BEGIN
+        INSERT INTO notes_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+    END;
+    CREATE TRIGGER IF NOT EXISTS notes_fts_update AFTER UPDATE OF title, content ON notes BEGIN
+        INSERT INTO notes_fts (notes_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO notes_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+    END;
+    CREATE TRIGGER IF NOT EXISTS notes_fts_delete AFTER DELETE ON notes BEGIN
+        INSERT INTO notes_fts (notes_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+    END;
+
+    -- Indexes
+    CREATE INDEX IF NOT EXISTS idx_sources_state ON sources(processing_state);
+    CREATE INDEX IF NOT EXISTS idx_chapters_source ON chapters(source_id);
+    CREATE INDEX IF NOT EXISTS idx_marks_source ON marks(source_id);
+    CREATE INDEX IF NOT EXISTS idx_notes_source ON notes(source_id);
+    CREATE INDEX IF NOT EXISTS idx_notes_status ON notes(status);
+    CREATE INDEX IF NOT EXISTS idx_content_chunks_source ON content_chunks(source_id);
+"""
+
+def migrate_base_schema(conn: sqlite3.Connection):
+    """1: tables, full-text search and indexes of unversioned databases"""
+    conn.executescript(BASE_SCHEMA)
+    ensure_column(conn, "sources", "fingerprint", "TEXT")
+
+def migrate_lookup_indexes(conn: sqlite3.Connection):
+    """2: indexes for per-source ordered lookups, recent sources and note links"""
     conn.executescript("""
-        -- Content sources
-        CREATE TABLE IF NOT EXISTS sources (
-            id TEXT PRIMARY KEY,
-            type TEXT NOT NULL,
-            url TEXT,
-            title TEXT,
-            author TEXT,
-            duration INTEGER,
-            cache_path TEXT,
-            processing_state TEXT DEFAULT 'pending',
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
-        );
-
-        -- Chapters (semantic segments)
-        CREATE TABLE IF NOT EXISTS chapters (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            source_id TEXT NOT NULL,
-            start_time INTEGER NOT NULL,
-            end_time INTEGER NOT NULL,
-            title TEXT,
-            type TEXT DEFAULT 'core',
-            FOREIGN KEY (source_id) REFERENCES sources(id)
-        );
-
-        -- User marks during playback
-        CREATE TABLE IF NOT EXISTS marks (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            source_id TEXT NOT NULL,
-            timestamp INTEGER NOT NULL,
-            type TEXT NOT NULL,
-            content TEXT,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (source_id) REFERENCES sources(id)
-        );
-
-        -- Generated notes
-        CREATE TABLE IF NOT EXISTS notes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            source_id TEXT,
-            type TEXT NOT NULL,
-            title TEXT NOT NULL,
-            content TEXT,
-            obsidian_path TEXT,
-            status TEXT DEFAULT 'draft',
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (source_id) REFERENCES sources(id)
-        );
-
-        -- Note links
-        CREATE TABLE IF NOT EXISTS links (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            from_note_id INTEGER NOT NULL,
-            to_note_id INTEGER NOT NULL,
-            type TEXT DEFAULT 'auto',
-            status TEXT DEFAULT 'pending',
-            FOREIGN KEY (from_note_id) REFERENCES notes(id),
-            FOREIGN KEY (to_note_id) REFERENCES notes(id)
-        );
-
-        -- Indexes
-        CREATE INDEX IF NOT EXISTS idx_sources_state ON sources(processing_state);
-        CREATE INDEX IF NOT EXISTS idx_chapters_source ON chapters(source_id);
-        CREATE INDEX IF NOT EXISTS idx_marks_source ON marks(source_id);
-        CREATE INDEX IF NOT EXISTS idx_notes_source ON notes(source_id);
-        CREATE INDEX IF NOT EXISTS idx_notes_status ON notes(status);
+        CREATE INDEX IF NOT EXISTS idx_marks_source_time ON marks(source_id, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_chapters_source_start ON chapters(source_id, start_time);
+        CREATE INDEX IF NOT EXISTS idx_sources_created ON sources(created_at);
+        CREATE INDEX IF NOT EXISTS idx_links_from ON links(from_note_id);
+        CREATE INDEX IF NOT EXISTS idx_links_to ON links(to_note_id);
     """)
-    conn.commit()
+
+def migrate_search_backfill(conn: sqlite3.Connection):
+    """3: index the sources, notes and cached content that predate full-text search
+
+    Step 1 adds the search tables and triggers to an existing database but
+    leaves its rows unindexed, and the notes triggers must not delete
+    rows notes_fts never had.
+    """
+    from search.index import reindex_all  # search.index imports this module
+    reindex_all(conn)
+
+# Applied in order; PRAGMA user_version records how many have run. Append
+# new steps, never edit old ones, and keep each idempotent so a step
+# interrupted part way can simply run again.
+MIGRATIONS = [
+    migrate_base_schema,
+    migrate_lookup_indexes,
+    migrate_search_backfill,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+_migrated = set()
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    """Number of migrations applied to a database"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Apply pending migrations; returns the resulting schema version"""
+    version = schema_version(conn)
+    for number in range(version + 1, SCHEMA_VERSION + 1):
+        MIGRATIONS[number - 1](conn)
+        conn.execute(f"PRAGMA user_version = {number}")
+        conn.commit()
+    return max(version, SCHEMA_VERSION)
+
+def init_db():
+    """Bring the database schema up to date
+
+    Checks user_version once per process and skips all DDL when the
+    database is already current.
+    """
+    if str(DB_PATH) in _migrated:
+        return
+    conn = get_connection()
+    if schema_version(conn) < SCHEMA_VERSION:
+        migrate(conn)
     conn.close()
+    _migrated.add(str(DB_PATH))
 
 if __name__ == "__main__":
     init_db()
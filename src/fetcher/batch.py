@@ -0,0 +1,139 @@
+"""Batch fetching with a bounded worker pool"""
+import subprocess
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Tuple
+from urllib.parse import urlparse
+
+PLAYLIST_PATTERNS = [
+    r'youtube\.com/playlist\?',
+    r'youtube\.com/(@[^/?]+|channel/[^/?]+|c/[^/?]+|user/[^/?]+)',
+]
+
+def is_playlist_url(url: str) -> bool:
+    """Check if a URL points at a playlist or channel rather than one video"""
+    if re.search(r'[?&]v=', url) or "youtu.be/" in url:
+        return False
+    return any(re.search(pattern, url) for pattern in PLAYLIST_PATTERNS)
+
+def expand_playlist(url: str) -> List[str]:
+    """List the video URLs of a playlist or channel without resolving each video"""
+    result = subprocess.run(
+        ["yt-dlp", "--flat-playlist", "--print", "url", url],
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise Exception(f"Failed to expand playlist: {result.stderr}")
+
+    return [line.strip() for line in result.stdout.splitlines() if line.strip()]
+
+def read_batch_file(path: str) -> List[str]:
+    """Read URLs/paths from a batch file, one per line, '#' for comments"""
+    urls = []
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                urls.append(line)
+    return urls
+
+def expand_urls(urls: List[str], retries: int = 2, backoff: float = 1.0) -> Tuple[List[str], list]:
+    """Expand playlist/channel URLs into videos, dropping duplicates
+
+    Entries that are playlists themselves, such as the /videos and
+    /shorts tabs a bare channel URL lists, are expanded in turn. Expansion
+    is retried like a fetch. Returns (urls, failures) where failures holds
+    (url, error) pairs for playlists that still failed.
+    """
+    expanded, failures, seen = [], [], set()
+
+    def expand(entries: List[str]):
+        for url in entries:
+            if not is_playlist_url(url):
+                expanded.append(url)
+                continue
+            if url in seen:
+                continue
+            seen.add(url)
+            try:
+                videos = fetch_with_retry(expand_playlist, url, retries, backoff)
+            except Exception as e:
+                failures.append((url, e))
+                continue
+            print(f"Expanded {url}: {len(videos)} entries")
+            expand(videos)
+
+    expand(urls)
+    return list(dict.fromkeys(expanded)), failures
+
+def host_key(url: str) -> str:
+    """Group URLs by host for concurrency limits; local files share one key"""
+    host = urlparse(url).netloc.lower()
+    if not host:
+        return "local"
+    host = host.removeprefix("www.").removeprefix("m.")
+    if host == "youtu.be":
+        return "youtube.com"
+    return host
+
+class HostLimiter:
+    """Per-host semaphores capping concurrent fetches against one site"""
+
+    def __init__(self, per_host: int):
+        self.per_host = per_host
+        self._lock = threading.Lock()
+        self._semaphores = {}
+
+    def slot(self, url: str) -> threading.Semaphore:
+        key = host_key(url)
+        with self._lock:
+            if key not in self._semaphores:
+                self._semaphores[key] = threading.Semaphore(self.per_host)
+            return self._semaphores[key]
+
+def fetch_with_retry(fetch_one: Callable, url: str, retries: int = 2, backoff: float = 1.0):
+    """Call fetch_one(url), retrying failures with exponential backoff"""
+    for attempt in range(retries + 1):
+        try:
+            return fetch_one(url)
+        except Exception as e:
+            if attempt == retries:
+                raise
+            delay = backoff * (2 ** attempt)
+            print(f"Retrying {url} in {delay:.1f}s ({e})")
+            time.sleep(delay)
+
+def fetch_many(
+    urls: List[str],
+    fetch_one: Callable,
+    workers: int = 4,
+    per_host: int = 2,
+    retries: int = 2,
+    backoff: float = 1.0,
+) -> Tuple[list, list, float]:
+    """Fetch many URLs on a bounded pool
+
+    Returns (results, failures, elapsed) where results holds fetch_one's
+    return values in input order and failures holds (url, error) pairs.
+    """
+    limiter = HostLimiter(per_host)
+
+    def run(url: str):
+        with limiter.slot(url):
+            return fetch_with_retry(fetch_one, url, retries, backoff)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [(url, pool.submit(run, url)) for url in urls]
+
+        results, failures = [], []
+        for url, future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                failures.append((url, e))
+
+    return results, failures, time.perf_counter() - start
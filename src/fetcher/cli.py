@@ -7,10 +7,13 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 sys.path.insert(0, str(Path.home() / ".deep-reading"))
 
-from fetcher.youtube import fetch_youtube, extract_video_id
-from fetcher.pdf import fetch_pdf
+from fetcher.youtube import fetch_youtube, extract_video_id, AUDIO_POLICIES, DEFAULT_AUDIO_POLICY
+from fetcher.pdf import fetch_pdf, PDF_ID_MODES, DEFAULT_PDF_ID_MODE, PLACEMENT_STRATEGIES, DEFAULT_PLACEMENT
+from fetcher.batch import is_playlist_url, read_batch_file, expand_urls, fetch_many
+from search.index import index_content
 from db import get_connection, init_db
-from models import SourceType, ProcessingState
+import repository
+from models import Source, SourceType, ProcessingState
 
 def detect_source_type(path_or_url: str) -> str:
     """Detect source type from path or URL"""
@@ -34,72 +37,121 @@ def detect_source_type(path_or_url: str) -> str:
     else:
         return "web"
 
-def fetch(path_or_url: str):
-    """Fetch content from path or URL"""
+def format_timings(timings: dict) -> str:
+    """Format per-stage timings as 'stage 1.2s, ...'"""
+    return ", ".join(f"{name} {seconds:.1f}s" for name, seconds in timings.items())
+
+def source_row(source_type: str, path_or_url: str, result: dict) -> Source:
+    """Build a READY Source from a fetcher result"""
+    if source_type == "pdf":
+        url = result["original_path"]
+        duration = result["metadata"].get("page_count", 0)  # Use page_count as duration placeholder
+    else:
+        url = path_or_url
+        duration = result["metadata"]["duration"]
+
+    return Source(
+        id=result["id"],
+        type=SourceType(source_type),
+        url=url,
+        title=result["metadata"]["title"],
+        author=result["metadata"]["author"],
+        duration=duration,
+        cache_path=result["cache_dir"],
+        processing_state=ProcessingState.READY,
+        fingerprint=result.get("fingerprint"),
+    )
+
+def save_sources(rows: list):
+    """Write Sources in a single transaction
+
+    Sources whose fingerprint is unchanged are left alone, keeping their
+    created_at and processing state; changed ones are updated in place
+    and their content re-indexed for search.
+    """
+    conn = get_connection()
+    with conn:
+        for source in repository.sources.upsert_many(conn, rows):
+            index_content(conn, source.id, source.type.value, source.cache_path)
+    conn.close()
+
+def add_youtube_arguments(parser: argparse.ArgumentParser):
+    """Add the options forwarded to fetch_youtube"""
+    parser.add_argument("--concurrent", action="store_true",
+                        help="Fetch metadata, audio and transcript at the same time")
+    parser.add_argument("--single-pass", action="store_true",
+                        help="Resolve the video once and reuse its info-JSON")
+    parser.add_argument("--audio", choices=sorted(AUDIO_POLICIES), default=DEFAULT_AUDIO_POLICY,
+                        help="Audio policy: keep the native stream, speech-tuned opus, or mp3")
+
+def youtube_options(args: argparse.Namespace) -> dict:
+    """Collect fetch_youtube keyword arguments from parsed CLI args"""
+    return {
+        "concurrent": args.concurrent,
+        "single_pass": args.single_pass,
+        "audio_policy": args.audio,
+    }
+
+def add_pdf_arguments(parser: argparse.ArgumentParser):
+    """Add the options forwarded to fetch_pdf"""
+    parser.add_argument("--pdf-workers", type=int, default=1,
+                        help="Processes for PDF text extraction (0 = all CPUs)")
+    parser.add_argument("--pdf-id", choices=PDF_ID_MODES, default=DEFAULT_PDF_ID_MODE,
+                        help="Identify PDFs by path or by content hash (survives moves)")
+    parser.add_argument("--pdf-cache", choices=PLACEMENT_STRATEGIES, default=DEFAULT_PLACEMENT,
+                        help="Keep PDFs in the cache as a reflink, hardlink, copy or reference")
+
+def pdf_options(args: argparse.Namespace) -> dict:
+    """Collect the PDF keyword arguments of fetch/fetch_batch from parsed CLI args"""
+    return {
+        "pdf_workers": args.pdf_workers,
+        "pdf_id_mode": args.pdf_id,
+        "pdf_placement": args.pdf_cache,
+    }
+
+def fetch(
+    path_or_url: str,
+    pdf_workers: int = 1,
+    pdf_id_mode: str = DEFAULT_PDF_ID_MODE,
+    pdf_placement: str = DEFAULT_PLACEMENT,
+    **youtube_options,
+):
+    """Fetch content from path or URL
+
+    pdf_workers is the PDF text extraction process count, pdf_id_mode the
+    PDF identity scheme and pdf_placement how the file is cached;
+    youtube_options are passed to fetch_youtube.
+    """
     init_db()
 
+    if Path(path_or_url).is_dir():
+        fetch_library(path_or_url, placement=pdf_placement)
+        return
+
     source_type = detect_source_type(path_or_url)
     print(f"Detected source type: {source_type}")
 
     if source_type == "youtube":
-        result = fetch_youtube(path_or_url)
+        result = fetch_youtube(path_or_url, **youtube_options)
 
         # Save to database
-        conn = get_connection()
-        conn.execute("""
-            INSERT OR REPLACE INTO sources
-            (id, type, url, title, author, duration, cache_path, processing_state)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            result["id"],
-            source_type,
-            path_or_url,
-            result["metadata"]["title"],
-            result["metadata"]["author"],
-            result["metadata"]["duration"],
-            result["cache_dir"],
-            "ready"
-        ))
-        conn.commit()
-        conn.close()
+        save_sources([source_row(source_type, path_or_url, result)])
 
         print(f"\n✓ Downloaded: {result['metadata']['title']}")
         print(f"  ID: {result['id']}")
         print(f"  Duration: {result['metadata']['duration']}s")
         print(f"  Cache: {result['cache_dir']}")
+        if result.get("timings"):
+            print(f"  Timings: {format_timings(result['timings'])}")
         print(f"\nTo process: python3 -m processor.cli {result['id']}")
 
     elif source_type == "pdf":
-        # Handle directory containing PDF
-        p = Path(path_or_url)
-        if p.is_dir():
-            pdf_files = list(p.glob("*.pdf"))
-            if pdf_files:
-                path_or_url = str(pdf_files[0])
-            else:
-                print("No PDF files found in directory")
-                sys.exit(1)
-
-        result = fetch_pdf(path_or_url)
+        result = fetch_pdf(
+            path_or_url, workers=pdf_workers, id_mode=pdf_id_mode, placement=pdf_placement
+        )
 
         # Save to database
-        conn = get_connection()
-        conn.execute("""
-            INSERT OR REPLACE INTO sources
-            (id, type, url, title, author, duration, cache_path, processing_state)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            result["id"],
-            source_type,
-            result["original_path"],
-            result["metadata"]["title"],
-            result["metadata"]["author"],
-            result["metadata"].get("page_count", 0),  # Use page_count as duration placeholder
-            result["cache_dir"],
-            "ready"
-        ))
-        conn.commit()
-        conn.close()
+        save_sources([source_row(source_type, path_or_url, result)])
 
         print(f"\n✓ Processed: {result['metadata']['title']}")
         print(f"  ID: {result['id']}")
@@ -112,12 +164,122 @@ def fetch(path_or_url: str):
         print(f"Source type '{source_type}' not yet implemented")
         sys.exit(1)
 
+def fetch_library(root: str, workers: int = 0, placement: str = DEFAULT_PLACEMENT):
+    """Ingest every PDF under a library folder tree"""
+    from fetcher.library import ingest_library
+
+    stats = ingest_library(root, workers=workers, placement=placement)
+    if not stats["found"]:
+        print("No PDF files found in directory")
+        sys.exit(1)
+    if stats["failed"]:
+        sys.exit(1)
+
+def fetch_batch(
+    urls: list,
+    workers: int = 4,
+    per_host: int = 2,
+    retries: int = 2,
+    pdf_workers: int = 1,
+    pdf_id_mode: str = DEFAULT_PDF_ID_MODE,
+    pdf_placement: str = DEFAULT_PLACEMENT,
+    sync: bool = False,
+    **youtube_options,
+):
+    """Fetch many URLs/paths on a worker pool and save them in one transaction
+
+    With sync=True, sources whose fingerprint matches the stored one are
+    skipped without any network or extraction work.
+    """
+    init_db()
+
+    urls, expand_failures = expand_urls(urls, retries=retries)
+    refresh = set()
+    if sync:
+        from fetcher.sync import plan_sync
+        urls, unchanged, refresh = plan_sync(urls, pdf_id_mode)
+        print(f"{len(unchanged)} sources up to date")
+    print(f"Fetching {len(urls)} sources with {workers} workers")
+
+    def fetch_one(path_or_url: str) -> Source:
+        source_type = detect_source_type(path_or_url)
+        if source_type == "youtube":
+            result = fetch_youtube(path_or_url, **youtube_options)
+        elif source_type == "pdf":
+            result = fetch_pdf(
+                path_or_url,
+                workers=pdf_workers,
+                id_mode=pdf_id_mode,
+                placement=pdf_placement,
+                refresh=path_or_url in refresh,
+            )
+        else:
+            raise Exception(f"Source type '{source_type}' not yet implemented")
+        return source_row(source_type, path_or_url, result)
+
+    rows, failures, elapsed = fetch_many(
+        urls, fetch_one, workers=workers, per_host=per_host, retries=retries
+    )
+    failures = expand_failures + failures
+
+    if rows:
+        save_sources(rows)
+
+    print(f"\n✓ Fetched {len(rows)}/{len(urls)} sources in {elapsed:.1f}s")
+    if failures:
+        print(f"✗ {len(failures)} failed:")
+        for url, error in failures:
+            print(f"  {url}: {error}")
+
+    return rows, failures
+
 def main():
     parser = argparse.ArgumentParser(description="Fetch content")
-    parser.add_argument("url", help="URL to fetch")
+    parser.add_argument("url", nargs="?", help="URL to fetch")
+    parser.add_argument("--batch", metavar="FILE", help="Fetch every URL/path listed in FILE")
+    parser.add_argument("--workers", type=int, default=4, help="Batch/library worker pool size")
+    parser.add_argument("--per-host", type=int, default=2, help="Max concurrent fetches per host")
+    parser.add_argument("--retries", type=int, default=2, help="Retries per source in batch mode")
+    parser.add_argument("--enqueue", action="store_true",
+                        help="Queue sources for 'dr worker' instead of fetching now")
+    parser.add_argument("--sync", action="store_true",
+                        help="Only fetch sources that are new or changed since the last fetch")
+    add_pdf_arguments(parser)
+    add_youtube_arguments(parser)
     args = parser.parse_args()
 
-    fetch(args.url)
+    if not args.url and not args.batch:
+        parser.error("a URL or --batch FILE is required")
+
+    urls = read_batch_file(args.batch) if args.batch else []
+    if args.url:
+        urls.append(args.url)
+
+    if args.enqueue:
+        from fetcher.worker import enqueue
+        source_ids, failures = enqueue(urls, pdf_id_mode=args.pdf_id)
+        print(f"Queued {len(source_ids)} sources. Run 'dr worker' to fetch them.")
+        if failures:
+            print(f"✗ {len(failures)} not queued:")
+            for url, error in failures:
+                print(f"  {url}: {error}")
+            sys.exit(1)
+    elif args.batch or args.sync or is_playlist_url(args.url):
+        _, failures = fetch_batch(
+            urls,
+            workers=args.workers,
+            per_host=args.per_host,
+            retries=args.retries,
+            sync=args.sync,
+            **pdf_options(args),
+            **youtube_options(args),
+        )
+        if failures:
+            sys.exit(1)
+    elif Path(args.url).is_dir():
+        fetch_library(args.url, workers=args.workers, placement=args.pdf_cache)
+    else:
+        fetch(args.url, **pdf_options(args), **youtube_options(args))
 
 if __name__ == "__main__":
     main()
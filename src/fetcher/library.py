@@ -0,0 +1,118 @@
+"""Bulk PDF ingest from a library folder tree (e.g. Zotero storage)"""
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import List
+
+from fetcher.cli import source_row, save_sources
+from fetcher.pdf import fetch_pdf, generate_pdf_id, DEFAULT_PLACEMENT
+from db import init_db
+from models import Source, SourceType
+import repository
+
+# sources rows written per transaction
+LIBRARY_BATCH_SIZE = 50
+
+
+def find_pdfs(root: Path) -> List[Path]:
+    """All PDFs under root, recursively, skipping hidden directories"""
+    pdfs = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for name in sorted(filenames):
+            if name.lower().endswith(".pdf"):
+                pdfs.append(Path(dirpath) / name)
+    return pdfs
+
+
+def cached_pdf_ids() -> set:
+    """IDs of PDF sources that are already fetched"""
+    return {source_id.removeprefix("pdf_") for source_id in repository.fetched_ids(SourceType.PDF)}
+
+
+def ingest_one(pdf_path: str, pdf_id: str, placement: str) -> Source:
+    """Fetch one PDF in a pool process and return its Source"""
+    with redirect_stdout(io.StringIO()):
+        result = fetch_pdf(pdf_path, id_mode="content", pdf_id=pdf_id, placement=placement)
+    return source_row("pdf", pdf_path, result)
+
+
+def ingest_library(
+    root: str,
+    workers: int = 0,
+    batch_size: int = LIBRARY_BATCH_SIZE,
+    placement: str = DEFAULT_PLACEMENT,
+) -> dict:
+    """Fetch every PDF under root that is not cached yet
+
+    PDFs are identified by content hash, so files already fetched from any
+    location, and duplicate copies inside the tree, are skipped. The rest
+    are extracted on a process pool (workers=0 uses every CPU) and their
+    sources rows committed batch_size at a time.
+    """
+    init_db()
+    start = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+
+    pdfs = find_pdfs(Path(root))
+    print(f"Found {len(pdfs)} PDFs under {root}")
+
+    # Hashing is I/O bound; unchanged files hit the fingerprint cache
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pdf_ids = list(pool.map(lambda p: generate_pdf_id(p, "content"), pdfs))
+
+    cached = cached_pdf_ids()
+    todo = {}
+    for pdf_path, pdf_id in zip(pdfs, pdf_ids):
+        if pdf_id not in cached and pdf_id not in todo:
+            todo[pdf_id] = pdf_path
+
+    stats = {
+        "found": len(pdfs),
+        "skipped": len(pdfs) - len(todo),
+        "ingested": 0,
+        "pages": 0,
+        "failed": [],
+    }
+    print(f"Skipping {stats['skipped']} cached or duplicate PDFs, ingesting {len(todo)}")
+
+    rows = []
+
+    def flush():
+        save_sources(rows)
+        stats["ingested"] += len(rows)
+        stats["pages"] += sum(source.duration or 0 for source in rows)
+        rows.clear()
+        elapsed = time.perf_counter() - start
+        print(f"[{stats['ingested'] + len(stats['failed'])}/{len(todo)}] "
+              f"{stats['ingested'] / elapsed:.1f} PDFs/s")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(ingest_one, str(pdf_path), pdf_id, placement): pdf_path
+            for pdf_id, pdf_path in todo.items()
+        }
+        for future in as_completed(futures):
+            try:
+                rows.append(future.result())
+            except Exception as e:
+                stats["failed"].append((futures[future], e))
+            if len(rows) >= batch_size:
+                flush()
+
+    if rows:
+        flush()
+
+    stats["elapsed"] = time.perf_counter() - start
+    elapsed = stats["elapsed"] or 1e-9
+    print(f"\n✓ Ingested {stats['ingested']} PDFs ({stats['pages']} pages) in {stats['elapsed']:.1f}s"
+          f" - {stats['ingested'] / elapsed:.1f} PDFs/s, {stats['pages'] / elapsed:.0f} pages/s")
+    if stats["failed"]:
+        print(f"✗ {len(stats['failed'])} failed:")
+        for pdf_path, error in stats["failed"]:
+            print(f"  {pdf_path}: {error}")
+
+    return stats
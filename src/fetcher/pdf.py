@@ -2,17 +2,96 @@
 import subprocess
 import json
 import hashlib
+import os
 import shutil
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Iterable, List, Optional, Tuple
 import sys
 
 sys.path.insert(0, str(Path.home() / ".deep-reading"))
 from config import CACHE_DIR
+from page_index import PageIndex, page_index_path, load_page_index
 
+# Below this many pages, process pool startup costs more than it saves
+PARALLEL_MIN_PAGES = 64
+# Page ranges handed out per worker, so uneven pages balance out
+CHUNKS_PER_WORKER = 4
 
-def generate_pdf_id(pdf_path: Path) -> str:
-    """Generate a unique ID for a PDF based on path hash"""
+# "path" keys the cache on where the file lives, "content" on its bytes
+PDF_ID_MODES = ("path", "content")
+DEFAULT_PDF_ID_MODE = "path"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# How source.pdf lands in the cache; "auto" tries reflink, hardlink, then copy
+PLACEMENT_STRATEGIES = ("auto", "reflink", "hardlink", "copy", "reference")
+DEFAULT_PLACEMENT = "auto"
+PLACEMENT_FILE = "source.json"
+# Fingerprint of the PDF the cached files were derived from
+FINGERPRINT_FILE = "fingerprint"
+FICLONE = 0x40049409  # Linux ioctl: share extents with another file
+
+
+def hash_file(pdf_path: Path) -> str:
+    """SHA-256 of a file, read in fixed-size chunks"""
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def content_digest(pdf_path: Path) -> str:
+    """Content hash of a file, reusing the stored one while size and mtime match"""
+    import sqlite3
+    from db import connection
+
+    pdf_path = Path(pdf_path).resolve()
+    stat = pdf_path.stat()
+
+    conn = connection()
+    try:
+        row = conn.execute(
+            "SELECT size, mtime_ns, digest FROM file_fingerprints WHERE path = ?",
+            (str(pdf_path),),
+        ).fetchone()
+    except sqlite3.OperationalError:
+        # Database not initialized yet; hash without caching
+        return hash_file(pdf_path)
+
+    if row and row["size"] == stat.st_size and row["mtime_ns"] == stat.st_mtime_ns:
+        return row["digest"]
+
+    digest = hash_file(pdf_path)
+    with conn:
+        conn.execute("""
+            INSERT OR REPLACE INTO file_fingerprints (path, size, mtime_ns, digest)
+            VALUES (?, ?, ?, ?)
+        """, (str(pdf_path), stat.st_size, stat.st_mtime_ns, digest))
+    return digest
+
+
+def pdf_fingerprint(pdf_path: Path, cached: bool = True) -> str:
+    """Inputs of the PDF stages: the file's content hash
+
+    With cached=True the size+mtime pre-check in file_fingerprints avoids
+    re-reading unchanged files, so touching a file alone costs nothing.
+    """
+    digest = content_digest(pdf_path) if cached else hash_file(pdf_path)
+    return f"sha256:{digest}"
+
+
+def generate_pdf_id(pdf_path: Path, mode: str = DEFAULT_PDF_ID_MODE) -> str:
+    """Generate a unique ID for a PDF from its path or its content hash
+
+    Content IDs follow the file when it moves or is copied, and change when
+    its bytes change, so stale extractions are never reused.
+    """
+    if mode == "content":
+        return content_digest(pdf_path)[:12]
+    if mode != "path":
+        raise ValueError(f"Unknown PDF ID mode: {mode}")
     path_str = str(pdf_path.resolve())
     hash_digest = hashlib.md5(path_str.encode()).hexdigest()[:12]
     return hash_digest
@@ -25,59 +104,196 @@ def get_cache_dir(pdf_id: str) -> Path:
     return cache_dir
 
 
-def extract_text_with_pymupdf(pdf_path: Path, txt_path: Path) -> str:
-    """Extract text using PyMuPDF (fitz)"""
+def import_fitz():
+    """Import PyMuPDF, with an install hint if it is missing"""
     try:
         import fitz  # PyMuPDF
     except ImportError:
         raise ImportError("PyMuPDF not installed. Run: pip install PyMuPDF")
-
-    doc = fitz.open(str(pdf_path))
-    text_parts = []
-
-    for page_num in range(len(doc)):
-        page = doc[page_num]
-        text = page.get_text()
-        if text.strip():
-            text_parts.append(f"--- Page {page_num + 1} ---\n{text}")
-
-    doc.close()
-
-    full_text = "\n\n".join(text_parts)
-    with open(txt_path, "w", encoding="utf-8") as f:
-        f.write(full_text)
-
-    return full_text
+    return fitz
+
+
+def write_pages(pages: Iterable[Tuple[int, str]], txt_path: Path) -> dict:
+    """Stream (page_num, text) pairs to txt_path as they arrive
+
+    Pages are separated by blank lines with a "--- Page N ---" marker;
+    blank pages are skipped. Only one page is held in memory at a time.
+    The byte range of every page is saved alongside as a PageIndex.
+    """
+    stats = {"path": Path(txt_path), "page_count": 0, "text_pages": 0, "chars": 0}
+    index = PageIndex(txt_path, array("I"), array("Q"), array("Q"))
+    pos = 0
+
+    with open(txt_path, "wb") as f:
+        for page_num, text in pages:
+            stats["page_count"] += 1
+            if not text.strip():
+                continue
+            if stats["text_pages"]:
+                pos += f.write(b"\n\n")
+                stats["chars"] += 2
+            part = f"--- Page {page_num + 1} ---\n{text}"
+            index.pages.append(page_num + 1)
+            index.starts.append(pos)
+            pos += f.write(part.encode("utf-8"))
+            index.ends.append(pos)
+            stats["text_pages"] += 1
+            stats["chars"] += len(part)
+
+    index.save(page_index_path(txt_path))
+    return stats
+
+
+def extract_text_with_pymupdf(pdf_path: Path, txt_path: Path) -> dict:
+    """Extract text using PyMuPDF (fitz), streaming pages to txt_path
+
+    Returns write_pages stats rather than the text itself.
+    """
+    with PdfIngestSession(pdf_path) as session:
+        return session.extract_text(txt_path)
+
+
+def extract_page_range(pdf_path: str, start: int, stop: int) -> List[Tuple[int, str]]:
+    """Process pool worker: open the document and extract pages start..stop-1"""
+    fitz = import_fitz()
+
+    doc = fitz.open(pdf_path)
+    try:
+        return [(page_num, doc[page_num].get_text()) for page_num in range(start, stop)]
+    finally:
+        doc.close()
+
+
+def page_ranges(page_count: int, workers: int) -> List[Tuple[int, int]]:
+    """Split pages into contiguous (start, stop) ranges for the pool"""
+    chunk = max(1, -(-page_count // (workers * CHUNKS_PER_WORKER)))
+    return [(start, min(start + chunk, page_count)) for start in range(0, page_count, chunk)]
+
+
+def extract_text_parallel(
+    pdf_path: Path,
+    txt_path: Path,
+    workers: Optional[int] = None,
+    min_pages: int = PARALLEL_MIN_PAGES,
+    page_count: Optional[int] = None,
+) -> dict:
+    """Extract text with a process pool, each worker handling a page range
+
+    Falls back to serial extraction for a single worker or fewer than
+    min_pages pages. Output matches extract_text_with_pymupdf. Pass
+    page_count when it is already known to skip opening the document here.
+    """
+    workers = workers or os.cpu_count() or 1
+    if page_count is None:
+        with PdfIngestSession(pdf_path) as session:
+            page_count = session.page_count
+            if workers <= 1 or page_count < min_pages:
+                return session.extract_text(txt_path)
+    elif workers <= 1 or page_count < min_pages:
+        return extract_text_with_pymupdf(pdf_path, txt_path)
+
+    ranges = page_ranges(page_count, workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map() yields results in submission order, so pages stay in order
+        chunks = pool.map(
+            extract_page_range,
+            [str(pdf_path)] * len(ranges),
+            [start for start, _ in ranges],
+            [stop for _, stop in ranges],
+        )
+        return write_pages((page for pages in chunks for page in pages), txt_path)
+
+
+class PdfIngestSession:
+    """One open document shared by every ingest stage
+
+    Metadata, outline, page count and text all come from the same handle,
+    so the file is opened and its cross-reference table parsed only once
+    per fetch. Use as a context manager.
+    """
+
+    def __init__(self, pdf_path: Path):
+        self.pdf_path = Path(pdf_path)
+        self.doc = None
+        self.text_stats: Optional[dict] = None
+
+    def __enter__(self) -> "PdfIngestSession":
+        fitz = import_fitz()
+        self.doc = fitz.open(str(self.pdf_path))
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self.doc is not None:
+            self.doc.close()
+            self.doc = None
+
+    @property
+    def page_count(self) -> int:
+        return len(self.doc)
+
+    def metadata(self) -> dict:
+        """Document info dictionary plus page count"""
+        metadata = self.doc.metadata or {}
+        return {
+            "title": metadata.get("title", ""),
+            "author": metadata.get("author", ""),
+            "subject": metadata.get("subject", ""),
+            "creator": metadata.get("creator", ""),
+            "producer": metadata.get("producer", ""),
+            "page_count": self.page_count,
+        }
+
+    def outline(self) -> list:
+        """Table of contents as [{"level", "title", "page"}, ...]"""
+        return [
+            {"level": level, "title": title, "page": page}
+            for level, title, page, *_ in self.doc.get_toc()
+        ]
+
+    def iter_pages(self):
+        """Yield (page_num, text) for every page"""
+        for page_num in range(self.page_count):
+            yield page_num, self.doc[page_num].get_text()
+
+    def extract_text(self, txt_path: Path, workers: int = 1) -> dict:
+        """Stream text to txt_path; workers > 1 (0 = all CPUs) uses a process pool"""
+        workers = workers or os.cpu_count() or 1
+        if workers > 1 and self.page_count >= PARALLEL_MIN_PAGES:
+            # Pool workers are separate processes and open their own handles
+            self.text_stats = extract_text_parallel(
+                self.pdf_path, txt_path, workers=workers, page_count=self.page_count
+            )
+        else:
+            self.text_stats = write_pages(self.iter_pages(), txt_path)
+        return self.text_stats
+
+    def page_stats(self) -> dict:
+        """Page count and how many pages carry text"""
+        stats = {"page_count": self.page_count}
+        if self.text_stats:
+            stats["text_pages"] = self.text_stats["text_pages"]
+            stats["chars"] = self.text_stats["chars"]
+        return stats
 
 
 def extract_metadata_with_pymupdf(pdf_path: Path) -> dict:
     """Extract metadata using PyMuPDF"""
-    try:
-        import fitz
-    except ImportError:
-        raise ImportError("PyMuPDF not installed. Run: pip install PyMuPDF")
+    with PdfIngestSession(pdf_path) as session:
+        return session.metadata()
 
-    doc = fitz.open(str(pdf_path))
-    metadata = doc.metadata or {}
-    page_count = len(doc)
-    doc.close()
 
-    return {
-        "title": metadata.get("title", ""),
-        "author": metadata.get("author", ""),
-        "subject": metadata.get("subject", ""),
-        "creator": metadata.get("creator", ""),
-        "producer": metadata.get("producer", ""),
-        "page_count": page_count,
-    }
-
-
-def fetch_metadata(pdf_path: Path, pdf_id: str) -> dict:
-    """Fetch PDF metadata"""
+def fetch_metadata(pdf_path: Path, pdf_id: str, session: Optional[PdfIngestSession] = None) -> dict:
+    """Fetch PDF metadata, reusing an open session if given"""
     cache_dir = get_cache_dir(pdf_id)
 
     # Extract metadata
-    pdf_metadata = extract_metadata_with_pymupdf(pdf_path)
+    if session:
+        pdf_metadata = session.metadata()
+    else:
+        pdf_metadata = extract_metadata_with_pymupdf(pdf_path)
 
     # Use filename as title if not in metadata
     title = pdf_metadata.get("title") or pdf_path.stem
@@ -110,35 +326,149 @@ def fetch_metadata(pdf_path: Path, pdf_id: str) -> dict:
     return metadata
 
 
-def fetch_text(pdf_path: Path, pdf_id: str) -> Path:
-    """Extract text from PDF"""
+def fetch_text(
+    pdf_path: Path,
+    pdf_id: str,
+    workers: int = 1,
+    session: Optional[PdfIngestSession] = None,
+) -> Path:
+    """Extract text from PDF, reusing an open session if given
+
+    workers > 1 extracts page ranges in parallel; 0 uses every CPU.
+    """
     cache_dir = get_cache_dir(pdf_id)
     txt_path = cache_dir / "content.txt"
 
     if txt_path.exists():
         print(f"Text already cached: {txt_path}")
+        load_page_index(txt_path)  # Builds the index for caches that predate it
         return txt_path
 
     print("Extracting text from PDF...")
-    extract_text_with_pymupdf(pdf_path, txt_path)
-    print(f"Text extracted: {txt_path}")
+    if session:
+        stats = session.extract_text(txt_path, workers=workers)
+    elif workers == 1:
+        stats = extract_text_with_pymupdf(pdf_path, txt_path)
+    else:
+        stats = extract_text_parallel(pdf_path, txt_path, workers=workers or None)
+    print(f"Text extracted: {txt_path} ({stats['text_pages']}/{stats['page_count']} pages, {stats['chars']} chars)")
 
     return txt_path
 
 
-def copy_pdf_to_cache(pdf_path: Path, pdf_id: str) -> Path:
-    """Copy PDF to cache for reference"""
+def reflink_file(src: Path, dst: Path):
+    """Clone src to dst sharing its data blocks (btrfs, XFS, APFS)
+
+    Raises OSError when the filesystem or platform cannot clone.
+    """
+    if sys.platform == "darwin":
+        result = subprocess.run(["cp", "-c", str(src), str(dst)], capture_output=True)
+        if result.returncode != 0:
+            raise OSError(f"clonefile failed: {result.stderr.decode().strip()}")
+        return
+    if not sys.platform.startswith("linux"):
+        raise OSError(f"Reflinks not supported on {sys.platform}")
+
+    import fcntl
+    try:
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+    except OSError:
+        dst.unlink(missing_ok=True)
+        raise
+
+
+def place_file(src: Path, dst: Path, strategy: str) -> str:
+    """Put src at dst with the cheapest method allowed; returns the method used"""
+    if strategy == "reference":
+        return strategy
+    if strategy == "auto":
+        methods = ["reflink", "hardlink", "copy"]
+    elif strategy in PLACEMENT_STRATEGIES:
+        methods = [strategy]
+    else:
+        raise ValueError(f"Unknown placement strategy: {strategy}")
+
+    for method in methods:
+        try:
+            if method == "reflink":
+                reflink_file(src, dst)
+            elif method == "hardlink":
+                os.link(src, dst)
+            else:
+                shutil.copy2(src, dst)
+            return method
+        except OSError:
+            if method == methods[-1]:
+                raise
+
+
+def resolve_cached_pdf(cache_dir: Path) -> Optional[Path]:
+    """The PDF behind a cache entry: source.pdf, or the referenced original"""
+    cache_dir = Path(cache_dir)
+    cached_pdf = cache_dir / "source.pdf"
+    if cached_pdf.exists():
+        return cached_pdf
+
+    placement_path = cache_dir / PLACEMENT_FILE
+    if placement_path.exists():
+        with open(placement_path, "r") as f:
+            original = Path(json.load(f)["original_path"])
+        if original.exists():
+            return original
+    return None
+
+
+def copy_pdf_to_cache(pdf_path: Path, pdf_id: str, strategy: str = DEFAULT_PLACEMENT) -> Path:
+    """Place PDF in cache for reference, recording the method in source.json
+
+    strategy is one of PLACEMENT_STRATEGIES; "reference" stores only the
+    original path. Returns the path to open, wherever it lives.
+    """
     cache_dir = get_cache_dir(pdf_id)
+
+    cached = resolve_cached_pdf(cache_dir)
+    if cached:
+        return cached
+
     cached_pdf = cache_dir / "source.pdf"
+    method = place_file(Path(pdf_path), cached_pdf, strategy)
+    with open(cache_dir / PLACEMENT_FILE, "w") as f:
+        json.dump({"method": method, "original_path": str(pdf_path)}, f, indent=2)
+
+    return cached_pdf if method != "reference" else Path(pdf_path)
 
-    if not cached_pdf.exists():
-        shutil.copy2(pdf_path, cached_pdf)
 
-    return cached_pdf
+# Everything fetch_pdf derives from the source file
+DERIVED_FILES = (
+    "metadata.json", "content.txt", "content.idx", "outline.json",
+    "source.pdf", PLACEMENT_FILE, FINGERPRINT_FILE,
+)
 
 
-def fetch_pdf(path: str) -> dict:
-    """Main entry point: fetch all content from PDF file"""
+def clear_pdf_cache(pdf_id: str):
+    """Drop derived files so a changed PDF is extracted again"""
+    cache_dir = get_cache_dir(pdf_id)
+    for name in DERIVED_FILES:
+        (cache_dir / name).unlink(missing_ok=True)
+
+
+def fetch_pdf(
+    path: str,
+    workers: int = 1,
+    id_mode: str = DEFAULT_PDF_ID_MODE,
+    pdf_id: Optional[str] = None,
+    placement: str = DEFAULT_PLACEMENT,
+    refresh: bool = False,
+) -> dict:
+    """Main entry point: fetch all content from PDF file
+
+    workers is the text extraction process count (see fetch_text); id_mode
+    picks path- or content-based IDs unless pdf_id is already known;
+    placement is how the file is kept in the cache (see copy_pdf_to_cache).
+    A cache entry built from other bytes than the file's current ones is
+    discarded and rebuilt; refresh=True discards it unconditionally.
+    """
     pdf_path = Path(path).resolve()
 
     if not pdf_path.exists():
@@ -147,15 +477,26 @@ def fetch_pdf(path: str) -> dict:
     if not pdf_path.suffix.lower() == ".pdf":
         raise ValueError(f"Not a PDF file: {pdf_path}")
 
-    pdf_id = generate_pdf_id(pdf_path)
+    pdf_id = pdf_id or generate_pdf_id(pdf_path, id_mode)
     print(f"Processing PDF: {pdf_path.name} (ID: {pdf_id})")
 
-    # Fetch all components
-    metadata = fetch_metadata(pdf_path, pdf_id)
-    txt_path = fetch_text(pdf_path, pdf_id)
-    cached_pdf = copy_pdf_to_cache(pdf_path, pdf_id)
-
     cache_dir = get_cache_dir(pdf_id)
+    fingerprint = pdf_fingerprint(pdf_path)
+    fingerprint_path = cache_dir / FINGERPRINT_FILE
+    cached_fingerprint = fingerprint_path.read_text() if fingerprint_path.exists() else None
+    if refresh or cached_fingerprint != fingerprint:
+        clear_pdf_cache(pdf_id)
+
+    # Fetch all components from a single open document
+    with PdfIngestSession(pdf_path) as session:
+        metadata = fetch_metadata(pdf_path, pdf_id, session)
+        txt_path = fetch_text(pdf_path, pdf_id, workers=workers, session=session)
+        with open(cache_dir / "outline.json", "w") as f:
+            json.dump(session.outline(), f, indent=2, ensure_ascii=False)
+        page_stats = session.page_stats()
+    cached_pdf = copy_pdf_to_cache(pdf_path, pdf_id, placement)
+    # Written last, so an interrupted fetch is rebuilt next time
+    fingerprint_path.write_text(fingerprint)
 
     return {
         "id": f"pdf_{pdf_id}",
@@ -164,6 +505,8 @@ def fetch_pdf(path: str) -> dict:
         "metadata": metadata,
         "cache_dir": str(cache_dir),
         "txt_path": str(txt_path),
+        "page_stats": page_stats,
         "pdf_path": str(cached_pdf),
         "original_path": str(pdf_path),
+        "fingerprint": fingerprint,
     }
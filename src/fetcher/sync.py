@@ -0,0 +1,65 @@
+"""Incremental sync - decide which sources need fetching again"""
+import json
+from pathlib import Path
+from typing import List, Optional, Tuple
+import sys
+
+sys.path.insert(0, str(Path.home() / ".deep-reading"))
+from config import CACHE_DIR
+
+from fetcher.youtube import find_audio, youtube_fingerprint
+from fetcher.pdf import pdf_fingerprint
+from fetcher.worker import source_id_for
+from repository import stored_fingerprints
+
+
+def local_fingerprint(source_type: str, source_id: str, url: str) -> Optional[str]:
+    """Fingerprint of a source's current inputs, from local state only
+
+    Returns None when cached outputs are missing, so the source is fetched.
+    """
+    if source_type == "youtube":
+        cache_dir = CACHE_DIR / "youtube" / source_id.removeprefix("youtube_")
+        metadata_path = cache_dir / "metadata.json"
+        if not (metadata_path.exists() and (cache_dir / "transcript.txt").exists()
+                and find_audio(cache_dir)):
+            return None
+        with open(metadata_path, "r") as f:
+            return youtube_fingerprint(json.load(f))
+
+    if source_type == "pdf":
+        cache_dir = CACHE_DIR / "pdf" / source_id.removeprefix("pdf_")
+        pdf_path = Path(url)
+        if not (pdf_path.exists() and (cache_dir / "content.txt").exists()):
+            return None
+        return pdf_fingerprint(pdf_path)
+
+    return None
+
+
+def plan_sync(urls: List[str], pdf_id_mode: str) -> Tuple[List[str], List[str], set]:
+    """Split urls into (to_fetch, unchanged, refresh)
+
+    refresh holds the sources whose inputs changed since they were cached;
+    their old derived files must be dropped before fetching.
+    """
+    stored = stored_fingerprints()
+    to_fetch, unchanged, refresh = [], [], set()
+
+    for url in urls:
+        try:
+            source_type, source_id, location = source_id_for(url, pdf_id_mode)
+        except ValueError:
+            to_fetch.append(url)  # Let the fetch report the unsupported source
+            continue
+        current = local_fingerprint(source_type, source_id, location)
+        previous = stored.get(source_id)
+
+        if previous and current == previous:
+            unchanged.append(url)
+            continue
+        if previous and current:
+            refresh.add(url)
+        to_fetch.append(url)
+
+    return to_fetch, unchanged, refresh
@@ -0,0 +1,176 @@
+"""Download queue worker - drains PENDING sources from the database"""
+import sys
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path.home() / ".deep-reading"))
+
+from fetcher.cli import detect_source_type, source_row, add_youtube_arguments, youtube_options
+from fetcher.youtube import fetch_youtube, extract_video_id
+from fetcher.pdf import fetch_pdf, generate_pdf_id, DEFAULT_PDF_ID_MODE
+from fetcher.batch import expand_urls
+from search.index import index_content
+from db import get_connection, init_db
+from models import Source, SourceType, ProcessingState
+import repository
+
+def source_id_for(path_or_url: str, pdf_id_mode: str = DEFAULT_PDF_ID_MODE) -> tuple:
+    """Compute (source_type, source_id, url) without fetching anything"""
+    source_type = detect_source_type(path_or_url)
+    if source_type == "youtube":
+        video_id = extract_video_id(path_or_url)
+        if not video_id:
+            raise ValueError(f"Could not extract video ID from URL: {path_or_url}")
+        return source_type, f"youtube_{video_id}", path_or_url
+    if source_type == "pdf":
+        pdf_path = Path(path_or_url).resolve()
+        return source_type, f"pdf_{generate_pdf_id(pdf_path, pdf_id_mode)}", str(pdf_path)
+    raise ValueError(f"Source type '{source_type}' not yet implemented")
+
+def enqueue(urls: List[str], pdf_id_mode: str = DEFAULT_PDF_ID_MODE) -> Tuple[List[str], list]:
+    """Add sources to the queue as PENDING rows; failed sources are re-queued
+
+    Returns (source_ids, failures) where failures holds (url, error) pairs
+    for playlists that could not be expanded and unsupported sources.
+    """
+    init_db()
+
+    urls, failures = expand_urls(urls)
+    queued = []
+    for url in urls:
+        try:
+            source_type, source_id, location = source_id_for(url, pdf_id_mode)
+        except ValueError as e:
+            failures.append((url, e))
+            continue
+        queued.append(Source(id=source_id, type=SourceType(source_type), url=location))
+
+    conn = get_connection()
+    with conn:
+        repository.enqueue_sources(conn, queued)
+    conn.close()
+
+    return [source.id for source in queued], failures
+
+def recover_stale_jobs(conn) -> int:
+    """Return jobs left mid-flight by a crashed worker to the queue"""
+    with conn:
+        return repository.requeue_stale(conn)
+
+def claim_next(conn) -> Optional[Source]:
+    """Atomically move the oldest PENDING source to DOWNLOADING and return it"""
+    return repository.claim_pending(conn)
+
+def set_state(conn, source_id: str, state: ProcessingState):
+    """Update a source's processing state"""
+    with conn:
+        repository.set_state(conn, source_id, state)
+
+def run_job(conn, job: Source, process: bool = True, **youtube_options):
+    """Fetch (and optionally process) one claimed source, tracking its state"""
+    source_id = job.id
+    try:
+        if job.type == SourceType.YOUTUBE:
+            result = fetch_youtube(job.url, **youtube_options)
+        elif job.type == SourceType.PDF:
+            # Keep the ID chosen at enqueue time, whichever mode produced it
+            result = fetch_pdf(job.url, pdf_id=source_id.removeprefix("pdf_"))
+        else:
+            raise Exception(f"Source type '{job.type.value}' not yet implemented")
+
+        source = source_row(job.type.value, job.url, result)
+        source.id = source_id
+        source.processing_state = ProcessingState.PROCESSING
+        with conn:
+            repository.save_fetched(conn, source)
+            index_content(conn, source_id, job.type.value, source.cache_path)
+
+        if process:
+            from processor.cli import process_source
+            process_source(source_id)
+
+        set_state(conn, source_id, ProcessingState.READY)
+        print(f"✓ {source_id}")
+        return True
+    except (Exception, SystemExit) as e:
+        set_state(conn, source_id, ProcessingState.ERROR)
+        print(f"✗ {source_id}: {e}")
+        return False
+
+def work(
+    workers: int = 2,
+    once: bool = False,
+    poll_interval: float = 5.0,
+    process: bool = True,
+    **youtube_options,
+) -> dict:
+    """Drain the queue with a pool of workers
+
+    With once=True the workers exit when the queue is empty; otherwise they
+    poll for new PENDING rows until interrupted. Assumes a single worker
+    daemon per database, since startup recovery re-queues in-flight rows.
+    """
+    init_db()
+
+    conn = get_connection()
+    recovered = recover_stale_jobs(conn)
+    conn.close()
+    if recovered:
+        print(f"Recovered {recovered} interrupted jobs")
+
+    stop = threading.Event()
+    stats = {"ready": 0, "error": 0}
+    stats_lock = threading.Lock()
+
+    def worker_loop():
+        conn = get_connection()
+        try:
+            while not stop.is_set():
+                job = claim_next(conn)
+                if not job:
+                    if once:
+                        return
+                    stop.wait(poll_interval)
+                    continue
+                ok = run_job(conn, job, process=process, **youtube_options)
+                with stats_lock:
+                    stats["ready" if ok else "error"] += 1
+        finally:
+            conn.close()
+
+    print(f"Worker started with {workers} workers")
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(worker_loop) for _ in range(max(1, workers))]
+        try:
+            for future in futures:
+                future.result()
+        except KeyboardInterrupt:
+            print("\nStopping after current jobs...")
+            stop.set()
+
+    print(f"Done: {stats['ready']} ready, {stats['error']} failed")
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Process the download queue")
+    parser.add_argument("--workers", type=int, default=2, help="Number of concurrent jobs")
+    parser.add_argument("--once", action="store_true", help="Exit when the queue is empty")
+    parser.add_argument("--poll", type=float, default=5.0, help="Seconds between queue polls when idle")
+    parser.add_argument("--no-process", action="store_true", help="Only download, skip report generation")
+    add_youtube_arguments(parser)
+    args = parser.parse_args()
+
+    work(
+        workers=args.workers,
+        once=args.once,
+        poll_interval=args.poll,
+        process=not args.no_process,
+        **youtube_options(args),
+    )
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,43 @@
 """YouTube content fetcher using yt-dlp"""
 import subprocess
 import json
+import os
 import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Callable, Iterator, Optional, Tuple
 import sys
 
 sys.path.insert(0, str(Path.home() / ".deep-reading"))
 from config import CACHE_DIR
+from transcript_index import TranscriptIndex
+
+# Stream URLs inside a saved info-JSON expire after a few hours
+INFO_JSON_MAX_AGE = 6 * 3600
+
+# yt-dlp arguments for each audio policy
+AUDIO_POLICIES = {
+    # Keep the source stream (usually opus/m4a) as-is, no ffmpeg re-encode
+    "native": ["-f", "bestaudio/best"],
+    # Low-bitrate mono opus, plenty for speech
+    "speech": [
+        "-f", "bestaudio/best",
+        "-x", "--audio-format", "opus", "--audio-quality", "48K",
+        "--postprocessor-args", "ExtractAudio:-ac 1",
+    ],
+    # Previous behaviour: re-encode to top-quality mp3
+    "mp3": ["-x", "--audio-format", "mp3", "--audio-quality", "0"],
+}
+DEFAULT_AUDIO_POLICY = "native"
+
+AUDIO_EXTENSIONS = [".opus", ".m4a", ".webm", ".ogg", ".mp3", ".aac", ".mka"]
+
+CUE_TIMING_RE = re.compile(r'^((?:\d+:)?\d{2}:\d{2}[.,]\d{3})\s+-->\s+((?:\d+:)?\d{2}:\d{2}[.,]\d{3})')
+TAG_RE = re.compile(r'<[^>]+>')
+# How many recent caption lines to remember when dropping rolling repeats
+DEDUPE_WINDOW = 32
 
 def extract_video_id(url: str) -> Optional[str]:
     """Extract video ID from various YouTube URL formats"""
@@ -29,8 +59,20 @@ def get_cache_dir(video_id: str) -> Path:
     cache_dir.mkdir(parents=True, exist_ok=True)
     return cache_dir
 
-def fetch_metadata(url: str, video_id: str) -> dict:
-    """Fetch video metadata using yt-dlp"""
+def source_args(url: str, info_json: Optional[Path] = None) -> list:
+    """yt-dlp input arguments: the URL, or a previously saved info-JSON"""
+    if info_json:
+        return ["--load-info-json", str(info_json)]
+    return [url]
+
+def fetch_info(url: str, video_id: str) -> Path:
+    """Resolve the video once and save yt-dlp's info-JSON to the cache"""
+    info_path = get_cache_dir(video_id) / "info.json"
+
+    if info_path.exists() and time.time() - info_path.stat().st_mtime < INFO_JSON_MAX_AGE:
+        print(f"Info already cached: {info_path}")
+        return info_path
+
     result = subprocess.run(
         ["yt-dlp", "--dump-json", "--no-download", url],
         capture_output=True,
@@ -39,7 +81,26 @@ def fetch_metadata(url: str, video_id: str) -> dict:
     if result.returncode != 0:
         raise Exception(f"Failed to fetch metadata: {result.stderr}")
 
-    data = json.loads(result.stdout)
+    with open(info_path, "w") as f:
+        f.write(result.stdout)
+
+    return info_path
+
+def fetch_metadata(url: str, video_id: str, info_json: Optional[Path] = None) -> dict:
+    """Fetch video metadata using yt-dlp, or read it from a saved info-JSON"""
+    if info_json:
+        with open(info_json, "r") as f:
+            data = json.load(f)
+    else:
+        result = subprocess.run(
+            ["yt-dlp", "--dump-json", "--no-download", url],
+            capture_output=True,
+            text=True
+        )
+        if result.returncode != 0:
+            raise Exception(f"Failed to fetch metadata: {result.stderr}")
+
+        data = json.loads(result.stdout)
 
     metadata = {
         "id": video_id,
@@ -58,42 +119,83 @@ def fetch_metadata(url: str, video_id: str) -> dict:
 
     return metadata
 
-def fetch_audio(url: str, video_id: str) -> Path:
-    """Download audio as mp3"""
+def youtube_fingerprint(metadata: dict) -> str:
+    """Inputs of the YouTube stages: the video and its upload date"""
+    return f"{metadata['id']}:{metadata.get('upload_date', '')}"
+
+def find_audio(cache_dir: Path) -> Optional[Path]:
+    """Find the cached audio file, whatever container was kept"""
+    for ext in AUDIO_EXTENSIONS:
+        audio_path = cache_dir / f"audio{ext}"
+        if audio_path.exists():
+            return audio_path
+    return None
+
+def fetch_audio(
+    url: str,
+    video_id: str,
+    info_json: Optional[Path] = None,
+    policy: str = DEFAULT_AUDIO_POLICY,
+) -> Path:
+    """Download audio according to an AUDIO_POLICIES entry"""
+    if policy not in AUDIO_POLICIES:
+        raise ValueError(f"Unknown audio policy: {policy}")
+
     cache_dir = get_cache_dir(video_id)
-    audio_path = cache_dir / "audio.mp3"
 
-    if audio_path.exists():
+    audio_path = find_audio(cache_dir)
+    if audio_path:
         print(f"Audio already cached: {audio_path}")
         return audio_path
 
     print("Downloading audio...")
     result = subprocess.run([
         "yt-dlp",
-        "-x",  # Extract audio
-        "--audio-format", "mp3",
-        "--audio-quality", "0",  # Best quality
-        "-o", str(audio_path),
-        url
+        *AUDIO_POLICIES[policy],
+        "-o", str(cache_dir / "audio.%(ext)s"),
+        *source_args(url, info_json)
     ], capture_output=True, text=True)
 
     if result.returncode != 0:
         raise Exception(f"Failed to download audio: {result.stderr}")
 
-    # yt-dlp may add extension, find the actual file
-    if not audio_path.exists():
-        for f in cache_dir.glob("audio.*"):
-            if f.suffix in [".mp3", ".m4a", ".opus", ".webm"]:
-                f.rename(audio_path)
-                break
+    audio_path = find_audio(cache_dir)
+    if not audio_path:
+        raise Exception("Failed to download audio: no audio file written")
 
     return audio_path
 
-def fetch_transcript(url: str, video_id: str) -> Tuple[Path, Path]:
+def pick_subtitle_flag(info: dict, lang: str = "en") -> Optional[str]:
+    """Choose the yt-dlp subtitle flag from an info-JSON's caption tracks
+
+    Auto-generated captions are preferred, matching the trial-run order
+    used when no info-JSON is available.
+    """
+    if lang in (info.get("automatic_captions") or {}):
+        return "--write-auto-sub"
+    if lang in (info.get("subtitles") or {}):
+        return "--write-subs"
+    return None
+
+def download_subtitles(flag: str, cache_dir: Path, inputs: list) -> list:
+    """Run yt-dlp for one subtitle kind and return any VTT files written"""
+    subprocess.run([
+        "yt-dlp",
+        "--skip-download",
+        flag,
+        "--sub-lang", "en",
+        "--sub-format", "vtt",
+        "-o", str(cache_dir / "transcript"),
+        *inputs
+    ], capture_output=True, text=True)
+    return list(cache_dir.glob("transcript*.vtt"))
+
+def fetch_transcript(url: str, video_id: str, info_json: Optional[Path] = None) -> Tuple[Path, Path]:
     """Download subtitles/transcript"""
     cache_dir = get_cache_dir(video_id)
     vtt_path = cache_dir / "transcript.vtt"
     txt_path = cache_dir / "transcript.txt"
+    cues_path = cache_dir / "transcript.cues"
 
     if txt_path.exists():
         print(f"Transcript already cached: {txt_path}")
@@ -101,31 +203,16 @@ def fetch_transcript(url: str, video_id: str) -> Tuple[Path, Path]:
 
     print("Downloading transcript...")
 
-    # Try auto-generated subtitles first
-    result = subprocess.run([
-        "yt-dlp",
-        "--skip-download",
-        "--write-auto-sub",
-        "--sub-lang", "en",
-        "--sub-format", "vtt",
-        "-o", str(cache_dir / "transcript"),
-        url
-    ], capture_output=True, text=True)
-
-    # Find the downloaded vtt file
-    vtt_files = list(cache_dir.glob("transcript*.vtt"))
-    if not vtt_files:
-        # Try manual subtitles
-        result = subprocess.run([
-            "yt-dlp",
-            "--skip-download",
-            "--write-subs",
-            "--sub-lang", "en",
-            "--sub-format", "vtt",
-            "-o", str(cache_dir / "transcript"),
-            url
-        ], capture_output=True, text=True)
-        vtt_files = list(cache_dir.glob("transcript*.vtt"))
+    if info_json:
+        # The info-JSON already lists the caption tracks, so no trial runs
+        with open(info_json, "r") as f:
+            flag = pick_subtitle_flag(json.load(f))
+        vtt_files = download_subtitles(flag, cache_dir, source_args(url, info_json)) if flag else []
+    else:
+        # Try auto-generated subtitles first, then manual subtitles
+        vtt_files = download_subtitles("--write-auto-sub", cache_dir, [url])
+        if not vtt_files:
+            vtt_files = download_subtitles("--write-subs", cache_dir, [url])
 
     if not vtt_files:
         raise Exception("No subtitles available for this video")
@@ -134,52 +221,147 @@ def fetch_transcript(url: str, video_id: str) -> Tuple[Path, Path]:
     vtt_files[0].rename(vtt_path)
 
     # Clean VTT to plain text
-    clean_transcript(vtt_path, txt_path)
+    clean_transcript(vtt_path, txt_path, cues_path)
+    TranscriptIndex.build(cues_path, txt_path, cache_dir / "transcript.idx")
 
     return vtt_path, txt_path
 
-def clean_transcript(vtt_path: Path, txt_path: Path):
-    """Clean VTT file to plain text"""
-    with open(vtt_path, "r") as f:
-        content = f.read()
-
-    # Remove VTT headers and timestamps
-    lines = content.split("\n")
-    cleaned = []
-    seen = set()
-
-    for line in lines:
-        # Skip headers
-        if line.startswith("WEBVTT") or line.startswith("Kind:") or line.startswith("Language:"):
-            continue
-        # Skip timestamps
-        if re.match(r'^\d{2}:\d{2}:\d{2}', line):
-            continue
-        # Skip empty lines and alignment tags
-        if not line.strip() or "align:" in line:
-            continue
-        # Remove HTML tags
-        line = re.sub(r'<[^>]+>', '', line)
-        # Deduplicate
-        if line not in seen:
-            seen.add(line)
-            cleaned.append(line)
-
-    with open(txt_path, "w") as f:
-        f.write("\n".join(cleaned))
-
-def fetch_youtube(url: str) -> dict:
-    """Main entry point: fetch all content from YouTube URL"""
+def parse_timestamp(ts: str) -> float:
+    """Parse a VTT timestamp (HH:MM:SS.mmm or MM:SS.mmm) into seconds"""
+    seconds = 0.0
+    for part in ts.replace(",", ".").split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+def iter_vtt_cues(vtt_path: Path, window: int = DEDUPE_WINDOW) -> Iterator[Tuple[float, float, str]]:
+    """Stream (start, end, text) for each caption line in a VTT file
+
+    Headers, NOTE/STYLE blocks and cue identifiers are skipped and inline
+    tags removed. Rolling captions repeat the previous line, so a line seen
+    within the last `window` lines is dropped; memory stays constant.
+    """
+    recent = deque(maxlen=window)
+    timing = None
+
+    with open(vtt_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\r\n")
+            if line == "":
+                timing = None  # Only an empty line ends the block
+                continue
+            match = CUE_TIMING_RE.match(line)
+            if match:
+                timing = (parse_timestamp(match.group(1)), parse_timestamp(match.group(2)))
+                continue
+            if timing is None:
+                continue  # Header, NOTE/STYLE block or cue identifier
+
+            text = TAG_RE.sub("", line)
+            if not text.strip() or text in recent:
+                continue
+            recent.append(text)
+            yield timing[0], timing[1], text
+
+def clean_transcript(vtt_path: Path, txt_path: Path, cues_path: Optional[Path] = None) -> int:
+    """Clean VTT file to plain text, streaming
+
+    When cues_path is given, a tab-separated "start<TAB>end<TAB>text" line
+    is also written for every transcript line, in the same order. Returns
+    the number of lines written.
+    """
+    count = 0
+    with open(txt_path, "w", encoding="utf-8") as txt, \
+            open(cues_path or os.devnull, "w", encoding="utf-8") as cues:
+        for start, end, text in iter_vtt_cues(vtt_path):
+            if count:
+                txt.write("\n")
+            txt.write(text)
+            cues.write(f"{start:.3f}\t{end:.3f}\t{text.replace(chr(9), ' ')}\n")
+            count += 1
+    return count
+
+def iter_cue_file(cues_path: Path) -> Iterator[Tuple[float, float, str]]:
+    """Stream (start, end, text) back out of a cue file"""
+    with open(cues_path, "r", encoding="utf-8") as f:
+        for line in f:
+            start, end, text = line.rstrip("\n").split("\t", 2)
+            yield float(start), float(end), text
+
+def _timed(func: Callable, *args):
+    """Run a fetch stage, returning (result, error, seconds)"""
+    start = time.perf_counter()
+    try:
+        return func(*args), None, time.perf_counter() - start
+    except Exception as e:
+        return None, e, time.perf_counter() - start
+
+def run_stages(stages: dict, concurrent: bool = False) -> Tuple[dict, dict, dict]:
+    """Run named fetch stages, serially or on a thread pool
+
+    stages maps a stage name to (func, *args). Serial runs stop at the first
+    failing stage; concurrent runs let every stage finish so one failure
+    doesn't hide the others' results. Returns (results, errors, timings)
+    keyed by stage name.
+    """
+    outcomes = {}
+    if concurrent:
+        with ThreadPoolExecutor(max_workers=len(stages)) as pool:
+            futures = {name: pool.submit(_timed, *stage) for name, stage in stages.items()}
+            outcomes = {name: future.result() for name, future in futures.items()}
+    else:
+        for name, stage in stages.items():
+            outcomes[name] = _timed(*stage)
+            if outcomes[name][1] is not None:
+                break
+
+    results = {name: o[0] for name, o in outcomes.items() if o[1] is None}
+    errors = {name: o[1] for name, o in outcomes.items() if o[1] is not None}
+    timings = {name: o[2] for name, o in outcomes.items()}
+    return results, errors, timings
+
+def fetch_youtube(
+    url: str,
+    concurrent: bool = False,
+    single_pass: bool = False,
+    audio_policy: str = DEFAULT_AUDIO_POLICY,
+) -> dict:
+    """Main entry point: fetch all content from YouTube URL
+
+    With concurrent=True the metadata, audio and transcript stages run at
+    the same time, each in its own yt-dlp process. With single_pass=True the
+    page is resolved once into info.json and the other stages load it
+    instead of re-extracting the video. audio_policy picks an
+    AUDIO_POLICIES entry.
+    """
     video_id = extract_video_id(url)
     if not video_id:
         raise ValueError(f"Could not extract video ID from URL: {url}")
 
     print(f"Fetching YouTube video: {video_id}")
 
+    info_json = None
+    timings = {}
+    if single_pass:
+        results, errors, timings = run_stages({"info": (fetch_info, url, video_id)})
+        if errors:
+            raise Exception(f"Failed to fetch {video_id} (info: {errors['info']})")
+        info_json = results["info"]
+
     # Fetch all components
-    metadata = fetch_metadata(url, video_id)
-    audio_path = fetch_audio(url, video_id)
-    vtt_path, txt_path = fetch_transcript(url, video_id)
+    results, errors, stage_timings = run_stages({
+        "metadata": (fetch_metadata, url, video_id, info_json),
+        "audio": (fetch_audio, url, video_id, info_json, audio_policy),
+        "transcript": (fetch_transcript, url, video_id, info_json),
+    }, concurrent=concurrent)
+    timings.update(stage_timings)
+
+    if errors:
+        details = "; ".join(f"{name}: {e}" for name, e in errors.items())
+        raise Exception(f"Failed to fetch {video_id} ({details})")
+
+    metadata = results["metadata"]
+    audio_path = results["audio"]
+    vtt_path, txt_path = results["transcript"]
 
     cache_dir = get_cache_dir(video_id)
 
@@ -192,4 +374,6 @@ def fetch_youtube(url: str) -> dict:
         "audio_path": str(audio_path),
         "vtt_path": str(vtt_path),
         "txt_path": str(txt_path),
+        "fingerprint": youtube_fingerprint(metadata),
+        "timings": timings,
     }
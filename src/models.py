@@ -38,7 +38,7 @@ class NoteStatus(Enum):
     REVIEWED = "reviewed"
     SYNCED = "synced"
 
-@dataclass
+@dataclass(slots=True)
 class Source:
     id: str
     type: SourceType
@@ -48,10 +48,11 @@ class Source:
     duration: Optional[int] = None  # seconds
     cache_path: Optional[str] = None
     processing_state: ProcessingState = ProcessingState.PENDING
+    fingerprint: Optional[str] = None  # inputs of the fetch stages, see fetcher/sync.py
     created_at: datetime = field(default_factory=datetime.now)
     updated_at: datetime = field(default_factory=datetime.now)
 
-@dataclass
+@dataclass(slots=True)
 class Chapter:
     id: Optional[int]
     source_id: str
@@ -60,7 +61,7 @@ class Chapter:
     title: str
     type: ChapterType = ChapterType.CORE
 
-@dataclass
+@dataclass(slots=True)
 class Mark:
     id: Optional[int]
     source_id: str
@@ -69,7 +70,7 @@ class Mark:
     content: Optional[str] = None
     created_at: datetime = field(default_factory=datetime.now)
 
-@dataclass
+@dataclass(slots=True)
 class Note:
     id: Optional[int]
     source_id: Optional[str]
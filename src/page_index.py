@@ -0,0 +1,120 @@
+"""Page offset index for extracted PDF text
+
+content.txt holds every page behind a "--- Page N ---" marker. The index
+records where each page starts and ends in the file, so a page or a
+range of pages is read with one seek instead of scanning the whole book.
+
+File layout: a little-endian header, then three native-order arrays of
+`count` page numbers (uint32), start offsets (uint64) and end offsets
+(uint64). Pages without text have no entry.
+"""
+import re
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Optional
+
+MAGIC = b"DRPI"
+VERSION = 1
+HEADER = struct.Struct("<4sII")  # magic, version, count
+MARKER_RE = re.compile(rb"^--- Page (\d+) ---\n")
+
+
+class PageIndex:
+    """Byte ranges of each page in content.txt"""
+
+    def __init__(self, txt_path: Path, pages: array, starts: array, ends: array):
+        self.txt_path = Path(txt_path)
+        self.pages = pages
+        self.starts = starts
+        self.ends = ends
+
+    def __len__(self) -> int:
+        return len(self.pages)
+
+    def save(self, index_path: Path):
+        """Write the index to disk"""
+        with open(index_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(self.pages)))
+            self.pages.tofile(f)
+            self.starts.tofile(f)
+            self.ends.tofile(f)
+
+    @classmethod
+    def load(cls, index_path: Path, txt_path: Path) -> "PageIndex":
+        """Load a previously saved index"""
+        with open(index_path, "rb") as f:
+            magic, version, count = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"Not a page index: {index_path}")
+
+            pages, starts, ends = array("I"), array("Q"), array("Q")
+            pages.fromfile(f, count)
+            starts.fromfile(f, count)
+            ends.fromfile(f, count)
+
+        return cls(txt_path, pages, starts, ends)
+
+    @classmethod
+    def build(cls, txt_path: Path) -> "PageIndex":
+        """Scan an existing content.txt for page markers (for older caches)"""
+        pages, starts, ends = array("I"), array("Q"), array("Q")
+        pos = 0
+
+        with open(txt_path, "rb") as f:
+            for line in f:
+                match = MARKER_RE.match(line)
+                if match:
+                    if pages:
+                        ends.append(pos - 2)  # Drop the blank-line separator
+                    pages.append(int(match.group(1)))
+                    starts.append(pos)
+                pos += len(line)
+
+        if pages:
+            ends.append(pos)
+
+        return cls(txt_path, pages, starts, ends)
+
+    def _read(self, first: int, last: int, with_markers: bool = True) -> str:
+        """Read entries first..last-1 with a single seek"""
+        if first >= last:
+            return ""
+        with open(self.txt_path, "rb") as f:
+            f.seek(self.starts[first])
+            data = f.read(self.ends[last - 1] - self.starts[first])
+        text = data.decode("utf-8")
+        if not with_markers:
+            text = text.split("\n", 1)[1] if "\n" in text else ""
+        return text
+
+    def read_page(self, page: int) -> str:
+        """Text of one page (1-based), without its marker; "" if blank"""
+        i = bisect_left(self.pages, page)
+        if i == len(self.pages) or self.pages[i] != page:
+            return ""
+        return self._read(i, i + 1, with_markers=False)
+
+    def read_pages(self, first: int, last: int) -> str:
+        """Pages first..last inclusive (1-based), markers kept as in content.txt"""
+        return self._read(bisect_left(self.pages, first), bisect_right(self.pages, last))
+
+
+def page_index_path(txt_path: Path) -> Path:
+    """Index file stored next to the extracted text"""
+    return Path(txt_path).with_suffix(".idx")
+
+
+def load_page_index(txt_path: Path) -> Optional[PageIndex]:
+    """Load the page index for content.txt, building and saving it if missing"""
+    txt_path = Path(txt_path)
+    index_path = page_index_path(txt_path)
+
+    if index_path.exists():
+        return PageIndex.load(index_path, txt_path)
+    if txt_path.exists():
+        index = PageIndex.build(txt_path)
+        index.save(index_path)
+        return index
+    return None
@@ -2,66 +2,95 @@
 import sys
 import argparse
 from pathlib import Path
+from typing import List, Optional
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 sys.path.insert(0, str(Path.home() / ".deep-reading"))
 
-from player.mpv_controller import MpvController, format_time
-from db import get_connection
+from player.mpv_controller import MpvController, format_time, STARTUP_TIMEOUT
+from fetcher.youtube import find_audio
+from models import Source
+import repository
 
-def get_source(source_id: str) -> dict:
+def format_metrics(metrics: dict) -> str:
+    """Format startup metrics as 'mpv ready 40 ms, first audio 95 ms'"""
+    labels = {"ready": "mpv ready", "first_audio": "first audio"}
+    return ", ".join(
+        f"{label} {metrics[name] * 1000:.0f} ms" for name, label in labels.items() if name in metrics
+    )
+
+def get_source(source_id: str) -> Source:
     """Get source from database"""
-    conn = get_connection()
-    row = conn.execute(
-        "SELECT * FROM sources WHERE id = ?",
-        (source_id,)
-    ).fetchone()
-    conn.close()
-
-    if not row:
+    source = repository.cached_source(source_id)
+
+    if not source:
         raise ValueError(f"Source not found: {source_id}")
 
-    return dict(row)
+    return source
 
 def list_sources():
     """List all available sources"""
-    conn = get_connection()
-    rows = conn.execute(
-        "SELECT id, title, author, duration, processing_state FROM sources ORDER BY created_at DESC"
-    ).fetchall()
-    conn.close()
+    sources = repository.list_sources()
 
-    if not rows:
+    if not sources:
         print("No sources found. Use 'dr fetch <url>' to add content.")
         return
 
     print("Available sources:\n")
-    for row in rows:
-        duration = format_time(row["duration"]) if row["duration"] else "?"
-        state = row["processing_state"]
-        print(f"  [{row['id']}]")
-        print(f"    {row['title']}")
-        print(f"    by {row['author']} | {duration} | {state}")
+    for source in sources:
+        duration = format_time(source.duration) if source.duration else "?"
+        state = source.processing_state.value
+        print(f"  [{source.id}]")
+        print(f"    {source.title}")
+        print(f"    by {source.author} | {duration} | {state}")
         print()
 
-def play(source_id: str):
-    """Play a source"""
+def play(
+    source_id: str,
+    mpv: Optional[MpvController] = None,
+    next_source_id: Optional[str] = None,
+) -> bool:
+    """Play a source; returns False if the user quit
+
+    Without mpv a player is started for this source and stopped after it.
+    A shared mpv is left running for the next source, and next_source_id
+    is prefetched into its playlist.
+    """
     source = get_source(source_id)
-    cache_path = Path(source["cache_path"])
-    audio_path = cache_path / "audio.mp3"
+    if not source.cache_path:
+        print(f"Not fetched yet (state: {source.processing_state.value}): {source_id}")
+        sys.exit(1)
+    cache_path = Path(source.cache_path)
+    audio_path = find_audio(cache_path)
 
-    if not audio_path.exists():
-        print(f"Audio file not found: {audio_path}")
+    if not audio_path:
+        print(f"Audio file not found in: {cache_path}")
         sys.exit(1)
 
-    print(f"Playing: {source['title']}")
-    print(f"By: {source['author']}")
+    print(f"Playing: {source.title}")
+    print(f"By: {source.author}")
     print()
-    print("Controls: [space] pause, [j/k] seek, [+/-] speed, [q] quit")
+    print("Controls: [space] pause, [j/k] seek, [n/p] chapter, [+/-] speed, [q] quit")
     print()
 
-    mpv = MpvController()
-    mpv.start(str(audio_path))
+    owned = mpv is None
+    if owned:
+        mpv = MpvController()
+        mpv.start(str(audio_path))
+    else:
+        mpv.open(str(audio_path))
+        if next_source_id:
+            next_source = get_source(next_source_id)
+            next_audio = next_source.cache_path and find_audio(Path(next_source.cache_path))
+            if next_audio:
+                mpv.prefetch(str(next_audio))
+
+    # Until the new file plays, the position may still be the last file's
+    if mpv.wait_until_playing(STARTUP_TIMEOUT):
+        startup = format_metrics(mpv.metrics)
+        if startup:
+            print(f"Started: {startup}")
+    entry_id = mpv.entry_id
 
     import tty
     import termios
@@ -70,6 +99,7 @@ def play(source_id: str):
     fd = sys.stdin.fileno()
     old_settings = termios.tcgetattr(fd)
 
+    user_quit = False
     try:
         tty.setraw(fd)
         while True:
@@ -92,6 +122,7 @@ def play(source_id: str):
             if select.select([sys.stdin], [], [], 0.1)[0]:
                 ch = sys.stdin.read(1)
                 if ch == 'q':
+                    user_quit = True
                     break
                 elif ch == ' ':
                     mpv.toggle_pause()
@@ -107,26 +138,46 @@ def play(source_id: str):
                     mpv.seek(60)
                 elif ch == 'K':
                     mpv.seek(-30)
+                elif ch == 'n':
+                    mpv.chapter_jump(1)
+                elif ch == 'p':
+                    mpv.chapter_jump(-1)
 
-            # Check if playback ended
-            if pos >= dur - 0.5 and dur > 0:
+            # Check if playback ended; mpv may also have moved on by itself
+            if mpv.has_ended(entry_id) or (pos >= dur - 0.5 and dur > 0):
                 break
 
     finally:
         termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
-        mpv.stop()
+        if owned:
+            mpv.stop()
         print("\n\nPlayback ended.")
 
+    return not user_quit
+
+def play_queue(source_ids: List[str]):
+    """Play sources back to back in one warm mpv"""
+    mpv = MpvController()
+    try:
+        for i, source_id in enumerate(source_ids):
+            next_source_id = source_ids[i + 1] if i + 1 < len(source_ids) else None
+            if not play(source_id, mpv=mpv, next_source_id=next_source_id):
+                break
+    finally:
+        mpv.stop()
+
 def main():
     parser = argparse.ArgumentParser(description="Play content")
-    parser.add_argument("source_id", nargs="?", help="Source ID to play")
+    parser.add_argument("source_ids", nargs="*", help="Source IDs to play, in order")
     parser.add_argument("-l", "--list", action="store_true", help="List sources")
     args = parser.parse_args()
 
-    if args.list or not args.source_id:
+    if args.list or not args.source_ids:
         list_sources()
+    elif len(args.source_ids) == 1:
+        play(args.source_ids[0])
     else:
-        play(args.source_id)
+        play_queue(args.source_ids)
 
 if __name__ == "__main__":
     main()
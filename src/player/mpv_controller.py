@@ -1,15 +1,26 @@
 """mpv IPC controller for audio playback"""
 import socket
-import json
 import subprocess
+import threading
 import time
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 import sys
 
 sys.path.insert(0, str(Path.home() / ".deep-reading"))
 from config import MPV_SOCKET
 
+from player.mpv_ipc import MpvIpcClient, MpvError
+
+# Properties mirrored locally from mpv's property-change events
+OBSERVED_PROPERTIES = ("time-pos", "duration", "speed", "pause")
+
+# Seconds to wait for a launched mpv to accept IPC connections
+STARTUP_TIMEOUT = 5.0
+# Connect retry delay, doubled after each refused attempt
+CONNECT_RETRY_MIN = 0.001
+CONNECT_RETRY_MAX = 0.05
+
 class MpvController:
     """Control mpv player via IPC socket"""
 
@@ -17,9 +28,24 @@ class MpvController:
         self.socket_path = socket_path
         self.process: Optional[subprocess.Popen] = None
         self.sock: Optional[socket.socket] = None
+        self.ipc: Optional[MpvIpcClient] = None
+        self.state: dict = {}
+        # Seconds from start()/load() to mpv being ready and to first audio
+        self.metrics: dict = {}
+        self.playing = threading.Event()
+        self._load_started = None
+        # File queued after the current one by prefetch()
+        self.prefetched: Optional[str] = None
+        # Playlist entry of the file mpv is on, and entries that have ended
+        self.entry_id: Optional[int] = None
+        self.ended_entries: set = set()
 
     def start(self, audio_path: str):
-        """Start mpv with the given audio file"""
+        """Start mpv and play the given audio file
+
+        mpv is launched idle; once it answers on its socket the properties
+        are observed and the file loaded, so no playback event is missed.
+        """
         # Kill any existing mpv
         self.stop()
 
@@ -28,6 +54,9 @@ class MpvController:
         if socket_file.exists():
             socket_file.unlink()
 
+        started = time.perf_counter()
+        self.metrics = {}
+
         # Start mpv in background
         self.process = subprocess.Popen([
             "mpv",
@@ -35,44 +64,160 @@ class MpvController:
             "--no-terminal",
             f"--input-ipc-server={self.socket_path}",
             "--idle=yes",
-            audio_path
+            "--prefetch-playlist=yes",
         ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
 
-        # Wait for socket
-        for _ in range(50):  # 5 seconds timeout
-            if socket_file.exists():
+        self._connect()
+        self.metrics["ready"] = time.perf_counter() - started
+        self.load(audio_path, started=started)
+
+    def _connect(self):
+        """Connect as soon as mpv listens, retrying with exponential backoff"""
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        delay = CONNECT_RETRY_MIN
+        while True:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(self.socket_path)
                 break
-            time.sleep(0.1)
+            except (FileNotFoundError, ConnectionRefusedError):
+                sock.close()
+            if self.process and self.process.poll() is not None:
+                raise Exception(f"mpv exited with code {self.process.returncode}")
+            if time.monotonic() >= deadline:
+                raise Exception("mpv socket not created")
+            time.sleep(delay)
+            delay = min(delay * 2, CONNECT_RETRY_MAX)
+
+        self.sock = sock
+        self.ipc = MpvIpcClient(sock)
+        self._observe()
+        if not self.ping():
+            raise Exception("mpv did not answer on its IPC socket")
+
+    def ping(self) -> bool:
+        """Check that mpv answers commands"""
+        reply = self._send_command(["client_name"])
+        return bool(reply and reply.get("error") == "success")
+
+    def is_running(self) -> bool:
+        """Whether a started mpv is still up and connected"""
+        return (
+            self.process is not None and self.process.poll() is None
+            and self.ipc is not None and not self.ipc.closed
+        )
+
+    def open(self, audio_path: str):
+        """Play audio_path, reusing the running mpv instead of starting one"""
+        if not self.is_running():
+            self.start(audio_path)
+        elif audio_path == self.prefetched:
+            self._advance(audio_path)
+        else:
+            self.load(audio_path)
+
+    def load(self, audio_path: str, started: Optional[float] = None):
+        """Replace the current file; time-to-first-audio counts from started"""
+        self.playing.clear()
+        self.prefetched = None
+        if started is None:
+            self.metrics = {}  # mpv was already up; only first_audio applies
+        self._load_started = started or time.perf_counter()
+        self._forget_position()
+        self._send_command(["loadfile", audio_path, "replace"])
+
+    def prefetch(self, audio_path: str):
+        """Queue audio_path after the current file so mpv opens it early"""
+        self.batch(["playlist-clear"], ["loadfile", audio_path, "append"])
+        self.prefetched = audio_path
+
+    def _advance(self, audio_path: str):
+        """Switch to the prefetched file, unless mpv already moved on to it"""
+        self.playing.clear()
+        self.prefetched = None
+        self.metrics = {}
+        self._load_started = time.perf_counter()
+        current, = self.batch(["get_property", "path"])
+        if current and current.get("data") == audio_path:
+            # Played on from the previous file without a gap
+            self.metrics["first_audio"] = 0.0
+            self.playing.set()
         else:
-            raise Exception("mpv socket not created")
+            self._forget_position()
+            reply = self._send_command(["playlist-next", "force"])
+            if reply and reply.get("error") != "success":
+                self.load(audio_path)  # mpv went idle; nothing is queued any more
+
+    def _forget_position(self):
+        """Drop the previous file's position so it does not read as ended"""
+        self.state["time-pos"] = None
+        self.state["duration"] = None
+
+    def wait_until_playing(self, timeout: Optional[float] = None) -> bool:
+        """Block until the loaded file starts producing audio"""
+        return self.playing.wait(timeout)
+
+    def _observe(self):
+        """Subscribe to OBSERVED_PROPERTIES so reads need no round-trip"""
+        self.state = {}
+        self.ipc.event_handlers.append(self._on_event)
+        try:
+            self.ipc.send_many([
+                ["observe_property", observe_id, name]
+                for observe_id, name in enumerate(OBSERVED_PROPERTIES, 1)
+            ])
+        except MpvError:
+            pass
 
-        # Connect
-        self._connect()
+    def _on_event(self, event: dict):
+        """Update the state snapshot; runs on the IPC reader thread"""
+        if event.get("event") == "property-change" and event.get("name") in OBSERVED_PROPERTIES:
+            self.state[event["name"]] = event.get("data")
+        elif event.get("event") == "start-file":
+            self.entry_id = event.get("playlist_entry_id")
+        elif event.get("event") == "end-file" and event.get("playlist_entry_id") is not None:
+            self.ended_entries.add(event["playlist_entry_id"])
+        elif event.get("event") == "playback-restart" and not self.playing.is_set():
+            # First playback-restart after a load: audio is flowing
+            if self._load_started is not None:
+                self.metrics["first_audio"] = time.perf_counter() - self._load_started
+            self.playing.set()
+
+    def has_ended(self, entry_id: Optional[int]) -> bool:
+        """Whether mpv finished or left playlist entry entry_id
+
+        Covers ends the position cannot show, such as seeking past the end
+        while a prefetched file is queued: mpv moves straight on to it.
+        """
+        return entry_id is not None and entry_id in self.ended_entries
 
-    def _connect(self):
-        """Connect to mpv socket"""
-        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-        self.sock.connect(self.socket_path)
-        self.sock.setblocking(False)
+    def _read(self, name: str):
+        """Property from the state snapshot, falling back to get_property"""
+        if name in self.state:
+            return self.state[name]
+        return self._get_property(name)
 
     def _send_command(self, command: list) -> Optional[dict]:
-        """Send command to mpv and get response"""
-        if not self.sock:
+        """Send command to mpv and wait for its reply; None if mpv is gone"""
+        if not self.ipc:
+            return None
+        try:
+            return self.ipc.command(command)
+        except MpvError:
             return None
 
-        msg = json.dumps({"command": command}) + "\n"
-        self.sock.send(msg.encode())
+    def batch(self, *commands: list) -> List[Optional[dict]]:
+        """Send commands in one write and return their replies in order
 
-        # Read response
-        time.sleep(0.05)
+        mpv runs them in sequence, so a read after a write sees the new
+        value. Replies are None if mpv is gone.
+        """
+        if not self.ipc:
+            return [None] * len(commands)
         try:
-            data = self.sock.recv(4096).decode()
-            for line in data.strip().split("\n"):
-                if line:
-                    return json.loads(line)
-        except BlockingIOError:
-            pass
-        return None
+            return self.ipc.command_many(list(commands))
+        except MpvError:
+            return [None] * len(commands)
 
     def _get_property(self, name: str):
         """Get mpv property value"""
@@ -95,10 +240,9 @@ class MpvController:
         self._set_property("pause", True)
 
     def toggle_pause(self):
-        """Toggle pause state"""
-        current = self._get_property("pause")
-        self._set_property("pause", not current)
-        return not current
+        """Toggle pause state; returns True if now paused"""
+        _, reply = self.batch(["cycle", "pause"], ["get_property", "pause"])
+        return bool(reply and reply.get("data"))
 
     def seek(self, seconds: float, mode: str = "relative"):
         """Seek to position
@@ -110,23 +254,30 @@ class MpvController:
         """Seek to absolute position"""
         self.seek(seconds, "absolute")
 
+    def chapter_jump(self, delta: int = 1) -> Optional[float]:
+        """Move delta chapters; returns the new position, None if there are no chapters"""
+        jump, reply = self.batch(["add", "chapter", delta], ["get_property", "time-pos"])
+        if not jump or jump.get("error") != "success" or not reply:
+            return None
+        return reply.get("data")
+
     # Playback info
     def get_position(self) -> float:
         """Get current playback position in seconds"""
-        return self._get_property("time-pos") or 0.0
+        return self._read("time-pos") or 0.0
 
     def get_duration(self) -> float:
         """Get total duration in seconds"""
-        return self._get_property("duration") or 0.0
+        return self._read("duration") or 0.0
 
     def get_paused(self) -> bool:
         """Check if paused"""
-        return self._get_property("pause") or False
+        return self._read("pause") or False
 
     # Speed control
     def get_speed(self) -> float:
         """Get playback speed"""
-        return self._get_property("speed") or 1.0
+        return self._read("speed") or 1.0
 
     def set_speed(self, speed: float):
         """Set playback speed (0.5 - 3.0)"""
@@ -135,24 +286,25 @@ class MpvController:
 
     def speed_up(self, delta: float = 0.25):
         """Increase speed"""
-        current = self.get_speed()
-        self.set_speed(current + delta)
+        self.set_speed(self.get_speed() + delta)
 
     def speed_down(self, delta: float = 0.25):
         """Decrease speed"""
-        current = self.get_speed()
-        self.set_speed(current - delta)
+        self.set_speed(self.get_speed() - delta)
 
     # Cleanup
     def stop(self):
         """Stop mpv and cleanup"""
-        if self.sock:
+        if self.ipc:
             try:
-                self._send_command(["quit"])
-                self.sock.close()
-            except:
+                self.ipc.send(["quit"])  # mpv may exit before replying
+            except MpvError:
                 pass
-            self.sock = None
+            self.ipc.close()
+            self.ipc = None
+        self.sock = None
+        self.state = {}
+        self.prefetched = None
 
         if self.process:
             try:
@@ -0,0 +1,139 @@
+"""Event-driven client for mpv's JSON IPC protocol
+
+Each command carries a request_id. A reader thread splits the socket
+stream into lines and resolves the matching reply future as soon as it
+arrives; lines without a request_id are async events and go to the
+registered event handlers instead.
+"""
+import itertools
+import json
+import socket
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Callable, Dict, List, Optional
+
+# Seconds to wait for a reply before giving up on a command
+COMMAND_TIMEOUT = 1.0
+RECV_SIZE = 65536
+
+
+class MpvError(Exception):
+    """mpv did not answer, or the connection is gone"""
+
+
+class MpvIpcClient:
+    """Request/reply and event dispatch over a connected mpv IPC socket"""
+
+    def __init__(self, sock: socket.socket, timeout: float = COMMAND_TIMEOUT):
+        self.sock = sock
+        self.timeout = timeout
+        self.event_handlers: List[Callable[[dict], None]] = []
+        self.closed = False
+        self._request_ids = itertools.count(1)
+        self._pending: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read_loop, name="mpv-ipc-reader", daemon=True)
+        self._reader.start()
+
+    def send(self, command: list) -> Future:
+        """Send a command and return the future of its reply"""
+        return self.send_many([command])[0]
+
+    def send_many(self, commands: List[list]) -> List[Future]:
+        """Send commands in one write; mpv runs them in order
+
+        Returns one reply future per command, so a pipeline of N commands
+        costs one round-trip instead of N.
+        """
+        futures, lines = [], []
+        with self._lock:
+            if self.closed:
+                raise MpvError("mpv connection closed")
+            for command in commands:
+                request_id = next(self._request_ids)
+                future = Future()
+                self._pending[request_id] = future
+                futures.append((request_id, future))
+                lines.append(json.dumps({"command": command, "request_id": request_id}) + "\n")
+        try:
+            with self._send_lock:
+                self.sock.sendall("".join(lines).encode())
+        except OSError as e:
+            with self._lock:
+                for request_id, _ in futures:
+                    self._pending.pop(request_id, None)
+            raise MpvError(f"mpv connection lost: {e}") from e
+        return [future for _, future in futures]
+
+    def command(self, command: list, timeout: Optional[float] = None) -> dict:
+        """Send a command and wait for its reply"""
+        return self.command_many([command], timeout)[0]
+
+    def command_many(self, commands: List[list], timeout: Optional[float] = None) -> List[dict]:
+        """Send commands in one write and wait for all their replies"""
+        futures = self.send_many(commands)
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        try:
+            return [future.result(max(0.0, deadline - time.monotonic())) for future in futures]
+        except FutureTimeout:
+            raise MpvError(f"mpv did not reply to {commands[0][0]}") from None
+
+    def _read_loop(self):
+        buffer = b""
+        try:
+            while True:
+                data = self.sock.recv(RECV_SIZE)
+                if not data:
+                    break
+                buffer += data
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    if line.strip():
+                        self._dispatch(line)
+        except OSError:
+            pass
+        finally:
+            self._fail_pending()
+
+    def _dispatch(self, line: bytes):
+        try:
+            msg = json.loads(line)
+        except ValueError:
+            return
+
+        request_id = msg.get("request_id")
+        if request_id is not None:
+            with self._lock:
+                future = self._pending.pop(request_id, None)
+            if future:
+                future.set_result(msg)
+            return
+
+        if "event" in msg:
+            for handler in list(self.event_handlers):
+                try:
+                    handler(msg)
+                except Exception:
+                    pass  # A broken handler must not stop the reader
+
+    def _fail_pending(self):
+        with self._lock:
+            self.closed = True
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.set_exception(MpvError("mpv connection closed"))
+
+    def close(self):
+        """Close the socket and stop the reader; pending commands fail"""
+        with self._lock:
+            self.closed = True
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+        if self._reader is not threading.current_thread():
+            self._reader.join(timeout=1.0)
+        self._fail_pending()
@@ -8,26 +8,23 @@ sys.path.insert(0, str(Path.home() / ".deep-reading"))
 
 from processor.inspectional import generate_inspectional_report, save_report
 from db import get_connection
+from models import Note, NoteType, SourceType
+import repository
 
 def process_source(source_id: str):
     """Process a source and generate inspectional report"""
-    conn = get_connection()
-    row = conn.execute(
-        "SELECT * FROM sources WHERE id = ?",
-        (source_id,)
-    ).fetchone()
+    source = repository.cached_source(source_id)
 
-    if not row:
+    if not source:
         print(f"Source not found: {source_id}")
         sys.exit(1)
 
-    source = dict(row)
-    cache_path = Path(source["cache_path"])
-    source_type = source.get("type", "youtube")
+    cache_path = Path(source.cache_path)
+    source_type = source.type.value
 
     # Try different content files based on source type
     transcript = ""
-    if source_type == "pdf":
+    if source.type == SourceType.PDF:
         content_path = cache_path / "content.txt"
     else:
         content_path = cache_path / "transcript.txt"
@@ -35,28 +32,33 @@ def process_source(source_id: str):
     if content_path.exists():
         transcript = content_path.read_text()
 
-    print(f"Generating inspectional report for: {source['title']}")
+    print(f"Generating inspectional report for: {source.title}")
 
     # Generate report (without AI for now)
     report = generate_inspectional_report(
         source_id=source_id,
-        title=source["title"],
-        author=source["author"],
-        url=source["url"],
-        duration=source["duration"],
+        title=source.title,
+        author=source.author,
+        url=source.url,
+        duration=source.duration,
         transcript=transcript,
         source_type=source_type,
     )
 
     # Save to Obsidian
-    file_path = save_report(source_id, source["title"], report)
+    file_path = save_report(source_id, source.title, report)
 
     # Update database
-    conn.execute("""
-        INSERT OR REPLACE INTO notes (source_id, type, title, obsidian_path, status)
-        VALUES (?, 'source', ?, ?, 'draft')
-    """, (source_id, source["title"], str(file_path)))
-    conn.commit()
+    note = Note(
+        id=None,
+        source_id=source_id,
+        type=NoteType.SOURCE,
+        title=source.title,
+        obsidian_path=str(file_path),
+    )
+    conn = get_connection()
+    with conn:
+        repository.notes.upsert_many(conn, [note])
     conn.close()
 
     print(f"✓ Report saved to: {file_path}")
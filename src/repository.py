@@ -0,0 +1,393 @@
+"""Typed repository - database rows in, models dataclasses out
+
+All SQL for sources, chapters, marks and notes lives here, so query tuning
+happens in one place. Each statement is a fixed string, so sqlite3's
+per-connection statement cache compiles it once and reuses it; batch reads
+bind a JSON array to a single `IN (SELECT value FROM json_each(?))` query
+instead of one query per key.
+
+Reads default to the thread's long-lived db.connection(). Writes take the
+connection explicitly and run inside the caller's transaction (`with conn:`).
+
+cached_source() and source_metadata() serve hot sources from an in-process
+LRU cache. Writes made through this module drop the affected entries; writes
+from other connections or processes bump SQLite's data_version, which makes
+the next lookup re-check the cached rows.
+"""
+import json
+import sqlite3
+import threading
+from dataclasses import fields
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from cache import LRUCache
+from db import connection
+from models import (
+    Source, Chapter, Mark, Note,
+    SourceType, ProcessingState, ChapterType, MarkType, NoteType, NoteStatus,
+)
+
+
+def parse_timestamp(value) -> Optional[datetime]:
+    """SQLite CURRENT_TIMESTAMP text to datetime"""
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+def to_param(value):
+    """Python value to an SQLite parameter"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ", timespec="seconds")
+    return value
+
+
+# Source records and parsed metadata.json kept in memory, by source id
+SOURCE_CACHE_SIZE = 256
+
+_source_cache = LRUCache(SOURCE_CACHE_SIZE)
+_metadata_cache = LRUCache(SOURCE_CACHE_SIZE)
+_seen = threading.local()
+
+
+def invalidate(source_ids: Optional[Iterable[str]] = None):
+    """Drop cached sources and metadata; everything when source_ids is None"""
+    if source_ids is None:
+        _source_cache.clear()
+        _metadata_cache.clear()
+        return
+    for source_id in source_ids:
+        _source_cache.discard(source_id)
+        _metadata_cache.discard(source_id)
+
+
+def revalidate(conn: sqlite3.Connection):
+    """Drop cached sources that changed since this thread last looked
+
+    PRAGMA data_version only moves when another connection commits, so the
+    common case costs one pragma and no table reads. Otherwise the cached
+    rows are re-read in one query and compared whole, since updated_at only
+    has one-second resolution.
+    """
+    version = conn.execute("PRAGMA data_version").fetchone()[0]
+    if getattr(_seen, "conn", None) is conn and _seen.version == version:
+        return
+    _seen.conn, _seen.version = conn, version
+
+    cached_ids = _source_cache.keys()
+    if not cached_ids:
+        return
+    current = sources.get_many(cached_ids, conn)
+    invalidate([
+        source_id for source_id in cached_ids
+        if current.get(source_id) != _source_cache.peek(source_id)
+    ])
+
+
+class Repository:
+    """Typed reads and batched upserts for one table
+
+    columns are the dataclass fields stored in the table, in upsert
+    parameter order; converters turn column values into field values.
+    """
+
+    def __init__(
+        self,
+        model: type,
+        table: str,
+        columns: List[str],
+        upsert_sql: str,
+        converters: Dict[str, Callable],
+        order_by: str,
+        on_change: Optional[Callable] = None,
+    ):
+        self.model = model
+        self.table = table
+        self.columns = columns
+        self.upsert_sql = upsert_sql
+        self.converters = converters
+        self.on_change = on_change
+        self.fields = [f.name for f in fields(model)]
+        self.select_one = f"SELECT * FROM {table} WHERE id = ?"
+        self.select_many = f"SELECT * FROM {table} WHERE id IN (SELECT value FROM json_each(?))"
+        self.select_for_source = f"SELECT * FROM {table} WHERE source_id = ? ORDER BY {order_by}"
+        self.select_for_sources = (
+            f"SELECT * FROM {table} WHERE source_id IN (SELECT value FROM json_each(?)) "
+            f"ORDER BY source_id, {order_by}"
+        )
+
+    def from_row(self, row: sqlite3.Row):
+        """Build the dataclass from a row, ignoring columns it has no field for"""
+        keys = row.keys()
+        values = {}
+        for name in self.fields:
+            if name in keys:
+                value = row[name]
+                convert = self.converters.get(name)
+                values[name] = convert(value) if convert and value is not None else value
+        return self.model(**values)
+
+    def get(self, key, conn: Optional[sqlite3.Connection] = None):
+        """One item by id, or None"""
+        row = (conn or connection()).execute(self.select_one, (key,)).fetchone()
+        return self.from_row(row) if row else None
+
+    def get_many(self, keys: Iterable, conn: Optional[sqlite3.Connection] = None) -> dict:
+        """Items by id in one query; missing ids are absent from the result"""
+        rows = (conn or connection()).execute(self.select_many, (json.dumps(list(keys)),))
+        return {row["id"]: self.from_row(row) for row in rows}
+
+    def for_source(self, source_id: str, conn: Optional[sqlite3.Connection] = None) -> list:
+        """All items of one source, in table order"""
+        rows = (conn or connection()).execute(self.select_for_source, (source_id,))
+        return [self.from_row(row) for row in rows]
+
+    def for_sources(self, source_ids: Iterable[str], conn: Optional[sqlite3.Connection] = None) -> dict:
+        """Items of many sources in one query, grouped by source id"""
+        grouped = {source_id: [] for source_id in source_ids}
+        rows = (conn or connection()).execute(self.select_for_sources, (json.dumps(list(grouped)),))
+        for row in rows:
+            grouped[row["source_id"]].append(self.from_row(row))
+        return grouped
+
+    def upsert_many(self, conn: sqlite3.Connection, items: Iterable) -> list:
+        """Insert or update items; returns the ones that changed a row
+
+        Items with id=None are inserted and get their new id assigned.
+        """
+        changed = []
+        for item in items:
+            params = [to_param(getattr(item, column)) for column in self.columns]
+            cursor = conn.execute(self.upsert_sql, params)
+            if cursor.rowcount:
+                if "id" in self.columns and item.id is None:
+                    item.id = cursor.lastrowid
+                changed.append(item)
+        if changed and self.on_change:
+            self.on_change([item.id for item in changed])
+        return changed
+
+
+sources = Repository(
+    Source,
+    "sources",
+    ["id", "type", "url", "title", "author", "duration", "cache_path",
+     "processing_state", "fingerprint"],
+    # Unchanged fingerprints leave the row alone, keeping created_at and state
+    """
+        INSERT INTO sources
+        (id, type, url, title, author, duration, cache_path, processing_state, fingerprint)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            url = excluded.url,
+            title = excluded.title,
+            author = excluded.author,
+            duration = excluded.duration,
+            cache_path = excluded.cache_path,
+            processing_state = excluded.processing_state,
+            fingerprint = excluded.fingerprint,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE sources.fingerprint IS NOT excluded.fingerprint
+            OR excluded.fingerprint IS NULL
+            OR sources.processing_state IN ('pending', 'error')
+    """,
+    {
+        "type": SourceType,
+        "processing_state": ProcessingState,
+        "created_at": parse_timestamp,
+        "updated_at": parse_timestamp,
+    },
+    "created_at",
+    on_change=invalidate,
+)
+
+chapters = Repository(
+    Chapter,
+    "chapters",
+    ["id", "source_id", "start_time", "end_time", "title", "type"],
+    """
+        INSERT INTO chapters (id, source_id, start_time, end_time, title, type)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            start_time = excluded.start_time,
+            end_time = excluded.end_time,
+            title = excluded.title,
+            type = excluded.type
+    """,
+    {"type": ChapterType},
+    "start_time",
+)
+
+marks = Repository(
+    Mark,
+    "marks",
+    ["id", "source_id", "timestamp", "type", "content", "created_at"],
+    """
+        INSERT INTO marks (id, source_id, timestamp, type, content, created_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            timestamp = excluded.timestamp,
+            type = excluded.type,
+            content = excluded.content
+    """,
+    {"type": MarkType, "created_at": parse_timestamp},
+    "timestamp",
+)
+
+notes = Repository(
+    Note,
+    "notes",
+    ["id", "source_id", "type", "title", "content", "obsidian_path", "status"],
+    """
+        INSERT INTO notes (id, source_id, type, title, content, obsidian_path, status)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            type = excluded.type,
+            title = excluded.title,
+            content = excluded.content,
+            obsidian_path = excluded.obsidian_path,
+            status = excluded.status,
+            updated_at = CURRENT_TIMESTAMP
+    """,
+    {
+        "type": NoteType,
+        "status": NoteStatus,
+        "created_at": parse_timestamp,
+        "updated_at": parse_timestamp,
+    },
+    "created_at",
+)
+
+
+def cached_source(source_id: str) -> Optional[Source]:
+    """sources.get() through the LRU cache; treat the result as read-only"""
+    conn = connection()
+    revalidate(conn)
+    source = _source_cache.get(source_id)
+    if source is None:
+        source = sources.get(source_id, conn)
+        if source:
+            _source_cache.put(source_id, source)
+    return source
+
+
+def source_metadata(source_id: str) -> dict:
+    """Parsed metadata.json of a cached source, or {} if there is none"""
+    source = cached_source(source_id)
+    if not source or not source.cache_path:
+        return {}
+    metadata = _metadata_cache.get(source_id)
+    if metadata is None:
+        metadata_path = Path(source.cache_path) / "metadata.json"
+        metadata = json.loads(metadata_path.read_text()) if metadata_path.exists() else {}
+        _metadata_cache.put(source_id, metadata)
+    return metadata
+
+
+def cache_stats() -> dict:
+    """Hit/miss counters of the source and metadata caches"""
+    return {"sources": _source_cache.stats(), "metadata": _metadata_cache.stats()}
+
+
+def list_sources(conn: Optional[sqlite3.Connection] = None) -> List[Source]:
+    """Every source, newest first"""
+    rows = (conn or connection()).execute("SELECT * FROM sources ORDER BY created_at DESC")
+    return [sources.from_row(row) for row in rows]
+
+
+def fetched_ids(source_type: SourceType, conn: Optional[sqlite3.Connection] = None) -> set:
+    """IDs of sources of one type that were fetched, or are queued, without error"""
+    rows = (conn or connection()).execute(
+        "SELECT id FROM sources WHERE type = ? AND processing_state != ?",
+        (source_type.value, ProcessingState.ERROR.value),
+    )
+    return {row["id"] for row in rows}
+
+
+def stored_fingerprints(conn: Optional[sqlite3.Connection] = None) -> Dict[str, str]:
+    """Fingerprints of every successfully fetched source, by id"""
+    rows = (conn or connection()).execute("""
+        SELECT id, fingerprint FROM sources
+        WHERE fingerprint IS NOT NULL AND processing_state NOT IN (?, ?)
+    """, (ProcessingState.PENDING.value, ProcessingState.ERROR.value))
+    return {row["id"]: row["fingerprint"] for row in rows}
+
+
+def set_state(conn: sqlite3.Connection, source_id: str, state: ProcessingState):
+    """Update a source's processing state"""
+    conn.execute("""
+        UPDATE sources SET processing_state = ?, updated_at = CURRENT_TIMESTAMP
+        WHERE id = ?
+    """, (to_param(state), source_id))
+    invalidate([source_id])
+
+
+def save_fetched(conn: sqlite3.Connection, source: Source):
+    """Store what a fetch learned about a queued source, including its state"""
+    conn.execute("""
+        UPDATE sources
+        SET url = ?, title = ?, author = ?, duration = ?, cache_path = ?,
+            processing_state = ?, fingerprint = ?, updated_at = CURRENT_TIMESTAMP
+        WHERE id = ?
+    """, (source.url, source.title, source.author, source.duration, source.cache_path,
+          to_param(source.processing_state), source.fingerprint, source.id))
+    invalidate([source.id])
+
+
+def enqueue_sources(conn: sqlite3.Connection, queued: Iterable[Source]):
+    """Add PENDING rows; sources that failed before are queued again"""
+    queued = list(queued)
+    conn.executemany("""
+        INSERT INTO sources (id, type, url, processing_state)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            processing_state = excluded.processing_state,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE sources.processing_state = ?
+    """, [
+        (s.id, to_param(s.type), s.url, ProcessingState.PENDING.value, ProcessingState.ERROR.value)
+        for s in queued
+    ])
+    invalidate(s.id for s in queued)
+
+
+def requeue_stale(conn: sqlite3.Connection) -> int:
+    """Return sources left mid-flight to PENDING; returns how many"""
+    cursor = conn.execute("""
+        UPDATE sources SET processing_state = ?, updated_at = CURRENT_TIMESTAMP
+        WHERE processing_state IN (?, ?)
+    """, (ProcessingState.PENDING.value, ProcessingState.DOWNLOADING.value,
+          ProcessingState.PROCESSING.value))
+    invalidate()
+    return cursor.rowcount
+
+
+def claim_pending(conn: sqlite3.Connection) -> Optional[Source]:
+    """Atomically move the oldest PENDING source to DOWNLOADING and return it
+
+    Manages its own write transaction, so call it outside `with conn:`.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute("""
+            SELECT * FROM sources
+            WHERE processing_state = ?
+            ORDER BY created_at, id
+            LIMIT 1
+        """, (ProcessingState.PENDING.value,)).fetchone()
+        if row:
+            set_state(conn, row["id"], ProcessingState.DOWNLOADING)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    if not row:
+        return None
+    source = sources.from_row(row)
+    source.processing_state = ProcessingState.DOWNLOADING
+    return source
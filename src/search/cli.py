@@ -0,0 +1,132 @@
+"""Search CLI - ranked full-text search over sources, content and notes"""
+import sys
+import argparse
+import sqlite3
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path.home() / ".deep-reading"))
+
+from player.mpv_controller import format_time
+from search.index import reindex_all
+from db import connection, init_db
+
+SNIPPET_TOKENS = 16
+
+
+def fts_query(text: str) -> str:
+    """Quote each word so punctuation is matched literally, not as FTS syntax"""
+    return " ".join('"' + word.replace('"', '""') + '"' for word in text.split())
+
+
+def search(query: str, limit: int = 10, raw: bool = False) -> dict:
+    """Best matches per table, ranked by bm25
+
+    Returns {"sources": [...], "content": [...], "notes": [...]} of dicts.
+    raw=True passes the query through as FTS5 syntax (OR, NEAR, prefix*).
+    """
+    match = query if raw else fts_query(query)
+    conn = connection()
+
+    sources = conn.execute("""
+        SELECT source_id, highlight(sources_fts, 1, '[', ']') AS title,
+               highlight(sources_fts, 2, '[', ']') AS author
+        FROM sources_fts WHERE sources_fts MATCH ?
+        ORDER BY rank LIMIT ?
+    """, (match, limit)).fetchall()
+
+    content = conn.execute(f"""
+        SELECT c.source_id, c.locator, s.type, s.title,
+               snippet(content_fts, 0, '[', ']', '…', {SNIPPET_TOKENS}) AS snippet
+        FROM content_fts
+        JOIN content_chunks c ON c.id = content_fts.rowid
+        LEFT JOIN sources s ON s.id = c.source_id
+        WHERE content_fts MATCH ?
+        ORDER BY content_fts.rank LIMIT ?
+    """, (match, limit)).fetchall()
+
+    notes = conn.execute(f"""
+        SELECT n.id, n.source_id, n.title,
+               snippet(notes_fts, 1, '[', ']', '…', {SNIPPET_TOKENS}) AS snippet
+        FROM notes_fts
+        JOIN notes n ON n.id = notes_fts.rowid
+        WHERE notes_fts MATCH ?
+        ORDER BY notes_fts.rank LIMIT ?
+    """, (match, limit)).fetchall()
+
+    return {
+        "sources": [dict(row) for row in sources],
+        "content": [dict(row) for row in content],
+        "notes": [dict(row) for row in notes],
+    }
+
+
+def format_locator(source_type: str, locator) -> str:
+    """Where a chunk sits: 'p. 12' for PDFs, a timestamp for transcripts"""
+    if locator is None:
+        return ""
+    if source_type == "pdf":
+        return f"p. {int(locator)}"
+    return format_time(locator)
+
+
+def print_results(results: dict):
+    """Print search results grouped by table"""
+    if not any(results.values()):
+        print("No matches.")
+        return
+
+    if results["sources"]:
+        print("Sources:\n")
+        for row in results["sources"]:
+            print(f"  [{row['source_id']}] {row['title']}")
+            print(f"    by {row['author']}")
+        print()
+
+    if results["content"]:
+        print("Content:\n")
+        for row in results["content"]:
+            locator = format_locator(row["type"], row["locator"])
+            print(f"  [{row['source_id']}] {row['title'] or ''} {locator}".rstrip())
+            print(f"    {row['snippet']}")
+        print()
+
+    if results["notes"]:
+        print("Notes:\n")
+        for row in results["notes"]:
+            print(f"  [{row['source_id'] or '-'}] {row['title']}")
+            print(f"    {row['snippet']}")
+        print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search cached content and notes")
+    parser.add_argument("query", nargs="*", help="Words or phrase to find")
+    parser.add_argument("--limit", type=int, default=10, help="Results per section")
+    parser.add_argument("--raw", action="store_true",
+                        help="Use FTS5 query syntax (OR, NEAR, prefix*) as typed")
+    parser.add_argument("--reindex", action="store_true",
+                        help="Rebuild the search index from the cache")
+    args = parser.parse_args()
+
+    init_db()
+
+    if args.reindex:
+        sources, chunks = reindex_all(connection())
+        print(f"Indexed {chunks} chunks from {sources} sources")
+        if not args.query:
+            return
+
+    if not args.query:
+        parser.error("a search query is required")
+
+    try:
+        results = search(" ".join(args.query), limit=args.limit, raw=args.raw)
+    except sqlite3.OperationalError as e:
+        print(f"Invalid search query: {e}")
+        sys.exit(1)
+    print_results(results)
+
+
+if __name__ == "__main__":
+    main()
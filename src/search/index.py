@@ -0,0 +1,105 @@
+"""Full-text index maintenance for cached transcripts and PDF text
+
+Source titles and notes are indexed by triggers in db.py. Content is split
+into chunks at ingest: groups of transcript cues located by start time,
+and PDF pages located by page number.
+"""
+import re
+import sqlite3
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+import repository
+from fetcher.youtube import iter_cue_file
+
+# Transcript cues per chunk, roughly a minute of speech
+CUES_PER_CHUNK = 20
+PAGE_MARKER_RE = re.compile(r"^--- Page (\d+) ---$")
+
+
+def iter_transcript_chunks(cache_dir: Path) -> Iterator[Tuple[Optional[float], str]]:
+    """Yield (start_seconds, text) per group of cues; no times without a cue file"""
+    cues_path = cache_dir / "transcript.cues"
+    txt_path = cache_dir / "transcript.txt"
+
+    if cues_path.exists():
+        start, lines = None, []
+        for cue_start, _, text in iter_cue_file(cues_path):
+            if start is None:
+                start = cue_start
+            lines.append(text)
+            if len(lines) == CUES_PER_CHUNK:
+                yield start, " ".join(lines)
+                start, lines = None, []
+        if lines:
+            yield start, " ".join(lines)
+
+    elif txt_path.exists():
+        lines = []
+        with open(txt_path, "r", encoding="utf-8") as f:
+            for line in f:
+                lines.append(line.strip())
+                if len(lines) == CUES_PER_CHUNK:
+                    yield None, " ".join(lines)
+                    lines = []
+        if lines:
+            yield None, " ".join(lines)
+
+
+def iter_pdf_chunks(cache_dir: Path) -> Iterator[Tuple[int, str]]:
+    """Yield (page_num, text) for each page of content.txt"""
+    txt_path = cache_dir / "content.txt"
+    if not txt_path.exists():
+        return
+
+    page, lines = None, []
+    with open(txt_path, "r", encoding="utf-8") as f:
+        for line in f:
+            match = PAGE_MARKER_RE.match(line.rstrip("\n"))
+            if match:
+                if page is not None and "".join(lines).strip():
+                    yield page, "".join(lines).strip()
+                page, lines = int(match.group(1)), []
+            else:
+                lines.append(line)
+    if page is not None and "".join(lines).strip():
+        yield page, "".join(lines).strip()
+
+
+def iter_chunks(source_type: str, cache_path: str) -> Iterator[Tuple[Optional[float], str]]:
+    """Chunks of a source's cached text"""
+    if not cache_path:
+        return iter(())
+    cache_dir = Path(cache_path)
+    if source_type == "pdf":
+        return iter_pdf_chunks(cache_dir)
+    return iter_transcript_chunks(cache_dir)
+
+
+def index_content(conn: sqlite3.Connection, source_id: str, source_type: str, cache_path: str) -> int:
+    """Replace a source's content chunks; returns the number indexed
+
+    Runs inside the caller's transaction.
+    """
+    conn.execute("DELETE FROM content_chunks WHERE source_id = ?", (source_id,))
+    count = 0
+    for locator, text in iter_chunks(source_type, cache_path):
+        conn.execute(
+            "INSERT INTO content_chunks (source_id, locator, text) VALUES (?, ?, ?)",
+            (source_id, locator, text),
+        )
+        count += 1
+    return count
+
+
+def reindex_all(conn: sqlite3.Connection) -> Tuple[int, int]:
+    """Rebuild every full-text table from scratch; returns (sources, chunks)"""
+    sources = repository.list_sources(conn)
+    chunks = 0
+    with conn:
+        conn.execute("DELETE FROM sources_fts")
+        conn.execute("INSERT INTO sources_fts (source_id, title, author) SELECT id, title, author FROM sources")
+        conn.execute("INSERT INTO notes_fts (notes_fts) VALUES ('rebuild')")
+        for source in sources:
+            chunks += index_content(conn, source.id, source.type.value, source.cache_path)
+    return len(sources), chunks
@@ -0,0 +1,114 @@
+"""Time-indexed transcript lookup
+
+The index maps cue start times to byte offsets in transcript.txt, so text
+at a mark's timestamp or between chapter bounds is found by bisecting the
+start times and reading one slice of the file.
+
+File layout: a little-endian header, then three native-order arrays of
+`count` start times (double), `count` end times (double) and `count + 1`
+byte offsets (uint64, the last one being the end of the text).
+"""
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Optional
+
+MAGIC = b"DRTI"
+VERSION = 1
+HEADER = struct.Struct("<4sII")  # magic, version, count
+
+
+class TranscriptIndex:
+    """Sorted cue start times with byte offsets into transcript.txt"""
+
+    def __init__(self, txt_path: Path, starts: array, ends: array, offsets: array):
+        self.txt_path = Path(txt_path)
+        self.starts = starts
+        self.ends = ends
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @classmethod
+    def build(cls, cues_path: Path, txt_path: Path, index_path: Path) -> "TranscriptIndex":
+        """Build the index from a cue file whose lines match transcript.txt"""
+        starts, ends, offsets = array("d"), array("d"), array("Q", [0])
+
+        with open(cues_path, "r", encoding="utf-8") as f:
+            for line in f:
+                start, end, text = line.rstrip("\n").split("\t", 2)
+                starts.append(float(start))
+                ends.append(float(end))
+                # Each transcript line is followed by "\n" except the last
+                offsets.append(offsets[-1] + len(text.encode("utf-8")) + 1)
+
+        if len(starts):
+            offsets[-1] -= 1
+
+        with open(index_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(starts)))
+            starts.tofile(f)
+            ends.tofile(f)
+            offsets.tofile(f)
+
+        return cls(txt_path, starts, ends, offsets)
+
+    @classmethod
+    def load(cls, index_path: Path, txt_path: Path) -> "TranscriptIndex":
+        """Load a previously built index"""
+        with open(index_path, "rb") as f:
+            magic, version, count = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"Not a transcript index: {index_path}")
+
+            starts, ends, offsets = array("d"), array("d"), array("Q")
+            starts.fromfile(f, count)
+            ends.fromfile(f, count)
+            offsets.fromfile(f, count + 1)
+
+        return cls(txt_path, starts, ends, offsets)
+
+    def _read(self, first: int, last: int) -> str:
+        """Read transcript lines first..last-1 with a single seek"""
+        if first >= last:
+            return ""
+        with open(self.txt_path, "rb") as f:
+            f.seek(self.offsets[first])
+            data = f.read(self.offsets[last] - self.offsets[first])
+        return data.decode("utf-8").rstrip("\n")
+
+    def cue_at(self, seconds: float) -> Optional[int]:
+        """Index of the last cue starting at or before `seconds`"""
+        i = bisect_right(self.starts, seconds) - 1
+        return i if i >= 0 else None
+
+    def text_at(self, seconds: float) -> str:
+        """Transcript line being spoken at `seconds`"""
+        i = self.cue_at(seconds)
+        if i is None:
+            return ""
+        return self._read(i, i + 1)
+
+    def text_between(self, start: float, end: float) -> str:
+        """Transcript text from `start` up to `end`, e.g. a chapter's bounds"""
+        first = self.cue_at(start)
+        if first is None or self.ends[first] <= start:
+            first = bisect_left(self.starts, start)
+        last = bisect_left(self.starts, end)
+        return self._read(first, last)
+
+
+def load_transcript_index(cache_dir: Path) -> Optional[TranscriptIndex]:
+    """Load a source's transcript index, building it from the cue file if missing"""
+    cache_dir = Path(cache_dir)
+    txt_path = cache_dir / "transcript.txt"
+    cues_path = cache_dir / "transcript.cues"
+    index_path = cache_dir / "transcript.idx"
+
+    if index_path.exists():
+        return TranscriptIndex.load(index_path, txt_path)
+    if cues_path.exists() and txt_path.exists():
+        return TranscriptIndex.build(cues_path, txt_path, index_path)
+    return None
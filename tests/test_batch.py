@@ -0,0 +1,204 @@
+"""Tests for fetcher/batch.py"""
+import pytest
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+
+def import_batch():
+    if 'fetcher.batch' in sys.modules:
+        del sys.modules['fetcher.batch']
+    import fetcher.batch
+    return fetcher.batch
+
+
+class TestPlaylistDetection:
+    """Tests for is_playlist_url and expand_urls"""
+
+    def test_is_playlist_url(self):
+        """Test playlist and channel URLs are detected, videos are not"""
+        batch = import_batch()
+
+        assert batch.is_playlist_url("https://www.youtube.com/playlist?list=PL123")
+        assert batch.is_playlist_url("https://www.youtube.com/@SomeChannel/videos")
+        assert batch.is_playlist_url("https://www.youtube.com/channel/UC123")
+        assert not batch.is_playlist_url("https://www.youtube.com/watch?v=abc&list=PL123")
+        assert not batch.is_playlist_url("https://youtu.be/abc")
+        assert not batch.is_playlist_url("/tmp/book.pdf")
+
+    def test_expand_urls_expands_playlists_and_dedupes(self):
+        """Test playlist expansion with duplicate removal"""
+        batch = import_batch()
+
+        mock_result = MagicMock()
+        mock_result.returncode = 0
+        mock_result.stdout = "https://www.youtube.com/watch?v=a\nhttps://www.youtube.com/watch?v=b\n"
+
+        with patch('subprocess.run', return_value=mock_result) as run_mock:
+            urls, failures = batch.expand_urls([
+                "https://www.youtube.com/watch?v=a",
+                "https://www.youtube.com/playlist?list=PL123",
+            ])
+
+        assert urls == ["https://www.youtube.com/watch?v=a", "https://www.youtube.com/watch?v=b"]
+        assert failures == []
+        assert "--flat-playlist" in run_mock.call_args[0][0]
+
+    def test_expand_urls_expands_nested_playlists(self):
+        """Test that a channel's tabs are expanded into their videos"""
+        batch = import_batch()
+
+        listings = {
+            "https://www.youtube.com/@name": [
+                "https://www.youtube.com/@name/videos", "https://www.youtube.com/@name/shorts",
+            ],
+            "https://www.youtube.com/@name/videos": [
+                "https://www.youtube.com/watch?v=a", "https://www.youtube.com/watch?v=b",
+            ],
+            "https://www.youtube.com/@name/shorts": [
+                "https://www.youtube.com/shorts/c", "https://www.youtube.com/watch?v=a",
+            ],
+        }
+
+        def flat_playlist(args, **kwargs):
+            return MagicMock(returncode=0, stdout="\n".join(listings[args[-1]]) + "\n")
+
+        with patch('subprocess.run', side_effect=flat_playlist) as run_mock:
+            urls, failures = batch.expand_urls(["https://www.youtube.com/@name"])
+
+        assert urls == [
+            "https://www.youtube.com/watch?v=a",
+            "https://www.youtube.com/watch?v=b",
+            "https://www.youtube.com/shorts/c",
+        ]
+        assert failures == []
+        assert run_mock.call_count == 3
+
+    def test_expand_urls_retries_and_reports_failed_playlists(self):
+        """Test that a playlist that keeps failing is reported, not raised"""
+        batch = import_batch()
+
+        mock_result = MagicMock()
+        mock_result.returncode = 1
+        mock_result.stderr = "HTTP Error 503"
+
+        with patch('subprocess.run', return_value=mock_result) as run_mock:
+            with patch('time.sleep'):
+                urls, failures = batch.expand_urls([
+                    "https://www.youtube.com/playlist?list=PL123",
+                    "https://youtu.be/a",
+                ], retries=1)
+
+        assert urls == ["https://youtu.be/a"]
+        assert run_mock.call_count == 2
+        assert failures[0][0] == "https://www.youtube.com/playlist?list=PL123"
+        assert "HTTP Error 503" in str(failures[0][1])
+
+    def test_expand_playlist_failure(self):
+        """Test playlist expansion failure raises exception"""
+        batch = import_batch()
+
+        mock_result = MagicMock()
+        mock_result.returncode = 1
+        mock_result.stderr = "not found"
+
+        with patch('subprocess.run', return_value=mock_result):
+            with pytest.raises(Exception, match="Failed to expand playlist"):
+                batch.expand_playlist("https://www.youtube.com/playlist?list=PL123")
+
+
+class TestReadBatchFile:
+    """Tests for read_batch_file function"""
+
+    def test_skips_blank_lines_and_comments(self, temp_dir):
+        """Test that blank lines and comments are ignored"""
+        batch = import_batch()
+
+        batch_file = temp_dir / "urls.txt"
+        batch_file.write_text("# course\nhttps://youtu.be/a\n\n  https://youtu.be/b  \n")
+
+        assert batch.read_batch_file(str(batch_file)) == ["https://youtu.be/a", "https://youtu.be/b"]
+
+
+class TestHostKey:
+    """Tests for host_key function"""
+
+    def test_youtube_hosts_share_key(self):
+        """Test that YouTube URL variants share one concurrency key"""
+        batch = import_batch()
+
+        assert batch.host_key("https://www.youtube.com/watch?v=a") == "youtube.com"
+        assert batch.host_key("https://youtu.be/a") == "youtube.com"
+        assert batch.host_key("https://m.youtube.com/watch?v=a") == "youtube.com"
+        assert batch.host_key("/tmp/book.pdf") == "local"
+
+
+class TestFetchMany:
+    """Tests for fetch_with_retry and fetch_many"""
+
+    def test_retry_with_backoff(self):
+        """Test that failures are retried with exponential backoff"""
+        batch = import_batch()
+
+        fetch_one = MagicMock(side_effect=[Exception("boom"), Exception("boom"), "ok"])
+
+        with patch('time.sleep') as sleep_mock:
+            assert batch.fetch_with_retry(fetch_one, "u", retries=2, backoff=1.0) == "ok"
+
+        assert [c[0][0] for c in sleep_mock.call_args_list] == [1.0, 2.0]
+
+    def test_retry_gives_up(self):
+        """Test that the last error is raised once retries are exhausted"""
+        batch = import_batch()
+
+        fetch_one = MagicMock(side_effect=Exception("boom"))
+
+        with patch('time.sleep'):
+            with pytest.raises(Exception, match="boom"):
+                batch.fetch_with_retry(fetch_one, "u", retries=1)
+
+        assert fetch_one.call_count == 2
+
+    def test_fetch_many_collects_results_and_failures(self):
+        """Test results keep input order and failures are reported"""
+        batch = import_batch()
+
+        def fetch_one(url):
+            if url.endswith("bad"):
+                raise Exception("broken")
+            return url.upper()
+
+        results, failures, elapsed = batch.fetch_many(
+            ["https://a.com/1", "https://a.com/bad", "https://b.com/2"],
+            fetch_one, workers=3, retries=0,
+        )
+
+        assert results == ["HTTPS://A.COM/1", "HTTPS://B.COM/2"]
+        assert failures[0][0] == "https://a.com/bad"
+        assert elapsed >= 0
+
+    def test_fetch_many_respects_per_host_limit(self):
+        """Test that at most per_host fetches run against one host"""
+        batch = import_batch()
+
+        lock = threading.Lock()
+        active = {"now": 0, "peak": 0}
+
+        def fetch_one(url):
+            with lock:
+                active["now"] += 1
+                active["peak"] = max(active["peak"], active["now"])
+            time.sleep(0.02)
+            with lock:
+                active["now"] -= 1
+            return url
+
+        urls = [f"https://youtube.com/watch?v={i}" for i in range(8)]
+        results, failures, _ = batch.fetch_many(urls, fetch_one, workers=8, per_host=2)
+
+        assert len(results) == 8
+        assert active["peak"] <= 2
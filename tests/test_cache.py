@@ -0,0 +1,47 @@
+"""Tests for cache.py"""
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from cache import LRUCache
+
+
+class TestLRUCache:
+    """Tests for LRUCache"""
+
+    def test_evicts_least_recently_used(self):
+        """Test that reading an entry protects it from eviction"""
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert cache.keys() == ["a", "c"]
+        assert cache.evictions == 1
+
+    def test_counts_hits_and_misses(self):
+        """Test the counters reported by stats"""
+        cache = LRUCache()
+        cache.put("a", 1)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.peek("a") == 1
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+        assert stats["hit_rate"] == 0.5
+
+    def test_discard_and_clear(self):
+        """Test that removed entries miss"""
+        cache = LRUCache()
+        cache.put("a", 1)
+        cache.put("b", 2)
+
+        cache.discard("a")
+        cache.discard("missing")
+        assert cache.get("a") is None
+        cache.clear()
+        assert len(cache) == 0
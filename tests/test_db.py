@@ -45,6 +45,69 @@ class TestGetConnection:
         conn.close()
 
 
+class TestConnection:
+    """Tests for pragmas and the thread-local connection"""
+
+    def load_db(self, temp_dir, monkeypatch):
+        mock_config = MagicMock()
+        mock_config.DB_PATH = temp_dir / "test.db"
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        if 'db' in sys.modules:
+            del sys.modules['db']
+        import db
+        return db
+
+    def test_connections_use_wal_and_pragmas(self, temp_dir, monkeypatch):
+        """Test that every connection gets WAL and the tuned pragmas"""
+        db = self.load_db(temp_dir, monkeypatch)
+
+        conn = db.get_connection()
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -16000
+        conn.close()
+
+    def test_connection_is_reused_per_thread(self, temp_dir, monkeypatch):
+        """Test that connection() returns one connection per thread"""
+        import threading
+        db = self.load_db(temp_dir, monkeypatch)
+
+        main_conn = db.connection()
+        assert db.connection() is main_conn
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(db.connection()))
+        thread.start()
+        thread.join()
+        assert other[0] is not main_conn
+
+        db.close_connection()
+        assert db.connection() is not main_conn
+        db.close_connection()
+
+    def test_reader_not_blocked_by_open_write(self, temp_dir, monkeypatch):
+        """Test that a reader sees committed rows while a write is in progress"""
+        db = self.load_db(temp_dir, monkeypatch)
+        db.init_db()
+
+        writer = db.get_connection()
+        writer.execute("INSERT INTO sources (id, type) VALUES ('a', 'pdf')")
+        writer.commit()
+        writer.execute("BEGIN IMMEDIATE")
+        writer.execute("INSERT INTO sources (id, type) VALUES ('b', 'pdf')")
+
+        reader = db.get_connection()
+        ids = [r["id"] for r in reader.execute("SELECT id FROM sources").fetchall()]
+        assert ids == ["a"]
+
+        writer.commit()
+        writer.close()
+        reader.close()
+
+
 class TestInitDb:
     """Tests for init_db function"""
 
@@ -119,6 +182,97 @@ class TestInitDb:
         init_db()
         init_db()
 
+    def test_init_db_adds_fingerprint_to_old_sources(self, temp_dir, monkeypatch):
+        """Test that a sources table from an older schema gains the fingerprint column"""
+        db_path = temp_dir / "test.db"
+
+        conn = sqlite3.connect(str(db_path))
+        conn.execute("""
+            CREATE TABLE sources (
+                id TEXT PRIMARY KEY,
+                type TEXT NOT NULL,
+                url TEXT,
+                title TEXT,
+                author TEXT,
+                duration INTEGER,
+                cache_path TEXT,
+                processing_state TEXT DEFAULT 'pending',
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        conn.commit()
+        conn.close()
+
+        mock_config = MagicMock()
+        mock_config.DB_PATH = db_path
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        if 'db' in sys.modules:
+            del sys.modules['db']
+        from db import init_db, get_connection
+
+        init_db()
+
+        conn = get_connection()
+        columns = [row["name"] for row in conn.execute("PRAGMA table_info(sources)")]
+        conn.close()
+        assert "fingerprint" in columns
+
+
+class TestMigrations:
+    """Tests for versioned schema migrations"""
+
+    def load_db(self, temp_dir, monkeypatch):
+        mock_config = MagicMock()
+        mock_config.DB_PATH = temp_dir / "test.db"
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        if 'db' in sys.modules:
+            del sys.modules['db']
+        import db
+        return db
+
+    def test_init_db_sets_user_version(self, temp_dir, monkeypatch):
+        """Test that a new database ends at the latest schema version"""
+        db = self.load_db(temp_dir, monkeypatch)
+        db.init_db()
+
+        conn = db.get_connection()
+        assert db.schema_version(conn) == db.SCHEMA_VERSION
+        indexes = {r["name"] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+        conn.close()
+        for name in ["idx_marks_source_time", "idx_chapters_source_start",
+                     "idx_sources_created", "idx_links_from", "idx_links_to"]:
+            assert name in indexes
+
+    def test_current_database_skips_ddl(self, temp_dir, monkeypatch):
+        """Test that init_db runs no migration when the schema is current"""
+        db = self.load_db(temp_dir, monkeypatch)
+        db.init_db()
+
+        # A new process: the per-process check is empty, user_version is not
+        db._migrated.clear()
+        with patch.object(db, "migrate") as mock_migrate:
+            db.init_db()
+        mock_migrate.assert_not_called()
+
+    def test_only_pending_migrations_run(self, temp_dir, monkeypatch):
+        """Test that a database at version 1 only gets the later steps"""
+        db = self.load_db(temp_dir, monkeypatch)
+        conn = db.get_connection()
+        db.migrate_base_schema(conn)
+        conn.execute("PRAGMA user_version = 1")
+        conn.commit()
+
+        base = MagicMock()
+        monkeypatch.setattr(db, "MIGRATIONS", [base, *db.MIGRATIONS[1:]])
+        assert db.migrate(conn) == db.SCHEMA_VERSION
+        base.assert_not_called()
+        indexes = {r["name"] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+        conn.close()
+        assert "idx_links_to" in indexes
+
 
 class TestDbMain:
     """Tests for db.py __main__ block"""
@@ -17,7 +17,7 @@ class TestDetectSourceType:
         mock_config.DB_PATH = temp_dir / "db" / "test.db"
         monkeypatch.setitem(sys.modules, 'config', mock_config)
 
-        for mod in ['fetcher.cli', 'fetcher.youtube', 'db', 'models']:
+        for mod in ['fetcher.cli', 'fetcher.youtube', 'db', 'models', 'repository']:
             if mod in sys.modules:
                 del sys.modules[mod]
 
@@ -32,7 +32,7 @@ class TestDetectSourceType:
         mock_config.DB_PATH = temp_dir / "db" / "test.db"
         monkeypatch.setitem(sys.modules, 'config', mock_config)
 
-        for mod in ['fetcher.cli', 'fetcher.youtube', 'db', 'models']:
+        for mod in ['fetcher.cli', 'fetcher.youtube', 'db', 'models', 'repository']:
             if mod in sys.modules:
                 del sys.modules[mod]
 
@@ -47,7 +47,7 @@ class TestDetectSourceType:
         mock_config.DB_PATH = temp_dir / "db" / "test.db"
         monkeypatch.setitem(sys.modules, 'config', mock_config)
 
-        for mod in ['fetcher.cli', 'fetcher.youtube', 'db', 'models']:
+        for mod in ['fetcher.cli', 'fetcher.youtube', 'db', 'models', 'repository']:
             if mod in sys.modules:
                 del sys.modules[mod]
 
@@ -62,7 +62,7 @@ class TestDetectSourceType:
         mock_config.DB_PATH = temp_dir / "db" / "test.db"
         monkeypatch.setitem(sys.modules, 'config', mock_config)
 
-        for mod in ['fetcher.cli', 'fetcher.youtube', 'db', 'models']:
+        for mod in ['fetcher.cli', 'fetcher.youtube', 'db', 'models', 'repository']:
             if mod in sys.modules:
                 del sys.modules[mod]
 
@@ -77,7 +77,7 @@ class TestDetectSourceType:
         mock_config.DB_PATH = temp_dir / "db" / "test.db"
         monkeypatch.setitem(sys.modules, 'config', mock_config)
 
-        for mod in ['fetcher.cli', 'fetcher.youtube', 'db', 'models']:
+        for mod in ['fetcher.cli', 'fetcher.youtube', 'db', 'models', 'repository']:
             if mod in sys.modules:
                 del sys.modules[mod]
 
@@ -100,7 +100,7 @@ class TestFetch:
 
         # Clear modules
         for mod in list(sys.modules.keys()):
-            if mod.startswith('fetcher') or mod in ['db', 'models']:
+            if mod.startswith('fetcher') or mod in ['db', 'models', 'repository']:
                 del sys.modules[mod]
 
         # Mock fetch_youtube
@@ -139,7 +139,7 @@ class TestFetch:
         monkeypatch.setitem(sys.modules, 'config', mock_config)
 
         for mod in list(sys.modules.keys()):
-            if mod.startswith('fetcher') or mod in ['db', 'models']:
+            if mod.startswith('fetcher') or mod in ['db', 'models', 'repository']:
                 del sys.modules[mod]
 
         from fetcher.cli import fetch
@@ -154,6 +154,89 @@ class TestFetch:
         assert "not yet implemented" in captured.out
 
 
+class TestFetchBatch:
+    """Tests for fetch_batch function"""
+
+    def test_fetch_batch_saves_all_rows(self, monkeypatch, temp_dir, capsys):
+        """Test batch fetch writes every fetched source and reports failures"""
+        mock_config = MagicMock()
+        mock_config.CACHE_DIR = temp_dir / "cache"
+        mock_config.DB_PATH = temp_dir / "db" / "test.db"
+        (temp_dir / "db").mkdir(parents=True, exist_ok=True)
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        for mod in list(sys.modules.keys()):
+            if mod.startswith('fetcher') or mod in ['db', 'models', 'repository']:
+                del sys.modules[mod]
+
+        def fake_fetch_youtube(url, **kwargs):
+            video_id = url.rsplit("=", 1)[1]
+            if video_id == "bad":
+                raise Exception("unavailable")
+            return {
+                "id": f"youtube_{video_id}",
+                "metadata": {"title": f"Video {video_id}", "author": "A", "duration": 60},
+                "cache_dir": str(temp_dir / "cache" / "youtube" / video_id),
+            }
+
+        from fetcher import cli as fetcher_cli
+        monkeypatch.setattr(fetcher_cli, "fetch_youtube", fake_fetch_youtube)
+
+        with patch('time.sleep'):
+            rows, failures = fetcher_cli.fetch_batch([
+                "https://www.youtube.com/watch?v=a",
+                "https://www.youtube.com/watch?v=b",
+                "https://www.youtube.com/watch?v=bad",
+            ], workers=2, retries=1)
+
+        from db import get_connection
+        conn = get_connection()
+        ids = [r[0] for r in conn.execute("SELECT id FROM sources ORDER BY id").fetchall()]
+        conn.close()
+
+        assert ids == ["youtube_a", "youtube_b"]
+        assert len(failures) == 1
+        captured = capsys.readouterr()
+        assert "Fetched 2/3 sources" in captured.out
+        assert "unavailable" in captured.out
+
+    def test_fetch_batch_reports_failed_playlist(self, monkeypatch, temp_dir, capsys):
+        """Test that a playlist that cannot be expanded does not stop the batch"""
+        mock_config = MagicMock()
+        mock_config.CACHE_DIR = temp_dir / "cache"
+        mock_config.DB_PATH = temp_dir / "db" / "test.db"
+        (temp_dir / "db").mkdir(parents=True, exist_ok=True)
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        for mod in list(sys.modules.keys()):
+            if mod.startswith('fetcher') or mod in ['db', 'models', 'repository']:
+                del sys.modules[mod]
+
+        def fake_fetch_youtube(url, **kwargs):
+            video_id = url.rsplit("=", 1)[1]
+            return {
+                "id": f"youtube_{video_id}",
+                "metadata": {"title": f"Video {video_id}", "author": "A", "duration": 60},
+                "cache_dir": str(temp_dir / "cache" / "youtube" / video_id),
+            }
+
+        from fetcher import cli as fetcher_cli
+        monkeypatch.setattr(fetcher_cli, "fetch_youtube", fake_fetch_youtube)
+
+        failed = MagicMock(returncode=1, stderr="HTTP Error 503")
+        playlist = "https://www.youtube.com/playlist?list=PL123"
+        with patch('subprocess.run', return_value=failed):
+            with patch('time.sleep'):
+                rows, failures = fetcher_cli.fetch_batch(
+                    [playlist, "https://www.youtube.com/watch?v=a"], retries=1
+                )
+
+        assert [row.id for row in rows] == ["youtube_a"]
+        assert [url for url, _ in failures] == [playlist]
+        captured = capsys.readouterr()
+        assert f"{playlist}: Failed to expand playlist" in captured.out
+
+
 class TestMain:
     """Tests for main function"""
 
@@ -166,7 +249,7 @@ class TestMain:
         monkeypatch.setitem(sys.modules, 'config', mock_config)
 
         for mod in list(sys.modules.keys()):
-            if mod.startswith('fetcher') or mod in ['db', 'models']:
+            if mod.startswith('fetcher') or mod in ['db', 'models', 'repository']:
                 del sys.modules[mod]
 
         from fetcher import cli as fetcher_cli
@@ -177,4 +260,53 @@ class TestMain:
         with patch('sys.argv', ['cli.py', 'https://youtube.com/watch?v=test']):
             fetcher_cli.main()
 
-        mock_fetch.assert_called_once_with('https://youtube.com/watch?v=test')
+        mock_fetch.assert_called_once_with('https://youtube.com/watch?v=test', pdf_workers=1, pdf_id_mode='path', pdf_placement='auto', concurrent=False, single_pass=False, audio_policy='native')
+
+    def test_main_concurrent_flag(self, monkeypatch, temp_dir):
+        """Test that --concurrent is passed through to fetch"""
+        mock_config = MagicMock()
+        mock_config.CACHE_DIR = temp_dir / "cache"
+        mock_config.DB_PATH = temp_dir / "db" / "test.db"
+        (temp_dir / "db").mkdir(parents=True, exist_ok=True)
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        for mod in list(sys.modules.keys()):
+            if mod.startswith('fetcher') or mod in ['db', 'models', 'repository']:
+                del sys.modules[mod]
+
+        from fetcher import cli as fetcher_cli
+
+        mock_fetch = MagicMock()
+        fetcher_cli.fetch = mock_fetch
+
+        with patch('sys.argv', ['cli.py', 'https://youtube.com/watch?v=test', '--concurrent']):
+            fetcher_cli.main()
+
+        mock_fetch.assert_called_once_with('https://youtube.com/watch?v=test', pdf_workers=1, pdf_id_mode='path', pdf_placement='auto', concurrent=True, single_pass=False, audio_policy='native')
+
+    def test_main_batch_file(self, monkeypatch, temp_dir):
+        """Test that --batch reads the file and calls fetch_batch"""
+        mock_config = MagicMock()
+        mock_config.CACHE_DIR = temp_dir / "cache"
+        mock_config.DB_PATH = temp_dir / "db" / "test.db"
+        (temp_dir / "db").mkdir(parents=True, exist_ok=True)
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        for mod in list(sys.modules.keys()):
+            if mod.startswith('fetcher') or mod in ['db', 'models', 'repository']:
+                del sys.modules[mod]
+
+        from fetcher import cli as fetcher_cli
+
+        batch_file = temp_dir / "urls.txt"
+        batch_file.write_text("https://youtu.be/a\nhttps://youtu.be/b\n")
+
+        mock_fetch_batch = MagicMock(return_value=([], []))
+        fetcher_cli.fetch_batch = mock_fetch_batch
+
+        with patch('sys.argv', ['cli.py', '--batch', str(batch_file), '--workers', '8']):
+            fetcher_cli.main()
+
+        args, kwargs = mock_fetch_batch.call_args
+        assert args[0] == ["https://youtu.be/a", "https://youtu.be/b"]
+        assert kwargs["workers"] == 8
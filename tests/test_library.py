@@ -0,0 +1,126 @@
+"""Tests for fetcher/library.py"""
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import MagicMock
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+
+@pytest.fixture
+def library(monkeypatch, temp_dir):
+    """fetcher.library with a temp database, threads for processes and a fake fetch_pdf"""
+    mock_config = MagicMock()
+    mock_config.CACHE_DIR = temp_dir / "cache"
+    mock_config.DB_PATH = temp_dir / "db" / "test.db"
+    monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+    for mod in list(sys.modules.keys()):
+        if mod.startswith('fetcher') or mod in ['db', 'models', 'repository']:
+            del sys.modules[mod]
+
+    import fetcher.library
+    library = sys.modules['fetcher.library']
+
+    def fake_fetch_pdf(path, pdf_id=None, placement=None, **kwargs):
+        if "broken" in path:
+            raise Exception("damaged xref")
+        return {
+            "id": f"pdf_{pdf_id}",
+            "metadata": {"title": Path(path).stem, "author": "A", "page_count": 10},
+            "cache_dir": str(temp_dir / "cache" / "pdf" / pdf_id),
+            "original_path": path,
+        }
+
+    monkeypatch.setattr(library, "ProcessPoolExecutor", ThreadPoolExecutor)
+    library.fetch_pdf = MagicMock(side_effect=fake_fetch_pdf)
+    return library
+
+
+def make_tree(root: Path):
+    """Zotero-style storage: one folder per item, plus a duplicate and a hidden folder"""
+    files = {
+        "ABCD1234/first.pdf": b"%PDF first",
+        "EFGH5678/second.PDF": b"%PDF second",
+        "IJKL9012/nested/third.pdf": b"%PDF third",
+        "MNOP3456/copy-of-first.pdf": b"%PDF first",
+        ".trash/deleted.pdf": b"%PDF deleted",
+        "QRST7890/notes.txt": b"not a pdf",
+    }
+    for name, data in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+
+class TestFindPdfs:
+    """Tests for find_pdfs function"""
+
+    def test_walks_tree_recursively(self, library, temp_dir):
+        """Test that PDFs are found at any depth, skipping hidden folders"""
+        root = temp_dir / "storage"
+        make_tree(root)
+
+        names = [p.name for p in library.find_pdfs(root)]
+
+        assert names == ["first.pdf", "second.PDF", "third.pdf", "copy-of-first.pdf"]
+
+
+class TestIngestLibrary:
+    """Tests for ingest_library function"""
+
+    def test_ingests_unique_pdfs_in_batches(self, library, temp_dir, capsys):
+        """Test that duplicates are skipped and rows land in batched commits"""
+        root = temp_dir / "storage"
+        make_tree(root)
+        batch_sizes = []
+        save_sources = library.save_sources
+        library.save_sources = lambda rows: (batch_sizes.append(len(rows)), save_sources(rows))
+
+        stats = library.ingest_library(str(root), workers=2, batch_size=2)
+
+        assert stats["found"] == 4
+        assert stats["skipped"] == 1
+        assert stats["ingested"] == 3
+        assert stats["pages"] == 30
+        assert batch_sizes == [2, 1]
+
+        from db import get_connection
+        conn = get_connection()
+        count = conn.execute("SELECT COUNT(*) FROM sources WHERE type = 'pdf'").fetchone()[0]
+        conn.close()
+        assert count == 3
+
+        captured = capsys.readouterr()
+        assert "Ingested 3 PDFs (30 pages)" in captured.out
+        assert "PDFs/s" in captured.out
+
+    def test_rerun_skips_cached_pdfs(self, library, temp_dir):
+        """Test that a second run, even after moving the tree, fetches nothing"""
+        root = temp_dir / "storage"
+        make_tree(root)
+        library.ingest_library(str(root), workers=2)
+        library.fetch_pdf.reset_mock()
+
+        moved = temp_dir / "moved"
+        root.rename(moved)
+        stats = library.ingest_library(str(moved), workers=2)
+
+        assert stats["ingested"] == 0
+        assert stats["skipped"] == 4
+        library.fetch_pdf.assert_not_called()
+
+    def test_failures_are_reported(self, library, temp_dir, capsys):
+        """Test that a broken PDF is reported without stopping the rest"""
+        root = temp_dir / "storage"
+        make_tree(root)
+        (root / "UVWX1111").mkdir()
+        (root / "UVWX1111" / "broken.pdf").write_bytes(b"%PDF broken")
+
+        stats = library.ingest_library(str(root), workers=2)
+
+        assert stats["ingested"] == 3
+        assert len(stats["failed"]) == 1
+        captured = capsys.readouterr()
+        assert "damaged xref" in captured.out
@@ -2,6 +2,8 @@
 import pytest
 import json
 import socket
+import threading
+import time
 from pathlib import Path
 from unittest.mock import patch, MagicMock, PropertyMock
 import sys
@@ -96,88 +98,61 @@ class TestMpvControllerInit:
 class TestMpvControllerStart:
     """Tests for MpvController.start method"""
 
-    def test_start_removes_old_socket(self, monkeypatch, temp_dir):
-        """Test that start removes existing socket file"""
+    def setup_start(self, monkeypatch, temp_dir, properties=None):
+        """Helper returning the module, socket path and a socket wired to a FakeMpv"""
         mock_config = MagicMock()
         socket_path = temp_dir / "mpv.sock"
         mock_config.MPV_SOCKET = str(socket_path)
         monkeypatch.setitem(sys.modules, 'config', mock_config)
 
-        # Create old socket file
-        socket_path.touch()
-        assert socket_path.exists()
+        for mod in ['player.mpv_ipc', 'player.mpv_controller']:
+            if mod in sys.modules:
+                del sys.modules[mod]
+        import player.mpv_controller
 
-        if 'player.mpv_controller' in sys.modules:
-            del sys.modules['player.mpv_controller']
-        from player.mpv_controller import MpvController
+        self.fake = FakeMpv(properties)
+        sock = MagicMock(wraps=self.fake.client)
+        sock.connect = MagicMock()
+        sock.close = MagicMock()  # The fake owns the real socket
+        return sys.modules['player.mpv_controller'], socket_path, sock
 
-        controller = MpvController()
+    def teardown_method(self):
+        if getattr(self, "fake", None):
+            self.fake.close()
+            self.fake.client.close()
 
+    def launch(self, socket_path):
+        """Popen stand-in that creates the socket file like mpv does"""
         mock_popen = MagicMock()
-        mock_socket = MagicMock()
+        mock_popen.poll.return_value = None
 
         def create_socket_file(*args, **kwargs):
+            assert not socket_path.exists()
             socket_path.touch()
             return mock_popen
+        return create_socket_file
+
+    def test_start_removes_old_socket(self, monkeypatch, temp_dir):
+        """Test that start removes existing socket file before launching"""
+        mpv_controller, socket_path, sock = self.setup_start(monkeypatch, temp_dir)
+        socket_path.touch()
 
-        with patch('subprocess.Popen', side_effect=create_socket_file):
-            with patch('socket.socket', return_value=mock_socket):
+        controller = mpv_controller.MpvController()
+        with patch('subprocess.Popen', side_effect=self.launch(socket_path)):
+            with patch('socket.socket', return_value=sock):
                 controller.start("/tmp/audio.mp3")
 
         # Socket was recreated by mock Popen
         assert socket_path.exists()
+        sock.connect.assert_called_once_with(str(socket_path))
 
-    def test_start_without_existing_socket(self, monkeypatch, temp_dir):
-        """Test that start works when no socket file exists"""
-        mock_config = MagicMock()
-        socket_path = temp_dir / "mpv.sock"
-        mock_config.MPV_SOCKET = str(socket_path)
-        monkeypatch.setitem(sys.modules, 'config', mock_config)
-
-        # Ensure socket doesn't exist
-        assert not socket_path.exists()
-
-        if 'player.mpv_controller' in sys.modules:
-            del sys.modules['player.mpv_controller']
-        from player.mpv_controller import MpvController
-
-        controller = MpvController()
-
-        mock_popen = MagicMock()
-        mock_socket = MagicMock()
+    def test_start_launches_idle_mpv_then_loads(self, monkeypatch, temp_dir):
+        """Test that mpv starts idle and the file is loaded after observing"""
+        mpv_controller, socket_path, sock = self.setup_start(monkeypatch, temp_dir)
 
-        def create_socket_file(*args, **kwargs):
-            socket_path.touch()
-            return mock_popen
-
-        with patch('subprocess.Popen', side_effect=create_socket_file):
-            with patch('socket.socket', return_value=mock_socket):
-                controller.start("/tmp/audio.mp3")
-
-        assert socket_path.exists()
-
-    def test_start_launches_mpv(self, monkeypatch, temp_dir):
-        """Test that start launches mpv process"""
-        mock_config = MagicMock()
-        socket_path = temp_dir / "mpv.sock"
-        mock_config.MPV_SOCKET = str(socket_path)
-        monkeypatch.setitem(sys.modules, 'config', mock_config)
-
-        if 'player.mpv_controller' in sys.modules:
-            del sys.modules['player.mpv_controller']
-        from player.mpv_controller import MpvController
-
-        controller = MpvController()
-
-        mock_popen = MagicMock()
-        mock_socket = MagicMock()
-
-        def create_socket_file(*args, **kwargs):
-            socket_path.touch()
-            return mock_popen
-
-        with patch('subprocess.Popen', side_effect=create_socket_file) as popen_mock:
-            with patch('socket.socket', return_value=mock_socket):
+        controller = mpv_controller.MpvController()
+        with patch('subprocess.Popen', side_effect=self.launch(socket_path)) as popen_mock:
+            with patch('socket.socket', return_value=sock):
                 controller.start("/tmp/audio.mp3")
 
         # Verify mpv was launched with correct args
@@ -185,79 +160,314 @@ class TestMpvControllerStart:
         assert call_args[0] == "mpv"
         assert "--no-video" in call_args
         assert "--no-terminal" in call_args
-        assert "/tmp/audio.mp3" in call_args
+        assert "--idle=yes" in call_args
+        assert "/tmp/audio.mp3" not in call_args
+
+        wait_for(lambda: len(self.fake.commands) == 6)
+        assert [c[0] for c in self.fake.commands] == ["observe_property"] * 4 + ["client_name", "loadfile"]
+        assert self.fake.commands[-1] == ["loadfile", "/tmp/audio.mp3", "replace"]
+        assert controller.metrics["ready"] >= 0
+
+    def test_connect_backs_off_until_listening(self, monkeypatch, temp_dir):
+        """Test that refused connects are retried with growing delays"""
+        mpv_controller, socket_path, sock = self.setup_start(monkeypatch, temp_dir)
+        sock.connect.side_effect = [FileNotFoundError(), ConnectionRefusedError(), ConnectionRefusedError(), None]
+
+        controller = mpv_controller.MpvController()
+        with patch('subprocess.Popen', side_effect=self.launch(socket_path)):
+            with patch('socket.socket', return_value=sock):
+                with patch('time.sleep') as sleep_mock:
+                    controller.start("/tmp/audio.mp3")
+
+        assert [c.args[0] for c in sleep_mock.call_args_list] == [0.001, 0.002, 0.004]
+        assert controller.ipc is not None
 
     def test_start_timeout_exception(self, monkeypatch, temp_dir):
-        """Test that start raises exception on socket timeout"""
-        mock_config = MagicMock()
-        socket_path = temp_dir / "mpv.sock"
-        mock_config.MPV_SOCKET = str(socket_path)
-        monkeypatch.setitem(sys.modules, 'config', mock_config)
+        """Test that start raises exception when mpv never listens"""
+        mpv_controller, socket_path, sock = self.setup_start(monkeypatch, temp_dir)
+        monkeypatch.setattr(mpv_controller, "STARTUP_TIMEOUT", 0.01)
+        sock.connect.side_effect = FileNotFoundError()
 
-        if 'player.mpv_controller' in sys.modules:
-            del sys.modules['player.mpv_controller']
-        from player.mpv_controller import MpvController
+        controller = mpv_controller.MpvController()
+        mock_popen = MagicMock()
+        mock_popen.poll.return_value = None
 
-        controller = MpvController()
+        with patch('subprocess.Popen', return_value=mock_popen):
+            with patch('socket.socket', return_value=sock):
+                with patch('time.sleep'):  # Speed up test
+                    with pytest.raises(Exception, match="socket not created"):
+                        controller.start("/tmp/audio.mp3")
+
+    def test_start_fails_fast_when_mpv_exits(self, monkeypatch, temp_dir):
+        """Test that a crashed mpv is reported without waiting for the timeout"""
+        mpv_controller, socket_path, sock = self.setup_start(monkeypatch, temp_dir)
+        sock.connect.side_effect = FileNotFoundError()
 
+        controller = mpv_controller.MpvController()
         mock_popen = MagicMock()
+        mock_popen.poll.return_value = 2
+        mock_popen.returncode = 2
 
-        # Don't create socket file - simulate timeout
         with patch('subprocess.Popen', return_value=mock_popen):
-            with patch('time.sleep'):  # Speed up test
-                with pytest.raises(Exception, match="socket not created"):
+            with patch('socket.socket', return_value=sock):
+                with pytest.raises(Exception, match="exited with code 2"):
+                    controller.start("/tmp/audio.mp3")
+        assert sock.connect.call_count == 1
+
+    def test_start_requires_ping_reply(self, monkeypatch, temp_dir):
+        """Test that a socket that accepts but never answers is an error"""
+        mpv_controller, socket_path, _ = self.setup_start(monkeypatch, temp_dir)
+        silent = MagicMock()
+        silent.recv.return_value = b""  # Hangs up at once
+
+        controller = mpv_controller.MpvController()
+        with patch('subprocess.Popen', side_effect=self.launch(socket_path)):
+            with patch('socket.socket', return_value=silent):
+                with pytest.raises(Exception, match="did not answer"):
                     controller.start("/tmp/audio.mp3")
 
+    def test_time_to_first_audio(self, monkeypatch, temp_dir):
+        """Test that the first playback-restart records the metric once"""
+        mpv_controller, socket_path, sock = self.setup_start(monkeypatch, temp_dir)
+
+        controller = mpv_controller.MpvController()
+        with patch('subprocess.Popen', side_effect=self.launch(socket_path)):
+            with patch('socket.socket', return_value=sock):
+                controller.start("/tmp/audio.mp3")
+        assert not controller.playing.is_set()
+
+        self.fake.emit({"event": "playback-restart"})
+        assert controller.wait_until_playing(1)
+        first_audio = controller.metrics["first_audio"]
+        assert first_audio >= controller.metrics["ready"]
+
+        self.fake.emit({"event": "playback-restart"})  # e.g. after a seek
+        self.fake.emit({"event": "property-change", "name": "pause", "data": False})
+        wait_for(lambda: "pause" in controller.state)
+        assert controller.metrics["first_audio"] == first_audio
+
+
+class FakeMpv:
+    """mpv's side of an IPC socket pair: replies to commands by request_id"""
+
+    def __init__(self, properties=None):
+        self.properties = dict(properties or {})
+        self.observed = {}
+        self.commands = []
+        self.client, self.server = socket.socketpair()
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def serve(self):
+        try:
+            self.reply_to(self.server.makefile("rb"))
+        except OSError:
+            pass  # Client hung up
+
+    def reply_to(self, lines):
+        for line in lines:
+            msg = json.loads(line)
+            command = msg["command"]
+            self.commands.append(command)
+            reply = {"request_id": msg["request_id"], "error": "success"}
+            if command[0] == "get_property":
+                if command[1] in self.properties:
+                    reply["data"] = self.properties[command[1]]
+                else:
+                    reply["error"] = "property unavailable"
+            elif command[0] == "set_property":
+                self.properties[command[1]] = command[2]
+            elif command[0] in ("add", "cycle"):
+                if command[1] in self.properties:
+                    self.change(*command[1:])
+                else:
+                    reply["error"] = "property unavailable"
+            elif command[0] == "observe_property":
+                self.observed[command[2]] = command[1]
+            elif command[0] == "playlist-next" and self.properties.get("idle-active"):
+                reply["error"] = "error running command"  # Nothing left to play
+            self.server.sendall((json.dumps(reply) + "\n").encode())
+
+            # Like mpv, report observed properties at once and on every change
+            name = None
+            if command[0] == "observe_property":
+                name = command[2]
+            elif command[0] in ("set_property", "add", "cycle"):
+                name = command[1]
+            if name in self.observed:
+                self.emit({
+                    "event": "property-change", "id": self.observed[name],
+                    "name": name, "data": self.properties.get(name),
+                })
+
+    def change(self, name, delta=None):
+        """add/cycle: step a number or flip a flag; chapters are a minute long"""
+        if delta is None:
+            self.properties[name] = not self.properties[name]
+        else:
+            self.properties[name] += delta
+        if name == "chapter":
+            self.properties["time-pos"] = 60.0 * self.properties[name]
+
+    def emit(self, event: dict):
+        self.server.sendall((json.dumps(event) + "\n").encode())
+
+    def close(self):
+        try:
+            self.server.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.server.close()
+
+
+def wait_for(predicate, timeout=1.0):
+    """Poll until predicate() holds; events arrive on the reader thread"""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out waiting for mpv event"
+        time.sleep(0.005)
+
+
+class TestMpvIpcClient:
+    """Tests for the request_id based IPC client"""
+
+    def load(self, monkeypatch, temp_dir):
+        mock_config = MagicMock()
+        mock_config.MPV_SOCKET = str(temp_dir / "mpv.sock")
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+        for mod in ['player.mpv_ipc', 'player.mpv_controller']:
+            if mod in sys.modules:
+                del sys.modules[mod]
+        import player.mpv_ipc
+        return sys.modules['player.mpv_ipc']
+
+    def test_reply_matched_by_request_id_despite_events(self, monkeypatch, temp_dir):
+        """Test that an event arriving first is not taken for the reply"""
+        mpv_ipc = self.load(monkeypatch, temp_dir)
+        client_sock, server_sock = socket.socketpair()
+        client = mpv_ipc.MpvIpcClient(client_sock)
+        events = []
+        client.event_handlers.append(events.append)
+
+        future = client.send(["get_property", "speed"])
+        server_sock.sendall(
+            b'{"event": "pause"}\n'
+            b'{"request_id": 1, "error": "success", "data": 1.5}\n'
+        )
+
+        assert future.result(1)["data"] == 1.5
+        assert events == [{"event": "pause"}]
+        client.close()
+        server_sock.close()
+
+    def test_replies_split_across_reads(self, monkeypatch, temp_dir):
+        """Test that a reply split over two recv calls is reassembled"""
+        mpv_ipc = self.load(monkeypatch, temp_dir)
+        client_sock, server_sock = socket.socketpair()
+        client = mpv_ipc.MpvIpcClient(client_sock)
+
+        first = client.send(["get_property", "pause"])
+        second = client.send(["get_property", "speed"])
+        server_sock.sendall(b'{"request_id": 2, "data": 2.0}\n{"request_id"')
+        server_sock.sendall(b': 1, "data": true}\n')
+
+        assert first.result(1)["data"] is True
+        assert second.result(1)["data"] == 2.0
+        client.close()
+        server_sock.close()
+
+    def test_timeout_raises(self, monkeypatch, temp_dir):
+        """Test that a command without a reply raises MpvError"""
+        mpv_ipc = self.load(monkeypatch, temp_dir)
+        client_sock, server_sock = socket.socketpair()
+        client = mpv_ipc.MpvIpcClient(client_sock, timeout=0.05)
+
+        with pytest.raises(mpv_ipc.MpvError, match="did not reply"):
+            client.command(["get_property", "pause"])
+        client.close()
+        server_sock.close()
+
+    def test_close_fails_pending_and_later_commands(self, monkeypatch, temp_dir):
+        """Test that the connection closing fails waiting and new commands"""
+        mpv_ipc = self.load(monkeypatch, temp_dir)
+        client_sock, server_sock = socket.socketpair()
+        client = mpv_ipc.MpvIpcClient(client_sock)
+
+        future = client.send(["get_property", "pause"])
+        server_sock.close()
+
+        with pytest.raises(mpv_ipc.MpvError):
+            future.result(1)
+        client._reader.join(1)
+        with pytest.raises(mpv_ipc.MpvError):
+            client.send(["get_property", "pause"])
+        client.close()
+
 
 class TestMpvControllerCommands:
     """Tests for MpvController command methods"""
 
-    def setup_controller(self, monkeypatch, temp_dir):
-        """Helper to set up a controller with mocked socket"""
+    def setup_controller(self, monkeypatch, temp_dir, properties=None):
+        """Helper to set up a controller talking to a FakeMpv"""
         mock_config = MagicMock()
         mock_config.MPV_SOCKET = str(temp_dir / "mpv.sock")
         monkeypatch.setitem(sys.modules, 'config', mock_config)
 
-        if 'player.mpv_controller' in sys.modules:
-            del sys.modules['player.mpv_controller']
+        for mod in ['player.mpv_ipc', 'player.mpv_controller']:
+            if mod in sys.modules:
+                del sys.modules[mod]
         from player.mpv_controller import MpvController
+        from player.mpv_ipc import MpvIpcClient
 
+        fake = FakeMpv(properties)
         controller = MpvController()
-        controller.sock = MagicMock()
+        controller.sock = fake.client
+        controller.ipc = MpvIpcClient(fake.client)
+        self.fake = fake
         return controller
 
+    def teardown_method(self):
+        if getattr(self, "fake", None):
+            self.fake.close()
+
     def test_send_command(self, monkeypatch, temp_dir):
-        """Test _send_command sends JSON and reads response"""
-        controller = self.setup_controller(monkeypatch, temp_dir)
-        controller.sock.recv.return_value = b'{"data": "test"}\n'
+        """Test _send_command sends JSON and returns the matching reply"""
+        controller = self.setup_controller(monkeypatch, temp_dir, {"pause": "test"})
 
         result = controller._send_command(["get_property", "pause"])
 
-        controller.sock.send.assert_called_once()
-        sent_data = controller.sock.send.call_args[0][0]
-        assert b"get_property" in sent_data
-        assert result == {"data": "test"}
+        assert self.fake.commands == [["get_property", "pause"]]
+        assert result["data"] == "test"
+        assert result["request_id"] == 1
 
     def test_send_command_no_socket(self, monkeypatch, temp_dir):
-        """Test _send_command returns None when no socket"""
+        """Test _send_command returns None when not connected"""
         controller = self.setup_controller(monkeypatch, temp_dir)
-        controller.sock = None
+        controller.ipc = None
 
         result = controller._send_command(["test"])
         assert result is None
 
-    def test_send_command_blocking_error(self, monkeypatch, temp_dir):
-        """Test _send_command handles BlockingIOError"""
+    def test_send_command_connection_closed(self, monkeypatch, temp_dir):
+        """Test _send_command returns None once mpv has gone away"""
         controller = self.setup_controller(monkeypatch, temp_dir)
-        controller.sock.recv.side_effect = BlockingIOError()
+        self.fake.close()
+        controller.ipc._reader.join(1)
 
         result = controller._send_command(["test"])
         assert result is None
 
+    def test_does_not_sleep_per_command(self, monkeypatch, temp_dir):
+        """Test that replies are returned without the old fixed delay"""
+        controller = self.setup_controller(monkeypatch, temp_dir, {"speed": 1.0})
+
+        with patch('time.sleep', side_effect=AssertionError("slept")):
+            for _ in range(20):
+                assert controller.get_speed() == 1.0
+
     def test_get_property(self, monkeypatch, temp_dir):
         """Test _get_property returns data value"""
-        controller = self.setup_controller(monkeypatch, temp_dir)
-        controller.sock.recv.return_value = b'{"data": 1.5}\n'
+        controller = self.setup_controller(monkeypatch, temp_dir, {"speed": 1.5})
 
         result = controller._get_property("speed")
         assert result == 1.5
@@ -265,7 +475,6 @@ class TestMpvControllerCommands:
     def test_get_property_no_data(self, monkeypatch, temp_dir):
         """Test _get_property returns None when no data"""
         controller = self.setup_controller(monkeypatch, temp_dir)
-        controller.sock.recv.return_value = b'{"error": "unknown"}\n'
 
         result = controller._get_property("unknown")
         assert result is None
@@ -273,73 +482,54 @@ class TestMpvControllerCommands:
     def test_set_property(self, monkeypatch, temp_dir):
         """Test _set_property sends command"""
         controller = self.setup_controller(monkeypatch, temp_dir)
-        controller.sock.recv.return_value = b'{}\n'
 
         controller._set_property("pause", True)
 
-        sent_data = controller.sock.send.call_args[0][0].decode()
-        assert "set_property" in sent_data
-        assert "pause" in sent_data
+        assert self.fake.commands == [["set_property", "pause", True]]
 
     def test_play(self, monkeypatch, temp_dir):
         """Test play sets pause to False"""
         controller = self.setup_controller(monkeypatch, temp_dir)
-        controller.sock.recv.return_value = b'{}\n'
 
         controller.play()
 
-        sent_data = controller.sock.send.call_args[0][0].decode()
-        assert "false" in sent_data.lower() or "False" in sent_data
+        assert self.fake.properties["pause"] is False
 
     def test_pause(self, monkeypatch, temp_dir):
         """Test pause sets pause to True"""
         controller = self.setup_controller(monkeypatch, temp_dir)
-        controller.sock.recv.return_value = b'{}\n'
 
         controller.pause()
 
-        sent_data = controller.sock.send.call_args[0][0].decode()
-        assert "true" in sent_data.lower() or "True" in sent_data
+        assert self.fake.properties["pause"] is True
 
     def test_toggle_pause(self, monkeypatch, temp_dir):
         """Test toggle_pause toggles pause state"""
-        controller = self.setup_controller(monkeypatch, temp_dir)
-        controller.sock.recv.side_effect = [
-            b'{"data": false}\n',  # get current state
-            b'{}\n'  # set new state
-        ]
+        controller = self.setup_controller(monkeypatch, temp_dir, {"pause": False})
 
         result = controller.toggle_pause()
         assert result is True  # Was not paused, now paused
+        assert self.fake.properties["pause"] is True
 
     def test_seek_relative(self, monkeypatch, temp_dir):
         """Test seek with relative mode"""
         controller = self.setup_controller(monkeypatch, temp_dir)
-        controller.sock.recv.return_value = b'{}\n'
 
         controller.seek(10)
 
-        sent_data = controller.sock.send.call_args[0][0].decode()
-        assert "seek" in sent_data
-        assert "10" in sent_data
-        assert "relative" in sent_data
+        assert self.fake.commands == [["seek", 10, "relative"]]
 
     def test_seek_to_absolute(self, monkeypatch, temp_dir):
         """Test seek_to with absolute position"""
         controller = self.setup_controller(monkeypatch, temp_dir)
-        controller.sock.recv.return_value = b'{}\n'
 
         controller.seek_to(120)
 
-        sent_data = controller.sock.send.call_args[0][0].decode()
-        assert "seek" in sent_data
-        assert "120" in sent_data
-        assert "absolute" in sent_data
+        assert self.fake.commands == [["seek", 120, "absolute"]]
 
     def test_get_position(self, monkeypatch, temp_dir):
         """Test get_position returns time-pos"""
-        controller = self.setup_controller(monkeypatch, temp_dir)
-        controller.sock.recv.return_value = b'{"data": 125.5}\n'
+        controller = self.setup_controller(monkeypatch, temp_dir, {"time-pos": 125.5})
 
         result = controller.get_position()
         assert result == 125.5
@@ -347,15 +537,13 @@ class TestMpvControllerCommands:
     def test_get_position_default(self, monkeypatch, temp_dir):
         """Test get_position returns 0.0 when None"""
         controller = self.setup_controller(monkeypatch, temp_dir)
-        controller.sock.recv.return_value = b'{}\n'
 
         result = controller.get_position()
         assert result == 0.0
 
     def test_get_duration(self, monkeypatch, temp_dir):
         """Test get_duration returns duration"""
-        controller = self.setup_controller(monkeypatch, temp_dir)
-        controller.sock.recv.return_value = b'{"data": 300.0}\n'
+        controller = self.setup_controller(monkeypatch, temp_dir, {"duration": 300.0})
 
         result = controller.get_duration()
         assert result == 300.0
@@ -363,15 +551,13 @@ class TestMpvControllerCommands:
     def test_get_duration_default(self, monkeypatch, temp_dir):
         """Test get_duration returns 0.0 when None"""
         controller = self.setup_controller(monkeypatch, temp_dir)
-        controller.sock.recv.return_value = b'{}\n'
 
         result = controller.get_duration()
         assert result == 0.0
 
     def test_get_paused(self, monkeypatch, temp_dir):
         """Test get_paused returns pause state"""
-        controller = self.setup_controller(monkeypatch, temp_dir)
-        controller.sock.recv.return_value = b'{"data": true}\n'
+        controller = self.setup_controller(monkeypatch, temp_dir, {"pause": True})
 
         result = controller.get_paused()
         assert result is True
@@ -379,15 +565,13 @@ class TestMpvControllerCommands:
     def test_get_paused_default(self, monkeypatch, temp_dir):
         """Test get_paused returns False when None"""
         controller = self.setup_controller(monkeypatch, temp_dir)
-        controller.sock.recv.return_value = b'{}\n'
 
         result = controller.get_paused()
         assert result is False
 
     def test_get_speed(self, monkeypatch, temp_dir):
         """Test get_speed returns speed"""
-        controller = self.setup_controller(monkeypatch, temp_dir)
-        controller.sock.recv.return_value = b'{"data": 1.5}\n'
+        controller = self.setup_controller(monkeypatch, temp_dir, {"speed": 1.5})
 
         result = controller.get_speed()
         assert result == 1.5
@@ -395,7 +579,6 @@ class TestMpvControllerCommands:
     def test_get_speed_default(self, monkeypatch, temp_dir):
         """Test get_speed returns 1.0 when None"""
         controller = self.setup_controller(monkeypatch, temp_dir)
-        controller.sock.recv.return_value = b'{}\n'
 
         result = controller.get_speed()
         assert result == 1.0
@@ -403,50 +586,320 @@ class TestMpvControllerCommands:
     def test_set_speed_clamps_min(self, monkeypatch, temp_dir):
         """Test set_speed clamps to minimum 0.5"""
         controller = self.setup_controller(monkeypatch, temp_dir)
-        controller.sock.recv.return_value = b'{}\n'
 
         controller.set_speed(0.1)
 
-        sent_data = controller.sock.send.call_args[0][0].decode()
-        assert "0.5" in sent_data
+        assert self.fake.properties["speed"] == 0.5
 
     def test_set_speed_clamps_max(self, monkeypatch, temp_dir):
         """Test set_speed clamps to maximum 3.0"""
         controller = self.setup_controller(monkeypatch, temp_dir)
-        controller.sock.recv.return_value = b'{}\n'
 
         controller.set_speed(5.0)
 
-        sent_data = controller.sock.send.call_args[0][0].decode()
-        assert "3.0" in sent_data or "3" in sent_data
+        assert self.fake.properties["speed"] == 3.0
 
     def test_speed_up(self, monkeypatch, temp_dir):
         """Test speed_up increases speed"""
-        controller = self.setup_controller(monkeypatch, temp_dir)
-        controller.sock.recv.side_effect = [
-            b'{"data": 1.0}\n',  # get current
-            b'{}\n'  # set new
-        ]
+        controller = self.setup_controller(monkeypatch, temp_dir, {"speed": 1.0})
 
         controller.speed_up()
 
-        # Second call should set 1.25
-        sent_data = controller.sock.send.call_args[0][0].decode()
-        assert "1.25" in sent_data
+        assert self.fake.properties["speed"] == 1.25
 
     def test_speed_down(self, monkeypatch, temp_dir):
         """Test speed_down decreases speed"""
-        controller = self.setup_controller(monkeypatch, temp_dir)
-        controller.sock.recv.side_effect = [
-            b'{"data": 1.0}\n',  # get current
-            b'{}\n'  # set new
-        ]
+        controller = self.setup_controller(monkeypatch, temp_dir, {"speed": 1.0})
 
         controller.speed_down()
 
-        # Second call should set 0.75
-        sent_data = controller.sock.send.call_args[0][0].decode()
-        assert "0.75" in sent_data
+        assert self.fake.properties["speed"] == 0.75
+
+
+class TestMpvControllerBatch:
+    """Tests for pipelined commands"""
+
+    def setup_controller(self, monkeypatch, temp_dir, properties=None):
+        """Helper to set up a controller whose socket writes are counted"""
+        mock_config = MagicMock()
+        mock_config.MPV_SOCKET = str(temp_dir / "mpv.sock")
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        for mod in ['player.mpv_ipc', 'player.mpv_controller']:
+            if mod in sys.modules:
+                del sys.modules[mod]
+        from player.mpv_controller import MpvController
+        from player.mpv_ipc import MpvIpcClient
+
+        self.fake = FakeMpv(properties)
+        self.sock = MagicMock(wraps=self.fake.client)
+        controller = MpvController()
+        controller.ipc = MpvIpcClient(self.sock)
+        return controller
+
+    def teardown_method(self):
+        self.fake.close()
+
+    def test_batch_sends_once_and_keeps_order(self, monkeypatch, temp_dir):
+        """Test that a batch is one write and replies come back in order"""
+        controller = self.setup_controller(monkeypatch, temp_dir, {"speed": 1.0, "pause": False})
+
+        replies = controller.batch(
+            ["set_property", "speed", 2.0],
+            ["get_property", "speed"],
+            ["get_property", "pause"],
+        )
+
+        assert self.sock.sendall.call_count == 1
+        assert [r["request_id"] for r in replies] == [1, 2, 3]
+        assert replies[1]["data"] == 2.0
+        assert replies[2]["data"] is False
+
+    def test_batch_without_connection(self, monkeypatch, temp_dir):
+        """Test that every reply is None when not connected"""
+        controller = self.setup_controller(monkeypatch, temp_dir)
+        controller.ipc = None
+
+        assert controller.batch(["get_property", "pause"], ["quit"]) == [None, None]
+
+    def test_toggle_pause_is_one_round_trip(self, monkeypatch, temp_dir):
+        """Test that toggle_pause cycles and reads back in one write"""
+        controller = self.setup_controller(monkeypatch, temp_dir, {"pause": True})
+
+        assert controller.toggle_pause() is False
+        assert self.sock.sendall.call_count == 1
+        assert self.fake.commands == [["cycle", "pause"], ["get_property", "pause"]]
+
+    def test_speed_up_clamps_at_max(self, monkeypatch, temp_dir):
+        """Test that speed is clamped before it is sent, in one write"""
+        controller = self.setup_controller(monkeypatch, temp_dir, {"speed": 3.0})
+        controller.state = {"speed": 3.0}
+
+        controller.speed_up()
+
+        assert self.fake.properties["speed"] == 3.0
+        assert self.fake.commands == [["set_property", "speed", 3.0]]
+        assert self.sock.sendall.call_count == 1
+
+    def test_chapter_jump(self, monkeypatch, temp_dir):
+        """Test that a chapter jump returns the new position in one write"""
+        controller = self.setup_controller(monkeypatch, temp_dir, {"chapter": 1, "time-pos": 70.0})
+
+        assert controller.chapter_jump(1) == 120.0
+        assert controller.chapter_jump(-2) == 0.0
+        assert self.sock.sendall.call_count == 2
+
+    def test_chapter_jump_without_chapters(self, monkeypatch, temp_dir):
+        """Test that files without chapters return None"""
+        controller = self.setup_controller(monkeypatch, temp_dir, {"time-pos": 5.0})
+
+        assert controller.chapter_jump(1) is None
+
+
+class TestMpvControllerObserve:
+    """Tests for the property-change state snapshot"""
+
+    def setup_controller(self, monkeypatch, temp_dir, properties):
+        """Helper to set up a controller observing a FakeMpv"""
+        mock_config = MagicMock()
+        mock_config.MPV_SOCKET = str(temp_dir / "mpv.sock")
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        for mod in ['player.mpv_ipc', 'player.mpv_controller']:
+            if mod in sys.modules:
+                del sys.modules[mod]
+        from player.mpv_controller import MpvController, OBSERVED_PROPERTIES
+        from player.mpv_ipc import MpvIpcClient
+
+        self.fake = FakeMpv(properties)
+        controller = MpvController()
+        controller.sock = self.fake.client
+        controller.ipc = MpvIpcClient(self.fake.client)
+        controller._observe()
+        wait_for(lambda: len(controller.state) == len(OBSERVED_PROPERTIES))
+        return controller
+
+    def teardown_method(self):
+        self.fake.close()
+
+    def test_observes_playback_properties(self, monkeypatch, temp_dir):
+        """Test that observe_property is sent for each displayed property"""
+        controller = self.setup_controller(monkeypatch, temp_dir, {
+            "time-pos": 12.5, "duration": 300.0, "speed": 1.5, "pause": False,
+        })
+
+        observed = [c[2] for c in self.fake.commands if c[0] == "observe_property"]
+        assert observed == ["time-pos", "duration", "speed", "pause"]
+        assert controller.state == {
+            "time-pos": 12.5, "duration": 300.0, "speed": 1.5, "pause": False,
+        }
+
+    def test_reads_need_no_ipc(self, monkeypatch, temp_dir):
+        """Test that getters read the snapshot instead of sending commands"""
+        controller = self.setup_controller(monkeypatch, temp_dir, {
+            "time-pos": 12.5, "duration": 300.0, "speed": 1.5, "pause": True,
+        })
+        sent = len(self.fake.commands)
+
+        assert controller.get_position() == 12.5
+        assert controller.get_duration() == 300.0
+        assert controller.get_speed() == 1.5
+        assert controller.get_paused() is True
+        assert len(self.fake.commands) == sent
+
+    def test_snapshot_follows_property_changes(self, monkeypatch, temp_dir):
+        """Test that pushed events, including unset values, update the snapshot"""
+        controller = self.setup_controller(monkeypatch, temp_dir, {
+            "time-pos": 1.0, "duration": 300.0, "speed": 1.0, "pause": False,
+        })
+
+        self.fake.emit({"event": "property-change", "id": 1, "name": "time-pos", "data": 42.0})
+        wait_for(lambda: controller.state["time-pos"] == 42.0)
+        assert controller.get_position() == 42.0
+
+        controller.set_speed(2.0)
+        wait_for(lambda: controller.state["speed"] == 2.0)
+
+        self.fake.emit({"event": "property-change", "id": 2, "name": "duration"})
+        wait_for(lambda: controller.state["duration"] is None)
+        assert controller.get_duration() == 0.0
+
+
+class TestMpvControllerReuse:
+    """Tests for switching files in a running mpv"""
+
+    def setup_controller(self, monkeypatch, temp_dir, properties=None):
+        """Helper to set up a controller attached to a running FakeMpv"""
+        mock_config = MagicMock()
+        mock_config.MPV_SOCKET = str(temp_dir / "mpv.sock")
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        for mod in ['player.mpv_ipc', 'player.mpv_controller']:
+            if mod in sys.modules:
+                del sys.modules[mod]
+        from player.mpv_controller import MpvController
+        from player.mpv_ipc import MpvIpcClient
+
+        self.fake = FakeMpv(properties)
+        self.sock = MagicMock(wraps=self.fake.client)
+        controller = MpvController()
+        controller.process = MagicMock()
+        controller.process.poll.return_value = None
+        controller.ipc = MpvIpcClient(self.sock)
+        return controller
+
+    def teardown_method(self):
+        self.fake.close()
+
+    def test_open_starts_mpv_when_none_is_running(self, monkeypatch, temp_dir):
+        """Test that open falls back to start without a live process"""
+        controller = self.setup_controller(monkeypatch, temp_dir)
+        controller.process.poll.return_value = 0
+
+        with patch.object(controller, 'start') as start_mock:
+            controller.open("/tmp/a.opus")
+
+        start_mock.assert_called_once_with("/tmp/a.opus")
+
+    def test_open_loads_into_running_mpv(self, monkeypatch, temp_dir):
+        """Test that a running mpv switches files with loadfile"""
+        controller = self.setup_controller(monkeypatch, temp_dir)
+
+        with patch.object(controller, 'start') as start_mock:
+            controller.open("/tmp/a.opus")
+
+        start_mock.assert_not_called()
+        assert self.fake.commands == [["loadfile", "/tmp/a.opus", "replace"]]
+
+    def test_prefetch_appends_in_one_write(self, monkeypatch, temp_dir):
+        """Test that prefetch trims the playlist and appends the next file"""
+        controller = self.setup_controller(monkeypatch, temp_dir)
+
+        controller.prefetch("/tmp/b.opus")
+
+        assert self.sock.sendall.call_count == 1
+        assert self.fake.commands == [["playlist-clear"], ["loadfile", "/tmp/b.opus", "append"]]
+        assert controller.prefetched == "/tmp/b.opus"
+
+    def test_open_prefetched_skips_to_it(self, monkeypatch, temp_dir):
+        """Test that opening the prefetched file moves to the next entry"""
+        controller = self.setup_controller(monkeypatch, temp_dir, {"path": "/tmp/a.opus"})
+        controller.prefetch("/tmp/b.opus")
+
+        controller.open("/tmp/b.opus")
+
+        assert self.fake.commands[-1] == ["playlist-next", "force"]
+        assert controller.prefetched is None
+        assert not controller.playing.is_set()
+
+    def test_open_prefetched_after_gapless_advance(self, monkeypatch, temp_dir):
+        """Test that a file mpv already moved on to is not skipped past"""
+        controller = self.setup_controller(monkeypatch, temp_dir, {"path": "/tmp/b.opus"})
+        controller.prefetch("/tmp/b.opus")
+
+        controller.open("/tmp/b.opus")
+
+        assert ["playlist-next", "force"] not in self.fake.commands
+        assert controller.playing.is_set()
+        assert controller.metrics["first_audio"] == 0.0
+
+    def test_open_prefetched_after_mpv_went_idle(self, monkeypatch, temp_dir):
+        """Test that a prefetched file mpv already played through is loaded again"""
+        controller = self.setup_controller(monkeypatch, temp_dir, {"idle-active": True})
+        controller.prefetch("/tmp/b.opus")
+
+        controller.open("/tmp/b.opus")
+
+        assert self.fake.commands[-2:] == [["playlist-next", "force"], ["loadfile", "/tmp/b.opus", "replace"]]
+
+    def test_end_file_marks_entry_ended(self, monkeypatch, temp_dir):
+        """Test that start-file/end-file events track which entry finished"""
+        controller = self.setup_controller(monkeypatch, temp_dir)
+        controller.ipc.event_handlers.append(controller._on_event)
+
+        self.fake.emit({"event": "start-file", "playlist_entry_id": 1})
+        wait_for(lambda: controller.entry_id == 1)
+        assert not controller.has_ended(1)
+
+        self.fake.emit({"event": "end-file", "reason": "eof", "playlist_entry_id": 1})
+        self.fake.emit({"event": "start-file", "playlist_entry_id": 2})
+        wait_for(lambda: controller.entry_id == 2)
+        assert controller.has_ended(1)
+        assert not controller.has_ended(2)
+        assert not controller.has_ended(None)
+
+    def test_warm_load_only_reports_first_audio(self, monkeypatch, temp_dir):
+        """Test that a load into a running mpv drops the earlier startup metrics"""
+        controller = self.setup_controller(monkeypatch, temp_dir)
+        controller.ipc.event_handlers.append(controller._on_event)
+        controller.metrics = {"ready": 0.04, "first_audio": 0.095}
+
+        controller.load("/tmp/b.opus")
+        self.fake.emit({"event": "playback-restart"})
+
+        assert controller.wait_until_playing(1.0)
+        assert list(controller.metrics) == ["first_audio"]
+
+    def test_load_forgets_previous_position(self, monkeypatch, temp_dir):
+        """Test that the next file does not read as ended from the last one's state"""
+        controller = self.setup_controller(monkeypatch, temp_dir)
+        controller.state = {"time-pos": 299.8, "duration": 300.0, "speed": 1.0, "pause": False}
+
+        controller.load("/b.opus")
+
+        pos, dur = controller.get_position(), controller.get_duration()
+        assert not (dur > 0 and pos >= dur - 0.5)
+        assert controller.get_speed() == 1.0
+
+    def test_advance_forgets_previous_position(self, monkeypatch, temp_dir):
+        """Test that skipping to the prefetched file also drops the old position"""
+        controller = self.setup_controller(monkeypatch, temp_dir, {"path": "/tmp/a.opus"})
+        controller.prefetch("/tmp/b.opus")
+        controller.state = {"time-pos": 299.8, "duration": 300.0}
+
+        controller.open("/tmp/b.opus")
+
+        assert (controller.get_position(), controller.get_duration()) == (0.0, 0.0)
 
 
 class TestMpvControllerStop:
@@ -462,17 +915,24 @@ class TestMpvControllerStop:
             del sys.modules['player.mpv_controller']
         from player.mpv_controller import MpvController
 
+        from player.mpv_ipc import MpvIpcClient
+
+        fake = FakeMpv()
         controller = MpvController()
-        controller.sock = MagicMock()
-        controller.sock.recv.return_value = b'{}\n'
+        controller.sock = fake.client
+        controller.ipc = MpvIpcClient(fake.client)
         mock_process = MagicMock()
         controller.process = mock_process
 
         controller.stop()
+        fake.thread.join(1)
 
         # Check quit was sent
+        assert fake.commands == [["quit"]]
         assert controller.sock is None
+        assert controller.ipc is None
         mock_process.terminate.assert_called_once()
+        fake.close()
 
     def test_stop_handles_socket_error(self, monkeypatch, temp_dir):
         """Test stop handles socket errors gracefully"""
@@ -484,9 +944,14 @@ class TestMpvControllerStop:
             del sys.modules['player.mpv_controller']
         from player.mpv_controller import MpvController
 
+        from player.mpv_ipc import MpvIpcClient
+
+        fake = FakeMpv()
         controller = MpvController()
-        controller.sock = MagicMock()
-        controller.sock.send.side_effect = Exception("Socket error")
+        controller.ipc = MpvIpcClient(fake.client)
+        controller.sock = fake.client
+        fake.close()
+        controller.ipc._reader.join(1)
         controller.process = MagicMock()
 
         # Should not raise
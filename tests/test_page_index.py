@@ -0,0 +1,93 @@
+"""Tests for page_index.py"""
+import pytest
+from pathlib import Path
+from unittest.mock import MagicMock
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from page_index import PageIndex, load_page_index, page_index_path
+
+
+@pytest.fixture
+def content(monkeypatch, temp_dir):
+    """content.txt written by write_pages, with a blank page 2"""
+    mock_config = MagicMock()
+    mock_config.CACHE_DIR = temp_dir / "cache"
+    monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+    if 'fetcher.pdf' in sys.modules:
+        del sys.modules['fetcher.pdf']
+    from fetcher.pdf import write_pages
+
+    txt_path = temp_dir / "content.txt"
+    write_pages([
+        (0, "Première page\n"),
+        (1, "   "),
+        (2, "Third page\nsecond line\n"),
+        (3, "Fourth page"),
+    ], txt_path)
+    return txt_path
+
+
+class TestPageIndex:
+    """Tests for PageIndex"""
+
+    def test_write_pages_saves_index(self, content):
+        """Test that extraction writes content.idx next to content.txt"""
+        index = PageIndex.load(page_index_path(content), content)
+
+        assert list(index.pages) == [1, 3, 4]
+
+    def test_read_page(self, content):
+        """Test reading single pages by number"""
+        index = PageIndex.load(page_index_path(content), content)
+
+        assert index.read_page(1) == "Première page\n"
+        assert index.read_page(2) == ""
+        assert index.read_page(3) == "Third page\nsecond line\n"
+        assert index.read_page(4) == "Fourth page"
+        assert index.read_page(99) == ""
+
+    def test_read_pages_matches_content_slice(self, content):
+        """Test that a page range equals the same slice of content.txt"""
+        index = PageIndex.load(page_index_path(content), content)
+        text = content.read_text(encoding="utf-8")
+
+        assert index.read_pages(1, 4) == text
+        assert index.read_pages(2, 3) == "--- Page 3 ---\nThird page\nsecond line\n"
+        assert index.read_pages(5, 9) == ""
+
+    def test_build_from_existing_text(self, content):
+        """Test that scanning content.txt gives the same index as extraction"""
+        saved = PageIndex.load(page_index_path(content), content)
+        built = PageIndex.build(content)
+
+        assert list(built.pages) == list(saved.pages)
+        assert list(built.starts) == list(saved.starts)
+        assert list(built.ends) == list(saved.ends)
+
+    def test_load_rejects_other_files(self, temp_dir):
+        """Test that a non-index file is rejected"""
+        bad = temp_dir / "bad.idx"
+        bad.write_bytes(b"\x00" * 32)
+
+        with pytest.raises(ValueError, match="Not a page index"):
+            PageIndex.load(bad, temp_dir / "content.txt")
+
+
+class TestLoadPageIndex:
+    """Tests for load_page_index function"""
+
+    def test_builds_for_older_caches(self, content):
+        """Test that a missing index is built from content.txt and saved"""
+        page_index_path(content).unlink()
+
+        index = load_page_index(content)
+
+        assert page_index_path(content).exists()
+        assert index.read_page(3) == "Third page\nsecond line\n"
+
+    def test_returns_none_without_text(self, temp_dir):
+        """Test that a missing content.txt returns None"""
+        assert load_page_index(temp_dir / "content.txt") is None
@@ -4,6 +4,7 @@ from pathlib import Path
 from unittest.mock import patch, MagicMock, mock_open
 import sys
 import hashlib
+import json
 
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
@@ -44,6 +45,117 @@ class TestGeneratePdfId:
         assert id1 != id2
 
 
+class TestContentId:
+    """Tests for content-based PDF IDs"""
+
+    def load_pdf_module(self, monkeypatch, temp_dir):
+        mock_config = MagicMock()
+        mock_config.CACHE_DIR = temp_dir / "cache"
+        mock_config.DB_PATH = temp_dir / "db" / "test.db"
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        for mod in ['fetcher.pdf', 'db']:
+            if mod in sys.modules:
+                del sys.modules[mod]
+
+        from db import init_db
+        init_db()
+        import fetcher.pdf
+        return sys.modules["fetcher.pdf"]
+
+    def test_moved_file_keeps_id(self, monkeypatch, temp_dir):
+        """Test that a copy in another folder gets the same content ID"""
+        pdf = self.load_pdf_module(monkeypatch, temp_dir)
+
+        original = temp_dir / "a" / "book.pdf"
+        original.parent.mkdir()
+        original.write_bytes(b"%PDF-1.4 same bytes")
+        moved = temp_dir / "b" / "renamed.pdf"
+        moved.parent.mkdir()
+        moved.write_bytes(b"%PDF-1.4 same bytes")
+
+        assert pdf.generate_pdf_id(original, "content") == pdf.generate_pdf_id(moved, "content")
+        assert pdf.generate_pdf_id(original) != pdf.generate_pdf_id(moved)
+
+    def test_modified_file_changes_id(self, monkeypatch, temp_dir):
+        """Test that changing a file's bytes gives it a new content ID"""
+        pdf = self.load_pdf_module(monkeypatch, temp_dir)
+
+        pdf_path = temp_dir / "book.pdf"
+        pdf_path.write_bytes(b"%PDF-1.4 first edition")
+        first = pdf.generate_pdf_id(pdf_path, "content")
+
+        pdf_path.write_bytes(b"%PDF-1.4 second edition, longer")
+        assert pdf.generate_pdf_id(pdf_path, "content") != first
+
+    def test_unchanged_file_skips_hashing(self, monkeypatch, temp_dir):
+        """Test that the size+mtime fingerprint avoids re-reading the file"""
+        pdf = self.load_pdf_module(monkeypatch, temp_dir)
+
+        pdf_path = temp_dir / "book.pdf"
+        pdf_path.write_bytes(b"%PDF-1.4 contents")
+        first = pdf.generate_pdf_id(pdf_path, "content")
+
+        with patch.object(pdf, "hash_file") as mock_hash:
+            assert pdf.generate_pdf_id(pdf_path, "content") == first
+        mock_hash.assert_not_called()
+
+    def test_path_mode_fetch_reuses_stored_fingerprint(self, monkeypatch, temp_dir):
+        """Test that path-ID fetches also skip hashing an unchanged file"""
+        pdf = self.load_pdf_module(monkeypatch, temp_dir)
+        mock_doc = MagicMock()
+        mock_doc.__len__ = lambda self: 1
+        mock_doc.metadata = {"title": "Test Book", "author": "Test Author"}
+        mock_fitz = MagicMock()
+        mock_fitz.open.return_value = mock_doc
+        monkeypatch.setitem(sys.modules, 'fitz', mock_fitz)
+
+        pdf_path = temp_dir / "book.pdf"
+        pdf_path.write_bytes(b"%PDF-1.4 contents")
+        first = pdf.pdf_fingerprint(pdf_path)
+
+        with patch.object(pdf, "hash_file") as mock_hash:
+            result = pdf.fetch_pdf(str(pdf_path), id_mode="path")
+        mock_hash.assert_not_called()
+        assert result["fingerprint"] == first
+
+    def test_file_edited_in_place_is_extracted_again(self, monkeypatch, temp_dir, capsys):
+        """Test that a path-ID refetch of an edited PDF replaces the stale text"""
+        pdf = self.load_pdf_module(monkeypatch, temp_dir)
+        mock_page = MagicMock()
+        mock_doc = MagicMock()
+        mock_doc.__len__ = lambda self: 1
+        mock_doc.__getitem__ = lambda self, idx: mock_page
+        mock_doc.metadata = {"title": "Test Book", "author": "Test Author"}
+        mock_fitz = MagicMock()
+        mock_fitz.open.return_value = mock_doc
+        monkeypatch.setitem(sys.modules, 'fitz', mock_fitz)
+
+        pdf_path = temp_dir / "book.pdf"
+        pdf_path.write_bytes(b"%PDF-1.4 first edition")
+        mock_page.get_text.return_value = "First edition"
+        first = pdf.fetch_pdf(str(pdf_path))
+
+        pdf_path.write_bytes(b"%PDF-1.4 second edition, longer")
+        mock_page.get_text.return_value = "Second edition"
+        second = pdf.fetch_pdf(str(pdf_path))
+
+        assert second["id"] == first["id"]
+        assert second["fingerprint"] != first["fingerprint"]
+        assert "Second edition" in Path(second["txt_path"]).read_text()
+
+        capsys.readouterr()
+        assert pdf.fetch_pdf(str(pdf_path))["fingerprint"] == second["fingerprint"]
+        assert "Text already cached" in capsys.readouterr().out
+
+    def test_unknown_mode_raises(self, monkeypatch, temp_dir):
+        """Test that an unknown ID mode is rejected"""
+        pdf = self.load_pdf_module(monkeypatch, temp_dir)
+
+        with pytest.raises(ValueError, match="Unknown PDF ID mode"):
+            pdf.generate_pdf_id(temp_dir / "book.pdf", "inode")
+
+
 class TestGetCacheDir:
     """Tests for get_cache_dir function"""
 
@@ -95,10 +207,14 @@ class TestExtractTextWithPymupdf:
         pdf_path.touch()
         txt_path = temp_dir / "output.txt"
 
-        text = extract_text_with_pymupdf(pdf_path, txt_path)
+        stats = extract_text_with_pymupdf(pdf_path, txt_path)
 
-        assert "Page content here" in text
-        assert txt_path.exists()
+        assert stats["path"] == txt_path
+        assert stats["page_count"] == 2
+        assert stats["text_pages"] == 2
+        text = txt_path.read_text()
+        assert text == "--- Page 1 ---\nPage content here\n\n--- Page 2 ---\nPage content here"
+        assert stats["chars"] == len(text)
         mock_doc.close.assert_called_once()
 
     def test_raises_when_fitz_not_installed(self, monkeypatch, temp_dir):
@@ -130,6 +246,113 @@ class TestExtractTextWithPymupdf:
             extract_text_with_pymupdf(Path("/tmp/test.pdf"), Path("/tmp/out.txt"))
 
 
+def make_paged_fitz(page_count):
+    """Mock fitz whose documents return 'Text N' for page N (page 3 blank)"""
+    def open_doc(path):
+        doc = MagicMock()
+        doc.__len__ = lambda self: page_count
+        doc.__getitem__ = lambda self, idx: MagicMock(
+            get_text=MagicMock(return_value="" if idx == 2 else f"Text {idx}")
+        )
+        return doc
+
+    mock_fitz = MagicMock()
+    mock_fitz.open.side_effect = open_doc
+    return mock_fitz
+
+
+class TestExtractTextParallel:
+    """Tests for extract_text_parallel and page_ranges"""
+
+    def test_page_ranges_cover_all_pages(self, monkeypatch, temp_dir):
+        """Test that ranges are contiguous and cover every page once"""
+        mock_config = MagicMock()
+        mock_config.CACHE_DIR = temp_dir / "cache"
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        if 'fetcher.pdf' in sys.modules:
+            del sys.modules['fetcher.pdf']
+        from fetcher.pdf import page_ranges
+
+        for page_count, workers in [(1, 4), (100, 4), (803, 8), (7, 3)]:
+            ranges = page_ranges(page_count, workers)
+            pages = [p for start, stop in ranges for p in range(start, stop)]
+            assert pages == list(range(page_count))
+
+    def test_parallel_matches_serial_output(self, monkeypatch, temp_dir):
+        """Test that parallel extraction merges pages in order like serial"""
+        mock_config = MagicMock()
+        mock_config.CACHE_DIR = temp_dir / "cache"
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+        monkeypatch.setitem(sys.modules, 'fitz', make_paged_fitz(50))
+
+        if 'fetcher.pdf' in sys.modules:
+            del sys.modules['fetcher.pdf']
+        import fetcher.pdf as pdf
+        from concurrent.futures import ThreadPoolExecutor
+
+        # Threads stand in for processes so the mocked fitz is shared
+        monkeypatch.setattr(pdf, "ProcessPoolExecutor", ThreadPoolExecutor)
+
+        serial_stats = pdf.extract_text_with_pymupdf(temp_dir / "test.pdf", temp_dir / "serial.txt")
+        parallel_stats = pdf.extract_text_parallel(
+            temp_dir / "test.pdf", temp_dir / "parallel.txt", workers=4, min_pages=10
+        )
+
+        serial = (temp_dir / "serial.txt").read_text()
+        parallel = (temp_dir / "parallel.txt").read_text()
+        assert parallel == serial
+        assert parallel_stats["text_pages"] == serial_stats["text_pages"] == 49
+        assert "--- Page 3 ---" not in parallel
+        assert parallel.index("--- Page 10 ---") < parallel.index("--- Page 11 ---")
+
+    def test_small_documents_stay_serial(self, monkeypatch, temp_dir):
+        """Test that documents under min_pages skip the process pool"""
+        mock_config = MagicMock()
+        mock_config.CACHE_DIR = temp_dir / "cache"
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+        monkeypatch.setitem(sys.modules, 'fitz', make_paged_fitz(5))
+
+        if 'fetcher.pdf' in sys.modules:
+            del sys.modules['fetcher.pdf']
+        import fetcher.pdf as pdf
+
+        pool = MagicMock()
+        monkeypatch.setattr(pdf, "ProcessPoolExecutor", pool)
+
+        stats = pdf.extract_text_parallel(temp_dir / "test.pdf", temp_dir / "out.txt", workers=4)
+
+        pool.assert_not_called()
+        assert stats["page_count"] == 5
+        assert "--- Page 5 ---" in (temp_dir / "out.txt").read_text()
+
+
+class TestWritePages:
+    """Tests for write_pages function"""
+
+    def test_streams_from_generator(self, monkeypatch, temp_dir):
+        """Test pages are consumed lazily and skipped when blank"""
+        mock_config = MagicMock()
+        mock_config.CACHE_DIR = temp_dir / "cache"
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        if 'fetcher.pdf' in sys.modules:
+            del sys.modules['fetcher.pdf']
+        from fetcher.pdf import write_pages
+
+        txt_path = temp_dir / "out.txt"
+
+        def pages():
+            for n in range(3):
+                yield n, "" if n == 1 else f"page {n}"
+
+        stats = write_pages(pages(), txt_path)
+
+        assert txt_path.read_text() == "--- Page 1 ---\npage 0\n\n--- Page 3 ---\npage 2"
+        assert stats["page_count"] == 3
+        assert stats["text_pages"] == 2
+
+
 class TestExtractMetadataWithPymupdf:
     """Tests for extract_metadata_with_pymupdf function"""
 
@@ -357,6 +580,75 @@ class TestCopyPdfToCache:
         assert result.read_text() == "Cached PDF"
 
 
+class TestPlacePdf:
+    """Tests for cache placement strategies"""
+
+    def load_pdf_module(self, monkeypatch, temp_dir):
+        mock_config = MagicMock()
+        mock_config.CACHE_DIR = temp_dir / "cache"
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        if 'fetcher.pdf' in sys.modules:
+            del sys.modules['fetcher.pdf']
+        import fetcher.pdf
+        return sys.modules["fetcher.pdf"]
+
+    def test_auto_falls_back_to_hardlink(self, monkeypatch, temp_dir):
+        """Test that a failed reflink falls back to a hardlink and is recorded"""
+        pdf = self.load_pdf_module(monkeypatch, temp_dir)
+        monkeypatch.setattr(pdf, "reflink_file", MagicMock(side_effect=OSError("no clone")))
+
+        pdf_path = temp_dir / "original.pdf"
+        pdf_path.write_text("PDF content")
+
+        result = pdf.copy_pdf_to_cache(pdf_path, "testid")
+
+        assert result.stat().st_ino == pdf_path.stat().st_ino
+        placement = json.loads((result.parent / "source.json").read_text())
+        assert placement == {"method": "hardlink", "original_path": str(pdf_path)}
+
+    def test_auto_falls_back_to_copy(self, monkeypatch, temp_dir):
+        """Test that a copy is made when neither reflink nor hardlink work"""
+        pdf = self.load_pdf_module(monkeypatch, temp_dir)
+        monkeypatch.setattr(pdf, "reflink_file", MagicMock(side_effect=OSError("no clone")))
+        monkeypatch.setattr(pdf.os, "link", MagicMock(side_effect=OSError("cross-device")))
+
+        pdf_path = temp_dir / "original.pdf"
+        pdf_path.write_text("PDF content")
+
+        result = pdf.copy_pdf_to_cache(pdf_path, "testid")
+
+        assert result.read_text() == "PDF content"
+        assert json.loads((result.parent / "source.json").read_text())["method"] == "copy"
+
+    def test_reference_resolves_to_original(self, monkeypatch, temp_dir):
+        """Test that reference placement stores no copy but still resolves"""
+        pdf = self.load_pdf_module(monkeypatch, temp_dir)
+
+        pdf_path = temp_dir / "original.pdf"
+        pdf_path.write_text("PDF content")
+
+        result = pdf.copy_pdf_to_cache(pdf_path, "testid", "reference")
+        cache_dir = pdf.get_cache_dir("testid")
+
+        assert result == pdf_path
+        assert not (cache_dir / "source.pdf").exists()
+        assert pdf.resolve_cached_pdf(cache_dir) == pdf_path
+
+        pdf_path.unlink()
+        assert pdf.resolve_cached_pdf(cache_dir) is None
+
+    def test_unknown_strategy_raises(self, monkeypatch, temp_dir):
+        """Test that an unknown placement strategy is rejected"""
+        pdf = self.load_pdf_module(monkeypatch, temp_dir)
+
+        pdf_path = temp_dir / "original.pdf"
+        pdf_path.write_text("PDF content")
+
+        with pytest.raises(ValueError, match="Unknown placement strategy"):
+            pdf.copy_pdf_to_cache(pdf_path, "testid", "symlink")
+
+
 class TestFetchPdf:
     """Tests for fetch_pdf main function"""
 
@@ -426,3 +718,40 @@ class TestFetchPdf:
 
         captured = capsys.readouterr()
         assert "Processing PDF" in captured.out
+
+    def test_fetch_pdf_opens_document_once(self, monkeypatch, temp_dir):
+        """Test metadata, text and outline share one open document"""
+        mock_config = MagicMock()
+        mock_config.CACHE_DIR = temp_dir / "cache"
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        if 'fetcher.pdf' in sys.modules:
+            del sys.modules['fetcher.pdf']
+
+        mock_page = MagicMock()
+        mock_page.get_text.return_value = "Page text"
+
+        mock_doc = MagicMock()
+        mock_doc.__len__ = lambda self: 3
+        mock_doc.__getitem__ = lambda self, idx: mock_page
+        mock_doc.metadata = {"title": "Test Book", "author": "Test Author"}
+        mock_doc.get_toc.return_value = [[1, "Chapter One", 1], [2, "Section", 2]]
+
+        mock_fitz = MagicMock()
+        mock_fitz.open.return_value = mock_doc
+        monkeypatch.setitem(sys.modules, 'fitz', mock_fitz)
+
+        from fetcher.pdf import fetch_pdf
+        import json
+
+        pdf_path = temp_dir / "test.pdf"
+        pdf_path.write_bytes(b"PDF content")
+
+        result = fetch_pdf(str(pdf_path))
+
+        assert mock_fitz.open.call_count == 1
+        mock_doc.close.assert_called_once()
+        assert result["page_stats"]["page_count"] == 3
+
+        outline = json.loads((Path(result["cache_dir"]) / "outline.json").read_text())
+        assert outline[0] == {"level": 1, "title": "Chapter One", "page": 1}
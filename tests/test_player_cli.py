@@ -19,7 +19,7 @@ class TestGetSource:
         monkeypatch.setitem(sys.modules, 'config', mock_config)
 
         for mod in list(sys.modules.keys()):
-            if mod.startswith('player') or mod in ['db', 'models']:
+            if mod.startswith('player') or mod in ['db', 'models', 'repository']:
                 del sys.modules[mod]
 
         from db import init_db, get_connection
@@ -37,8 +37,8 @@ class TestGetSource:
         from player.cli import get_source
 
         result = get_source("test123")
-        assert result["id"] == "test123"
-        assert result["title"] == "Test Title"
+        assert result.id == "test123"
+        assert result.title == "Test Title"
 
     def test_get_source_not_found(self, monkeypatch, temp_dir):
         """Test get_source raises ValueError when not found"""
@@ -49,7 +49,7 @@ class TestGetSource:
         monkeypatch.setitem(sys.modules, 'config', mock_config)
 
         for mod in list(sys.modules.keys()):
-            if mod.startswith('player') or mod in ['db', 'models']:
+            if mod.startswith('player') or mod in ['db', 'models', 'repository']:
                 del sys.modules[mod]
 
         from db import init_db
@@ -73,7 +73,7 @@ class TestListSources:
         monkeypatch.setitem(sys.modules, 'config', mock_config)
 
         for mod in list(sys.modules.keys()):
-            if mod.startswith('player') or mod in ['db', 'models']:
+            if mod.startswith('player') or mod in ['db', 'models', 'repository']:
                 del sys.modules[mod]
 
         from db import init_db
@@ -95,7 +95,7 @@ class TestListSources:
         monkeypatch.setitem(sys.modules, 'config', mock_config)
 
         for mod in list(sys.modules.keys()):
-            if mod.startswith('player') or mod in ['db', 'models']:
+            if mod.startswith('player') or mod in ['db', 'models', 'repository']:
                 del sys.modules[mod]
 
         from db import init_db, get_connection
@@ -128,7 +128,7 @@ class TestListSources:
         monkeypatch.setitem(sys.modules, 'config', mock_config)
 
         for mod in list(sys.modules.keys()):
-            if mod.startswith('player') or mod in ['db', 'models']:
+            if mod.startswith('player') or mod in ['db', 'models', 'repository']:
                 del sys.modules[mod]
 
         from db import init_db, get_connection
@@ -162,7 +162,7 @@ class TestPlay:
         monkeypatch.setitem(sys.modules, 'config', mock_config)
 
         for mod in list(sys.modules.keys()):
-            if mod.startswith('player') or mod in ['db', 'models']:
+            if mod.startswith('player') or mod in ['db', 'models', 'repository']:
                 del sys.modules[mod]
 
         from db import init_db, get_connection
@@ -188,6 +188,35 @@ class TestPlay:
         captured = capsys.readouterr()
         assert "Audio file not found" in captured.out
 
+    def test_play_source_not_fetched_yet(self, monkeypatch, temp_dir, capsys):
+        """Test play reports a queued source instead of failing on its missing cache"""
+        mock_config = MagicMock()
+        mock_config.DB_PATH = temp_dir / "db" / "test.db"
+        mock_config.MPV_SOCKET = str(temp_dir / "mpv.sock")
+        (temp_dir / "db").mkdir(parents=True, exist_ok=True)
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        for mod in list(sys.modules.keys()):
+            if mod.startswith('player') or mod in ['db', 'models', 'repository']:
+                del sys.modules[mod]
+
+        from db import init_db, get_connection
+        init_db()
+
+        conn = get_connection()
+        conn.execute("INSERT INTO sources (id, type, url) VALUES ('youtube_abc', 'youtube', 'https://youtu.be/abc')")
+        conn.commit()
+        conn.close()
+
+        from player.cli import play
+
+        with pytest.raises(SystemExit) as exc_info:
+            play("youtube_abc")
+
+        assert exc_info.value.code == 1
+        captured = capsys.readouterr()
+        assert "Not fetched yet (state: pending)" in captured.out
+
     def test_play_interactive_quit(self, monkeypatch, temp_dir, capsys):
         """Test play with quit key pressed"""
         mock_config = MagicMock()
@@ -197,7 +226,7 @@ class TestPlay:
         monkeypatch.setitem(sys.modules, 'config', mock_config)
 
         for mod in list(sys.modules.keys()):
-            if mod.startswith('player') or mod in ['db', 'models']:
+            if mod.startswith('player') or mod in ['db', 'models', 'repository']:
                 del sys.modules[mod]
 
         from db import init_db, get_connection
@@ -217,6 +246,7 @@ class TestPlay:
 
         # Mock terminal functions
         mock_mpv = MagicMock()
+        mock_mpv.has_ended.return_value = False
         mock_mpv.get_position.return_value = 10.0
         mock_mpv.get_duration.return_value = 300.0
         mock_mpv.get_speed.return_value = 1.0
@@ -240,6 +270,55 @@ class TestPlay:
         assert "Playback ended" in captured.out
         mock_mpv.stop.assert_called_once()
 
+    def test_play_finds_native_audio_container(self, monkeypatch, temp_dir, capsys):
+        """Test play uses whatever audio container was cached"""
+        mock_config = MagicMock()
+        mock_config.DB_PATH = temp_dir / "db" / "test.db"
+        mock_config.MPV_SOCKET = str(temp_dir / "mpv.sock")
+        (temp_dir / "db").mkdir(parents=True, exist_ok=True)
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        for mod in list(sys.modules.keys()):
+            if mod.startswith('player') or mod in ['db', 'models', 'repository']:
+                del sys.modules[mod]
+
+        from db import init_db, get_connection
+        init_db()
+
+        cache_path = temp_dir / "cache"
+        cache_path.mkdir(parents=True, exist_ok=True)
+        (cache_path / "audio.opus").write_text("fake audio")
+
+        conn = get_connection()
+        conn.execute("""
+            INSERT INTO sources (id, type, url, title, author, duration, cache_path, processing_state)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, ("test123", "youtube", "http://test", "Test Video", "Test Author", 300, str(cache_path), "ready"))
+        conn.commit()
+        conn.close()
+
+        mock_mpv = MagicMock()
+        mock_mpv.has_ended.return_value = False
+        mock_mpv.get_position.return_value = 10.0
+        mock_mpv.get_duration.return_value = 300.0
+        mock_mpv.get_speed.return_value = 1.0
+        mock_mpv.get_paused.return_value = False
+
+        mock_stdin = MagicMock()
+        mock_stdin.fileno.return_value = 0
+        mock_stdin.read.return_value = 'q'
+
+        with patch('player.cli.MpvController', return_value=mock_mpv):
+            with patch('tty.setraw'):
+                with patch('termios.tcgetattr', return_value=[]):
+                    with patch('termios.tcsetattr'):
+                        with patch('select.select', return_value=([mock_stdin], [], [])):
+                            with patch('sys.stdin', mock_stdin):
+                                from player.cli import play
+                                play("test123")
+
+        mock_mpv.start.assert_called_once_with(str(cache_path / "audio.opus"))
+
     def test_play_interactive_controls(self, monkeypatch, temp_dir, capsys):
         """Test play with various control keys"""
         mock_config = MagicMock()
@@ -249,7 +328,7 @@ class TestPlay:
         monkeypatch.setitem(sys.modules, 'config', mock_config)
 
         for mod in list(sys.modules.keys()):
-            if mod.startswith('player') or mod in ['db', 'models']:
+            if mod.startswith('player') or mod in ['db', 'models', 'repository']:
                 del sys.modules[mod]
 
         from db import init_db, get_connection
@@ -268,6 +347,7 @@ class TestPlay:
         conn.close()
 
         mock_mpv = MagicMock()
+        mock_mpv.has_ended.return_value = False
         mock_mpv.get_position.return_value = 10.0
         mock_mpv.get_duration.return_value = 300.0
         mock_mpv.get_speed.return_value = 1.0
@@ -275,13 +355,13 @@ class TestPlay:
 
         mock_stdin = MagicMock()
         mock_stdin.fileno.return_value = 0
-        # Simulate pressing space, +, -, j, k, J, K, =, then q
-        mock_stdin.read.side_effect = [' ', '+', '-', 'j', 'k', 'J', 'K', '=', 'q']
+        # Simulate pressing space, +, -, j, k, J, K, =, n, p, then q
+        mock_stdin.read.side_effect = [' ', '+', '-', 'j', 'k', 'J', 'K', '=', 'n', 'p', 'q']
 
         call_count = [0]
         def mock_select(*args):
             call_count[0] += 1
-            if call_count[0] <= 9:
+            if call_count[0] <= 11:
                 return ([mock_stdin], [], [])
             return ([], [], [])
 
@@ -299,6 +379,7 @@ class TestPlay:
         assert mock_mpv.speed_up.call_count == 2  # + and =
         mock_mpv.speed_down.assert_called_once()
         assert mock_mpv.seek.call_count == 4  # j, k, J, K
+        assert [c.args for c in mock_mpv.chapter_jump.call_args_list] == [(1,), (-1,)]
 
     def test_play_ends_naturally(self, monkeypatch, temp_dir, capsys):
         """Test play ends when playback completes"""
@@ -309,7 +390,7 @@ class TestPlay:
         monkeypatch.setitem(sys.modules, 'config', mock_config)
 
         for mod in list(sys.modules.keys()):
-            if mod.startswith('player') or mod in ['db', 'models']:
+            if mod.startswith('player') or mod in ['db', 'models', 'repository']:
                 del sys.modules[mod]
 
         from db import init_db, get_connection
@@ -328,6 +409,8 @@ class TestPlay:
         conn.close()
 
         mock_mpv = MagicMock()
+        mock_mpv.has_ended.return_value = False
+        mock_mpv.metrics = {"ready": 0.04, "first_audio": 0.095}
         # Simulate playback ending - position >= duration - 0.5
         mock_mpv.get_position.return_value = 99.6
         mock_mpv.get_duration.return_value = 100.0
@@ -347,6 +430,7 @@ class TestPlay:
                                 play("test123")
 
         captured = capsys.readouterr()
+        assert "Started: mpv ready 40 ms, first audio 95 ms" in captured.out
         assert "Playback ended" in captured.out
 
     def test_play_zero_duration_progress(self, monkeypatch, temp_dir, capsys):
@@ -358,7 +442,7 @@ class TestPlay:
         monkeypatch.setitem(sys.modules, 'config', mock_config)
 
         for mod in list(sys.modules.keys()):
-            if mod.startswith('player') or mod in ['db', 'models']:
+            if mod.startswith('player') or mod in ['db', 'models', 'repository']:
                 del sys.modules[mod]
 
         from db import init_db, get_connection
@@ -377,6 +461,7 @@ class TestPlay:
         conn.close()
 
         mock_mpv = MagicMock()
+        mock_mpv.has_ended.return_value = False
         mock_mpv.get_position.return_value = 0.0
         mock_mpv.get_duration.return_value = 0.0  # Zero duration
         mock_mpv.get_speed.return_value = 1.0
@@ -400,6 +485,216 @@ class TestPlay:
         assert "Playback ended" in captured.out
 
 
+class TestPlayQueue:
+    """Tests for playing several sources in one mpv"""
+
+    def test_queue_reuses_one_mpv_and_prefetches(self, monkeypatch, temp_dir, capsys):
+        """Test that sources play back to back with the next one prefetched"""
+        mock_config = MagicMock()
+        mock_config.DB_PATH = temp_dir / "db" / "test.db"
+        mock_config.MPV_SOCKET = str(temp_dir / "mpv.sock")
+        (temp_dir / "db").mkdir(parents=True, exist_ok=True)
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        for mod in list(sys.modules.keys()):
+            if mod.startswith('player') or mod in ['db', 'models', 'repository']:
+                del sys.modules[mod]
+
+        from db import init_db, get_connection
+        init_db()
+
+        conn = get_connection()
+        for source_id in ["first", "second"]:
+            cache_path = temp_dir / "cache" / source_id
+            cache_path.mkdir(parents=True)
+            (cache_path / "audio.opus").write_text("fake audio")
+            conn.execute("""
+                INSERT INTO sources (id, type, url, title, author, duration, cache_path, processing_state)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (source_id, "youtube", "http://test", source_id, "Author", 100, str(cache_path), "ready"))
+        conn.commit()
+        conn.close()
+
+        # Each source plays to its end without input
+        mock_mpv = MagicMock()
+        mock_mpv.has_ended.return_value = False
+        mock_mpv.get_position.return_value = 99.6
+        mock_mpv.get_duration.return_value = 100.0
+        mock_mpv.get_speed.return_value = 1.0
+        mock_mpv.get_paused.return_value = False
+
+        mock_stdin = MagicMock()
+        mock_stdin.fileno.return_value = 0
+
+        with patch('player.cli.MpvController', return_value=mock_mpv) as controller_cls:
+            with patch('tty.setraw'):
+                with patch('termios.tcgetattr', return_value=[]):
+                    with patch('termios.tcsetattr'):
+                        with patch('select.select', return_value=([], [], [])):
+                            with patch('sys.stdin', mock_stdin):
+                                from player.cli import play_queue
+                                play_queue(["first", "second"])
+
+        first_audio = str(temp_dir / "cache" / "first" / "audio.opus")
+        second_audio = str(temp_dir / "cache" / "second" / "audio.opus")
+        controller_cls.assert_called_once()
+        mock_mpv.start.assert_not_called()
+        assert [c.args[0] for c in mock_mpv.open.call_args_list] == [first_audio, second_audio]
+        mock_mpv.prefetch.assert_called_once_with(second_audio)
+        # Each source waits for its own audio before reading the position
+        assert mock_mpv.wait_until_playing.call_count == 2
+        mock_mpv.stop.assert_called_once()
+
+    def test_pending_next_source_is_not_prefetched(self, monkeypatch, temp_dir, capsys):
+        """Test that a queued source after the current one does not break playback"""
+        mock_config = MagicMock()
+        mock_config.DB_PATH = temp_dir / "db" / "test.db"
+        mock_config.MPV_SOCKET = str(temp_dir / "mpv.sock")
+        (temp_dir / "db").mkdir(parents=True, exist_ok=True)
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        for mod in list(sys.modules.keys()):
+            if mod.startswith('player') or mod in ['db', 'models', 'repository']:
+                del sys.modules[mod]
+
+        from db import init_db, get_connection
+        init_db()
+
+        cache_path = temp_dir / "cache" / "first"
+        cache_path.mkdir(parents=True)
+        (cache_path / "audio.opus").write_text("fake audio")
+        conn = get_connection()
+        conn.execute("""
+            INSERT INTO sources (id, type, url, title, author, duration, cache_path, processing_state)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, ("first", "youtube", "http://test", "First", "Author", 100, str(cache_path), "ready"))
+        conn.execute("INSERT INTO sources (id, type, url) VALUES ('second', 'youtube', 'http://test')")
+        conn.commit()
+        conn.close()
+
+        mock_mpv = MagicMock()
+        mock_mpv.has_ended.return_value = False
+        mock_mpv.get_position.return_value = 99.6
+        mock_mpv.get_duration.return_value = 100.0
+        mock_mpv.get_speed.return_value = 1.0
+        mock_mpv.get_paused.return_value = False
+
+        mock_stdin = MagicMock()
+        mock_stdin.fileno.return_value = 0
+
+        with patch('player.cli.MpvController', return_value=mock_mpv):
+            with patch('tty.setraw'):
+                with patch('termios.tcgetattr', return_value=[]):
+                    with patch('termios.tcsetattr'):
+                        with patch('select.select', return_value=([], [], [])):
+                            with patch('sys.stdin', mock_stdin):
+                                from player.cli import play_queue
+                                with pytest.raises(SystemExit):
+                                    play_queue(["first", "second"])
+
+        mock_mpv.prefetch.assert_not_called()
+        mock_mpv.stop.assert_called_once()
+        assert "Not fetched yet (state: pending): second" in capsys.readouterr().out
+
+    def test_quit_stops_the_queue(self, monkeypatch, temp_dir):
+        """Test that q ends the whole queue, not just the current source"""
+        mock_config = MagicMock()
+        mock_config.DB_PATH = temp_dir / "db" / "test.db"
+        mock_config.MPV_SOCKET = str(temp_dir / "mpv.sock")
+        (temp_dir / "db").mkdir(parents=True, exist_ok=True)
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        for mod in list(sys.modules.keys()):
+            if mod.startswith('player') or mod in ['db', 'models', 'repository']:
+                del sys.modules[mod]
+
+        from player import cli as player_cli
+
+        mock_play = MagicMock(return_value=False)
+        player_cli.play = mock_play
+
+        with patch('player.cli.MpvController') as controller_cls:
+            player_cli.play_queue(["first", "second"])
+
+        mock_play.assert_called_once_with("first", mpv=controller_cls.return_value, next_source_id="second")
+        controller_cls.return_value.stop.assert_called_once()
+
+    def test_play_ends_when_mpv_moves_on(self, monkeypatch, temp_dir, capsys):
+        """Test that a file switch ends play even far from the old file's end"""
+        import threading
+        import time
+        from tests.test_mpv_controller import FakeMpv, wait_for
+
+        mock_config = MagicMock()
+        mock_config.DB_PATH = temp_dir / "db" / "test.db"
+        mock_config.MPV_SOCKET = str(temp_dir / "mpv.sock")
+        (temp_dir / "db").mkdir(parents=True, exist_ok=True)
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        for mod in list(sys.modules.keys()):
+            if mod.startswith('player') or mod in ['db', 'models', 'repository']:
+                del sys.modules[mod]
+
+        from db import init_db, get_connection
+        init_db()
+        cache_path = temp_dir / "cache"
+        cache_path.mkdir(parents=True)
+        (cache_path / "audio.opus").write_text("fake audio")
+        conn = get_connection()
+        conn.execute("""
+            INSERT INTO sources (id, type, url, title, author, duration, cache_path, processing_state)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, ("first", "youtube", "http://test", "First", "Author", 300, str(cache_path), "ready"))
+        conn.commit()
+        conn.close()
+
+        from player.cli import play
+        from player.mpv_controller import MpvController
+        from player.mpv_ipc import MpvIpcClient
+
+        fake = FakeMpv({"time-pos": 10.0, "duration": 300.0, "speed": 1.0, "pause": False})
+        mpv = MpvController()
+        mpv.process = MagicMock()
+        mpv.process.poll.return_value = None
+        mpv.ipc = MpvIpcClient(fake.client)
+        mpv._observe()
+
+        def mpv_side():
+            # The file starts, then mpv skips to the prefetched one, e.g. on a
+            # seek past the end; the old file's position never nears its end
+            wait_for(lambda: any(c[0] == "loadfile" for c in fake.commands))
+            fake.emit({"event": "start-file", "playlist_entry_id": 1})
+            fake.emit({"event": "playback-restart"})
+            time.sleep(0.05)
+            fake.emit({"event": "end-file", "reason": "eof", "playlist_entry_id": 1})
+            fake.emit({"event": "start-file", "playlist_entry_id": 2})
+        threading.Thread(target=mpv_side, daemon=True).start()
+
+        mock_stdin = MagicMock()
+        mock_stdin.fileno.return_value = 0
+        mock_stdin.read.return_value = 'q'
+        polls = [0]
+
+        def mock_select(*args):
+            polls[0] += 1
+            time.sleep(0.005)
+            return ([mock_stdin], [], []) if polls[0] > 400 else ([], [], [])  # Give up after ~2s
+
+        try:
+            with patch('tty.setraw'):
+                with patch('termios.tcgetattr', return_value=[]):
+                    with patch('termios.tcsetattr'):
+                        with patch('select.select', side_effect=mock_select):
+                            with patch('sys.stdin', mock_stdin):
+                                finished = play("first", mpv=mpv)
+        finally:
+            mpv.ipc.close()
+            fake.close()
+
+        assert finished
+        assert mpv.entry_id == 2
+
+
 class TestMain:
     """Tests for main function"""
 
@@ -412,7 +707,7 @@ class TestMain:
         monkeypatch.setitem(sys.modules, 'config', mock_config)
 
         for mod in list(sys.modules.keys()):
-            if mod.startswith('player') or mod in ['db', 'models']:
+            if mod.startswith('player') or mod in ['db', 'models', 'repository']:
                 del sys.modules[mod]
 
         from db import init_db
@@ -437,7 +732,7 @@ class TestMain:
         monkeypatch.setitem(sys.modules, 'config', mock_config)
 
         for mod in list(sys.modules.keys()):
-            if mod.startswith('player') or mod in ['db', 'models']:
+            if mod.startswith('player') or mod in ['db', 'models', 'repository']:
                 del sys.modules[mod]
 
         from db import init_db
@@ -462,7 +757,7 @@ class TestMain:
         monkeypatch.setitem(sys.modules, 'config', mock_config)
 
         for mod in list(sys.modules.keys()):
-            if mod.startswith('player') or mod in ['db', 'models']:
+            if mod.startswith('player') or mod in ['db', 'models', 'repository']:
                 del sys.modules[mod]
 
         from db import init_db
@@ -477,3 +772,25 @@ class TestMain:
             player_cli.main()
 
         mock_play.assert_called_once_with('test_source_id')
+
+    def test_main_with_several_ids_plays_queue(self, monkeypatch, temp_dir):
+        """Test main with several source ids plays them as a queue"""
+        mock_config = MagicMock()
+        mock_config.DB_PATH = temp_dir / "db" / "test.db"
+        mock_config.MPV_SOCKET = str(temp_dir / "mpv.sock")
+        (temp_dir / "db").mkdir(parents=True, exist_ok=True)
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        for mod in list(sys.modules.keys()):
+            if mod.startswith('player') or mod in ['db', 'models', 'repository']:
+                del sys.modules[mod]
+
+        from player import cli as player_cli
+
+        mock_queue = MagicMock()
+        player_cli.play_queue = mock_queue
+
+        with patch('sys.argv', ['cli.py', 'a', 'b']):
+            player_cli.main()
+
+        mock_queue.assert_called_once_with(['a', 'b'])
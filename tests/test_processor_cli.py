@@ -19,7 +19,7 @@ class TestProcessSource:
         monkeypatch.setitem(sys.modules, 'config', mock_config)
 
         for mod in list(sys.modules.keys()):
-            if mod.startswith('processor') or mod in ['db', 'models']:
+            if mod.startswith('processor') or mod in ['db', 'models', 'repository']:
                 del sys.modules[mod]
 
         from db import init_db
@@ -43,7 +43,7 @@ class TestProcessSource:
         monkeypatch.setitem(sys.modules, 'config', mock_config)
 
         for mod in list(sys.modules.keys()):
-            if mod.startswith('processor') or mod in ['db', 'models']:
+            if mod.startswith('processor') or mod in ['db', 'models', 'repository']:
                 del sys.modules[mod]
 
         from db import init_db, get_connection
@@ -84,7 +84,7 @@ class TestProcessSource:
         monkeypatch.setitem(sys.modules, 'config', mock_config)
 
         for mod in list(sys.modules.keys()):
-            if mod.startswith('processor') or mod in ['db', 'models']:
+            if mod.startswith('processor') or mod in ['db', 'models', 'repository']:
                 del sys.modules[mod]
 
         from db import init_db, get_connection
@@ -119,7 +119,7 @@ class TestProcessSource:
         monkeypatch.setitem(sys.modules, 'config', mock_config)
 
         for mod in list(sys.modules.keys()):
-            if mod.startswith('processor') or mod in ['db', 'models']:
+            if mod.startswith('processor') or mod in ['db', 'models', 'repository']:
                 del sys.modules[mod]
 
         from db import init_db, get_connection
@@ -163,7 +163,7 @@ class TestMain:
         monkeypatch.setitem(sys.modules, 'config', mock_config)
 
         for mod in list(sys.modules.keys()):
-            if mod.startswith('processor') or mod in ['db', 'models']:
+            if mod.startswith('processor') or mod in ['db', 'models', 'repository']:
                 del sys.modules[mod]
 
         from db import init_db
@@ -0,0 +1,216 @@
+"""Tests for repository.py"""
+import pytest
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import MagicMock
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+
+@pytest.fixture
+def repo(monkeypatch, temp_dir):
+    """Fresh repository module against a temp database"""
+    mock_config = MagicMock()
+    mock_config.DB_PATH = temp_dir / "db" / "test.db"
+    (temp_dir / "db").mkdir(parents=True, exist_ok=True)
+    monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+    for mod in ['db', 'models', 'repository']:
+        if mod in sys.modules:
+            del sys.modules[mod]
+
+    import db
+    import repository
+    db.init_db()
+    yield repository
+    db.close_connection()
+
+
+def make_source(source_id, fingerprint="f1", state=None):
+    from models import Source, SourceType, ProcessingState
+    return Source(
+        id=source_id, type=SourceType.YOUTUBE, url=f"https://youtu.be/{source_id}",
+        title=f"Title {source_id}", author="Author", duration=60, cache_path="/cache",
+        processing_state=state or ProcessingState.READY, fingerprint=fingerprint,
+    )
+
+
+class TestSources:
+    """Tests for row mapping and batched source access"""
+
+    def test_get_maps_row_to_dataclass(self, repo):
+        """Test that enums and timestamps come back typed"""
+        from db import connection
+        from models import Source, SourceType, ProcessingState
+
+        conn = connection()
+        with conn:
+            repo.sources.upsert_many(conn, [make_source("a")])
+
+        source = repo.sources.get("a")
+
+        assert isinstance(source, Source)
+        assert source.type is SourceType.YOUTUBE
+        assert source.processing_state is ProcessingState.READY
+        assert isinstance(source.created_at, datetime)
+        assert source.fingerprint == "f1"
+        assert repo.sources.get("missing") is None
+
+    def test_get_many_is_keyed_by_id(self, repo):
+        """Test that get_many returns only the ids that exist"""
+        from db import connection
+
+        conn = connection()
+        with conn:
+            repo.sources.upsert_many(conn, [make_source("a"), make_source("b"), make_source("c")])
+
+        found = repo.sources.get_many(["a", "c", "missing"])
+
+        assert sorted(found) == ["a", "c"]
+        assert found["c"].title == "Title c"
+
+    def test_upsert_many_skips_unchanged_fingerprints(self, repo):
+        """Test that only changed sources are returned from upsert_many"""
+        from db import connection
+
+        conn = connection()
+        with conn:
+            repo.sources.upsert_many(conn, [make_source("a"), make_source("b")])
+        with conn:
+            changed = repo.sources.upsert_many(conn, [make_source("a"), make_source("b", "f2")])
+
+        assert [source.id for source in changed] == ["b"]
+        assert repo.sources.get("b").fingerprint == "f2"
+
+    def test_claim_pending_returns_downloading_source(self, repo):
+        """Test that claim_pending hands out each queued source once"""
+        from db import connection
+        from models import ProcessingState
+
+        conn = connection()
+        with conn:
+            repo.enqueue_sources(conn, [make_source("a")])
+
+        job = repo.claim_pending(conn)
+
+        assert job.id == "a"
+        assert job.processing_state is ProcessingState.DOWNLOADING
+        assert repo.sources.get("a").processing_state is ProcessingState.DOWNLOADING
+        assert repo.claim_pending(conn) is None
+
+
+class TestChildTables:
+    """Tests for notes and marks grouped by source"""
+
+    def test_note_upsert_assigns_id(self, repo):
+        """Test that a new note gets its rowid and round-trips"""
+        from db import connection
+        from models import Note, NoteType, NoteStatus
+
+        conn = connection()
+        note = Note(id=None, source_id="a", type=NoteType.SOURCE, title="Report")
+        with conn:
+            repo.notes.upsert_many(conn, [note])
+
+        assert note.id is not None
+        stored = repo.notes.get(note.id)
+        assert stored.type is NoteType.SOURCE
+        assert stored.status is NoteStatus.DRAFT
+
+    def test_for_sources_groups_in_one_query(self, repo):
+        """Test that marks of several sources come back grouped and ordered"""
+        from db import connection
+        from models import Mark, MarkType
+
+        conn = connection()
+        with conn:
+            repo.marks.upsert_many(conn, [
+                Mark(id=None, source_id="a", timestamp=30.0, type=MarkType.NOTE),
+                Mark(id=None, source_id="a", timestamp=10.0, type=MarkType.HIGHLIGHT),
+                Mark(id=None, source_id="b", timestamp=5.0, type=MarkType.QUESTION),
+            ])
+
+        grouped = repo.marks.for_sources(["a", "b", "c"])
+
+        assert [mark.timestamp for mark in grouped["a"]] == [10.0, 30.0]
+        assert grouped["b"][0].type is MarkType.QUESTION
+        assert grouped["c"] == []
+
+
+class TestSlots:
+    """Tests for the slotted dataclasses"""
+
+    def test_models_have_no_instance_dict(self, repo):
+        """Test that slots=True drops the per-instance __dict__"""
+        source = make_source("a")
+
+        assert not hasattr(source, "__dict__")
+        with pytest.raises(AttributeError):
+            source.not_a_field = 1
+
+
+class TestSourceCache:
+    """Tests for the cached source and metadata lookups"""
+
+    def save(self, repo, *items):
+        from db import get_connection
+        conn = get_connection()
+        with conn:
+            repo.sources.upsert_many(conn, items)
+        conn.close()
+
+    def test_repeat_lookups_hit_the_cache(self, repo):
+        """Test that the second lookup of a source is a hit"""
+        self.save(repo, make_source("a"))
+
+        first = repo.cached_source("a")
+        second = repo.cached_source("a")
+
+        assert second is first
+        stats = repo.cache_stats()["sources"]
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    def test_write_from_other_connection_invalidates(self, repo):
+        """Test that a commit on another connection is seen via data_version"""
+        from db import get_connection
+        self.save(repo, make_source("a"))
+        repo.cached_source("a")
+
+        conn = get_connection()
+        with conn:
+            conn.execute("UPDATE sources SET title = 'Renamed' WHERE id = 'a'")
+        conn.close()
+
+        assert repo.cached_source("a").title == "Renamed"
+
+    def test_repository_write_invalidates(self, repo):
+        """Test that set_state through the repository drops the entry"""
+        from db import connection
+        from models import ProcessingState
+        self.save(repo, make_source("a"))
+        repo.cached_source("a")
+
+        conn = connection()
+        with conn:
+            repo.set_state(conn, "a", ProcessingState.ERROR)
+
+        assert repo.cached_source("a").processing_state is ProcessingState.ERROR
+
+    def test_metadata_is_parsed_once(self, repo, temp_dir):
+        """Test that metadata.json is read once and dropped with its source"""
+        cache_dir = temp_dir / "cache" / "a"
+        cache_dir.mkdir(parents=True)
+        (cache_dir / "metadata.json").write_text('{"title": "First"}')
+        source = make_source("a")
+        source.cache_path = str(cache_dir)
+        self.save(repo, source)
+
+        assert repo.source_metadata("a") == {"title": "First"}
+        (cache_dir / "metadata.json").write_text('{"title": "Second"}')
+        assert repo.source_metadata("a") == {"title": "First"}
+
+        source.fingerprint = "f2"
+        self.save(repo, source)
+        assert repo.source_metadata("a") == {"title": "Second"}
+        assert repo.source_metadata("missing") == {}
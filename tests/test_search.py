@@ -0,0 +1,236 @@
+"""Tests for search/index.py and search/cli.py"""
+import pytest
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+
+@pytest.fixture
+def search_env(monkeypatch, temp_dir):
+    """Fresh modules against a temp database"""
+    mock_config = MagicMock()
+    mock_config.CACHE_DIR = temp_dir / "cache"
+    mock_config.DB_PATH = temp_dir / "db" / "test.db"
+    monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+    for mod in list(sys.modules.keys()):
+        if mod.startswith(('fetcher', 'search', 'player')) or mod in ['db', 'models', 'repository']:
+            del sys.modules[mod]
+
+    import db
+    db.init_db()
+    yield db
+    db.close_connection()
+
+
+def make_source(source_id, source_type, url, title, author, duration, cache_path, fingerprint):
+    from models import Source, SourceType, ProcessingState
+    return Source(
+        id=source_id, type=SourceType(source_type), url=url, title=title, author=author,
+        duration=duration, cache_path=cache_path, processing_state=ProcessingState.READY,
+        fingerprint=fingerprint,
+    )
+
+
+def write_pdf_cache(cache_dir: Path):
+    cache_dir.mkdir(parents=True)
+    (cache_dir / "content.txt").write_text(
+        "--- Page 1 ---\nApril is the cruellest month\n\n"
+        "--- Page 2 ---\nbreeding lilacs out of the dead land\n"
+    )
+
+
+def write_transcript_cache(cache_dir: Path, cues: int):
+    cache_dir.mkdir(parents=True)
+    lines = [f"{i * 3}.0\t{i * 3 + 3}.0\tline {i}" for i in range(cues)]
+    lines[25] = "75.0\t78.0\tthe heap of broken images"
+    (cache_dir / "transcript.cues").write_text("\n".join(lines) + "\n")
+
+
+class TestChunks:
+    """Tests for content chunking"""
+
+    def test_pdf_chunks_are_pages(self, search_env, temp_dir):
+        """Test that content.txt is split on page markers"""
+        from search.index import iter_pdf_chunks
+        write_pdf_cache(temp_dir / "pdf")
+
+        chunks = list(iter_pdf_chunks(temp_dir / "pdf"))
+
+        assert chunks == [
+            (1, "April is the cruellest month"),
+            (2, "breeding lilacs out of the dead land"),
+        ]
+
+    def test_transcript_chunks_group_cues(self, search_env, temp_dir):
+        """Test that cues are grouped with the first cue's start time"""
+        from search.index import iter_transcript_chunks, CUES_PER_CHUNK
+        write_transcript_cache(temp_dir / "yt", cues=30)
+
+        chunks = list(iter_transcript_chunks(temp_dir / "yt"))
+
+        assert [start for start, _ in chunks] == [0.0, CUES_PER_CHUNK * 3.0]
+        assert "the heap of broken images" in chunks[1][1]
+
+
+class TestSearch:
+    """Tests for indexing at ingest and ranked search"""
+
+    def test_ingest_indexes_content(self, search_env, temp_dir):
+        """Test that saving a source indexes its text and search finds it"""
+        from fetcher.cli import save_sources
+        from search.cli import search
+
+        write_pdf_cache(temp_dir / "pdf")
+        write_transcript_cache(temp_dir / "yt", cues=30)
+        save_sources([
+            make_source("pdf_a", "pdf", "/books/a.pdf", "The Waste Land", "T. S. Eliot", 2,
+                        str(temp_dir / "pdf"), "sha256:a"),
+            make_source("youtube_b", "youtube", "https://youtu.be/b", "A Reading", "Someone", 90,
+                        str(temp_dir / "yt"), "b:1"),
+        ])
+
+        results = search("lilacs")
+        assert [(r["source_id"], r["locator"]) for r in results["content"]] == [("pdf_a", 2.0)]
+        assert "[lilacs]" in results["content"][0]["snippet"]
+
+        results = search("broken images")
+        assert results["content"][0]["source_id"] == "youtube_b"
+        assert results["content"][0]["locator"] == 60.0
+
+        results = search("waste")
+        assert results["sources"][0]["source_id"] == "pdf_a"
+        assert results["sources"][0]["title"] == "The [Waste] Land"
+
+    def test_resaving_changed_source_replaces_chunks(self, search_env, temp_dir):
+        """Test that re-ingesting a changed source does not duplicate chunks"""
+        from fetcher.cli import save_sources
+        from search.cli import search
+
+        write_pdf_cache(temp_dir / "pdf")
+        source = make_source("pdf_a", "pdf", "/a.pdf", "T", "A", 2, str(temp_dir / "pdf"), "sha256:1")
+        save_sources([source])
+        (temp_dir / "pdf" / "content.txt").write_text("--- Page 1 ---\nlilacs again\n")
+        source.fingerprint = "sha256:2"
+        save_sources([source])
+
+        results = search("lilacs")
+        assert len(results["content"]) == 1
+        assert results["content"][0]["snippet"] == "[lilacs] again"
+
+    def test_notes_are_indexed_by_triggers(self, search_env):
+        """Test that notes are searchable after insert and update"""
+        from search.cli import search
+
+        conn = search_env.get_connection()
+        conn.execute("INSERT INTO notes (id, source_id, type, title, content) "
+                     "VALUES (1, 'pdf_a', 'source', 'Reading', 'fear in a handful of dust')")
+        conn.commit()
+        assert search("handful")["notes"][0]["id"] == 1
+
+        conn.execute("UPDATE notes SET content = 'shantih' WHERE id = 1")
+        conn.commit()
+        conn.close()
+        assert search("handful")["notes"] == []
+        assert search("shantih")["notes"][0]["id"] == 1
+
+    def test_punctuation_is_literal(self, search_env):
+        """Test that queries with FTS operators do not raise"""
+        from search.cli import search
+
+        assert search('T.S. "Eliot" -: NEAR(') == {"sources": [], "content": [], "notes": []}
+
+    def test_reindex_rebuilds_everything(self, search_env, temp_dir):
+        """Test that --reindex indexes sources saved before the index existed"""
+        from search.index import reindex_all
+        from search.cli import search
+
+        write_pdf_cache(temp_dir / "pdf")
+        conn = search_env.get_connection()
+        conn.execute("INSERT INTO sources (id, type, title, author, cache_path) "
+                     "VALUES ('pdf_a', 'pdf', 'The Waste Land', 'Eliot', ?)", (str(temp_dir / "pdf"),))
+        conn.execute("DELETE FROM sources_fts")
+        conn.commit()
+
+        assert reindex_all(conn) == (1, 2)
+        conn.close()
+        assert search("cruellest")["content"][0]["locator"] == 1.0
+        assert search("eliot")["sources"][0]["source_id"] == "pdf_a"
+
+    def test_upgrade_indexes_existing_rows(self, monkeypatch, temp_dir):
+        """Test that migrating a pre-search database indexes what it already holds"""
+        import sqlite3
+        db_path = temp_dir / "db" / "test.db"
+        db_path.parent.mkdir(parents=True)
+        write_pdf_cache(temp_dir / "pdf")
+
+        # Tables as created before full-text search existed
+        conn = sqlite3.connect(str(db_path))
+        conn.executescript("""
+            CREATE TABLE sources (
+                id TEXT PRIMARY KEY, type TEXT NOT NULL, url TEXT, title TEXT, author TEXT,
+                duration INTEGER, cache_path TEXT, processing_state TEXT DEFAULT 'pending',
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            );
+            CREATE TABLE notes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, source_id TEXT, type TEXT NOT NULL,
+                title TEXT NOT NULL, content TEXT, obsidian_path TEXT, status TEXT DEFAULT 'draft',
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            );
+        """)
+        conn.execute("INSERT INTO sources (id, type, title, author, cache_path, processing_state) "
+                     "VALUES ('pdf_a', 'pdf', 'Gravity', 'Newton', ?, 'ready')", (str(temp_dir / "pdf"),))
+        conn.execute("INSERT INTO notes (id, source_id, type, title, content) "
+                     "VALUES (1, 'pdf_a', 'source', 'Reading', 'on gravity')")
+        conn.commit()
+        conn.close()
+
+        mock_config = MagicMock()
+        mock_config.CACHE_DIR = temp_dir / "cache"
+        mock_config.DB_PATH = db_path
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+        for mod in list(sys.modules.keys()):
+            if mod.startswith(('fetcher', 'search', 'player')) or mod in ['db', 'models', 'repository']:
+                del sys.modules[mod]
+        import db
+        from search.cli import search
+        db.init_db()
+
+        try:
+            results = search("gravity")
+            assert results["sources"][0]["source_id"] == "pdf_a"
+            assert results["notes"][0]["id"] == 1
+            assert search("cruellest")["content"][0]["locator"] == 1.0
+
+            conn = db.get_connection()
+            conn.execute("UPDATE notes SET content = 'on orbits' WHERE id = 1")
+            conn.execute("INSERT INTO notes_fts (notes_fts) VALUES ('integrity-check')")
+            conn.commit()
+            conn.close()
+            assert search("orbits")["notes"][0]["id"] == 1
+        finally:
+            db.close_connection()
+
+
+class TestMain:
+    """Tests for the search command"""
+
+    def test_main_prints_ranked_results(self, search_env, temp_dir, capsys):
+        """Test that dr search prints page locators and snippets"""
+        from fetcher.cli import save_sources
+        from search import cli as search_cli
+
+        write_pdf_cache(temp_dir / "pdf")
+        save_sources([make_source("pdf_a", "pdf", "/a.pdf", "The Waste Land", "Eliot", 2,
+                                  str(temp_dir / "pdf"), "sha256:a")])
+
+        with patch('sys.argv', ['cli.py', 'cruellest', 'month']):
+            search_cli.main()
+
+        captured = capsys.readouterr()
+        assert "[pdf_a] The Waste Land p. 1" in captured.out
+        assert "[cruellest] [month]" in captured.out
@@ -0,0 +1,135 @@
+"""Tests for fetcher/sync.py"""
+import json
+import os
+import pytest
+from pathlib import Path
+from unittest.mock import MagicMock
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+
+@pytest.fixture
+def sync(monkeypatch, temp_dir):
+    """fetcher.sync against a temp cache and database"""
+    mock_config = MagicMock()
+    mock_config.CACHE_DIR = temp_dir / "cache"
+    mock_config.DB_PATH = temp_dir / "db" / "test.db"
+    monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+    for mod in list(sys.modules.keys()):
+        if mod.startswith('fetcher') or mod in ['db', 'models', 'repository']:
+            del sys.modules[mod]
+
+    from db import init_db
+    init_db()
+    import fetcher.sync
+    return sys.modules['fetcher.sync']
+
+
+def cache_youtube(temp_dir, video_id, upload_date):
+    """Write a complete YouTube cache entry"""
+    cache_dir = temp_dir / "cache" / "youtube" / video_id
+    cache_dir.mkdir(parents=True)
+    (cache_dir / "metadata.json").write_text(json.dumps({"id": video_id, "upload_date": upload_date}))
+    (cache_dir / "transcript.txt").write_text("hello")
+    (cache_dir / "audio.webm").write_bytes(b"audio")
+    return cache_dir
+
+
+def save_row(source_id, source_type, url, fingerprint, state="ready"):
+    from fetcher.cli import save_sources
+    from models import Source, SourceType, ProcessingState
+    save_sources([Source(
+        id=source_id, type=SourceType(source_type), url=url, title="T", author="A",
+        duration=1, cache_path="/cache", processing_state=ProcessingState(state),
+        fingerprint=fingerprint,
+    )])
+
+
+class TestPlanSync:
+    """Tests for plan_sync function"""
+
+    def test_unchanged_youtube_is_skipped(self, sync, temp_dir):
+        """Test that a fully cached video with a matching fingerprint is skipped"""
+        cache_youtube(temp_dir, "abc", "20260101")
+        save_row("youtube_abc", "youtube", "https://youtu.be/abc", "abc:20260101")
+
+        to_fetch, unchanged, refresh = sync.plan_sync(["https://youtu.be/abc"], "path")
+
+        assert to_fetch == []
+        assert unchanged == ["https://youtu.be/abc"]
+
+    def test_missing_outputs_are_fetched(self, sync, temp_dir):
+        """Test that a video with a missing transcript is fetched again"""
+        cache_dir = cache_youtube(temp_dir, "abc", "20260101")
+        (cache_dir / "transcript.txt").unlink()
+        save_row("youtube_abc", "youtube", "https://youtu.be/abc", "abc:20260101")
+
+        to_fetch, unchanged, refresh = sync.plan_sync(["https://youtu.be/abc"], "path")
+
+        assert to_fetch == ["https://youtu.be/abc"]
+        assert refresh == set()
+
+    def test_modified_pdf_is_refreshed(self, sync, temp_dir):
+        """Test that a PDF edited in place is fetched with its cache dropped"""
+        from fetcher.pdf import generate_pdf_id, pdf_fingerprint
+
+        pdf_path = temp_dir / "book.pdf"
+        pdf_path.write_bytes(b"%PDF first edition")
+        pdf_id = generate_pdf_id(pdf_path)
+        cache_dir = temp_dir / "cache" / "pdf" / pdf_id
+        cache_dir.mkdir(parents=True)
+        (cache_dir / "content.txt").write_text("old text")
+        save_row(f"pdf_{pdf_id}", "pdf", str(pdf_path), pdf_fingerprint(pdf_path))
+
+        to_fetch, unchanged, _ = sync.plan_sync([str(pdf_path)], "path")
+        assert unchanged == [str(pdf_path)]
+
+        pdf_path.write_bytes(b"%PDF second edition, revised")
+        stat = pdf_path.stat()
+        os.utime(pdf_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        to_fetch, unchanged, refresh = sync.plan_sync([str(pdf_path)], "path")
+        assert to_fetch == [str(pdf_path)]
+        assert refresh == {str(pdf_path)}
+
+    def test_new_sources_are_fetched(self, sync, temp_dir):
+        """Test that sources never fetched before are fetched"""
+        to_fetch, unchanged, refresh = sync.plan_sync(
+            ["https://youtu.be/new", "https://example.com/article"], "path"
+        )
+
+        assert to_fetch == ["https://youtu.be/new", "https://example.com/article"]
+        assert unchanged == [] and refresh == set()
+
+
+class TestSaveSources:
+    """Tests for the fingerprint-aware sources upsert"""
+
+    def test_unchanged_row_keeps_state_and_created_at(self, sync):
+        """Test that saving an unchanged source leaves its row untouched"""
+        from db import get_connection
+
+        save_row("youtube_abc", "youtube", "https://youtu.be/abc", "abc:1")
+        conn = get_connection()
+        conn.execute("""
+            UPDATE sources SET processing_state = 'reviewed', created_at = '2026-01-01 00:00:00'
+        """)
+        conn.commit()
+        conn.close()
+
+        save_row("youtube_abc", "youtube", "https://youtu.be/abc", "abc:1")
+        conn = get_connection()
+        row = conn.execute("SELECT * FROM sources WHERE id = 'youtube_abc'").fetchone()
+        conn.close()
+        assert row["processing_state"] == "reviewed"
+        assert row["created_at"] == "2026-01-01 00:00:00"
+
+        save_row("youtube_abc", "youtube", "https://youtu.be/abc", "abc:2")
+        conn = get_connection()
+        row = conn.execute("SELECT * FROM sources WHERE id = 'youtube_abc'").fetchone()
+        conn.close()
+        assert row["processing_state"] == "ready"
+        assert row["fingerprint"] == "abc:2"
+        assert row["created_at"] == "2026-01-01 00:00:00"
@@ -0,0 +1,86 @@
+"""Tests for transcript_index.py"""
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from transcript_index import TranscriptIndex, load_transcript_index
+
+
+@pytest.fixture
+def transcript(temp_dir):
+    """A transcript and matching cue file with non-ASCII text"""
+    cues = [
+        (0.0, 2.0, "Hello world"),
+        (2.0, 4.0, "这是测试"),
+        (6.0, 8.0, "Third line"),
+        (1834.0, 1838.5, "Late remark"),
+    ]
+    (temp_dir / "transcript.txt").write_text("\n".join(t for _, _, t in cues), encoding="utf-8")
+    (temp_dir / "transcript.cues").write_text(
+        "".join(f"{s:.3f}\t{e:.3f}\t{t}\n" for s, e, t in cues), encoding="utf-8"
+    )
+    return temp_dir
+
+
+class TestTranscriptIndex:
+    """Tests for TranscriptIndex"""
+
+    def test_text_at(self, transcript):
+        """Test lookup of the line spoken at a timestamp"""
+        index = TranscriptIndex.build(
+            transcript / "transcript.cues", transcript / "transcript.txt", transcript / "transcript.idx"
+        )
+
+        assert len(index) == 4
+        assert index.text_at(0.0) == "Hello world"
+        assert index.text_at(3.9) == "这是测试"
+        assert index.text_at(5.0) == "这是测试"
+        assert index.text_at(1834) == "Late remark"
+        assert index.text_at(-1) == ""
+
+    def test_text_between(self, transcript):
+        """Test lookup of text between chapter bounds"""
+        index = TranscriptIndex.build(
+            transcript / "transcript.cues", transcript / "transcript.txt", transcript / "transcript.idx"
+        )
+
+        assert index.text_between(0, 6) == "Hello world\n这是测试"
+        assert index.text_between(3, 7) == "这是测试\nThird line"
+        assert index.text_between(5, 100) == "Third line"
+        assert index.text_between(100, 200) == ""
+
+    def test_load_round_trip(self, transcript):
+        """Test that a saved index loads back identically"""
+        built = TranscriptIndex.build(
+            transcript / "transcript.cues", transcript / "transcript.txt", transcript / "transcript.idx"
+        )
+        loaded = TranscriptIndex.load(transcript / "transcript.idx", transcript / "transcript.txt")
+
+        assert list(loaded.starts) == list(built.starts)
+        assert list(loaded.offsets) == list(built.offsets)
+        assert loaded.text_between(0, 2000) == (transcript / "transcript.txt").read_text(encoding="utf-8")
+
+    def test_load_rejects_other_files(self, temp_dir):
+        """Test that a non-index file is rejected"""
+        bad = temp_dir / "bad.idx"
+        bad.write_bytes(b"\x00" * 32)
+
+        with pytest.raises(ValueError, match="Not a transcript index"):
+            TranscriptIndex.load(bad, temp_dir / "transcript.txt")
+
+
+class TestLoadTranscriptIndex:
+    """Tests for load_transcript_index function"""
+
+    def test_builds_when_missing(self, transcript):
+        """Test that the index is built from the cue file on first use"""
+        index = load_transcript_index(transcript)
+
+        assert (transcript / "transcript.idx").exists()
+        assert index.text_at(7) == "Third line"
+
+    def test_returns_none_without_cues(self, temp_dir):
+        """Test that sources without cue data return None"""
+        assert load_transcript_index(temp_dir) is None
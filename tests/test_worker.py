@@ -0,0 +1,148 @@
+"""Tests for fetcher/worker.py"""
+import pytest
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+
+@pytest.fixture
+def worker(monkeypatch, temp_dir):
+    """Import fetcher.worker against a temporary database"""
+    mock_config = MagicMock()
+    mock_config.CACHE_DIR = temp_dir / "cache"
+    mock_config.DB_PATH = temp_dir / "db" / "test.db"
+    (temp_dir / "db").mkdir(parents=True, exist_ok=True)
+    monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+    for mod in list(sys.modules.keys()):
+        if mod.startswith('fetcher') or mod in ['db', 'models', 'repository']:
+            del sys.modules[mod]
+
+    from fetcher import worker
+    return worker
+
+
+def fake_result(video_id, temp_dir):
+    return {
+        "id": f"youtube_{video_id}",
+        "metadata": {"title": f"Video {video_id}", "author": "A", "duration": 60},
+        "cache_dir": str(temp_dir / "cache" / "youtube" / video_id),
+    }
+
+
+def states(worker):
+    conn = worker.get_connection()
+    rows = conn.execute("SELECT id, processing_state FROM sources ORDER BY id").fetchall()
+    conn.close()
+    return {r["id"]: r["processing_state"] for r in rows}
+
+
+class TestEnqueue:
+    """Tests for enqueue function"""
+
+    def test_enqueue_creates_pending_rows(self, worker):
+        """Test that enqueue inserts PENDING rows with computed IDs"""
+        ids, failures = worker.enqueue([
+            "https://www.youtube.com/watch?v=a1",
+            "https://youtu.be/b2",
+        ])
+
+        assert ids == ["youtube_a1", "youtube_b2"]
+        assert failures == []
+        assert states(worker) == {"youtube_a1": "pending", "youtube_b2": "pending"}
+
+    def test_enqueue_keeps_ready_and_requeues_errors(self, worker):
+        """Test that re-enqueueing leaves ready rows alone but retries errors"""
+        worker.enqueue(["https://youtu.be/a1", "https://youtu.be/b2"])
+        conn = worker.get_connection()
+        worker.set_state(conn, "youtube_a1", "ready")
+        worker.set_state(conn, "youtube_b2", "error")
+        conn.close()
+
+        worker.enqueue(["https://youtu.be/a1", "https://youtu.be/b2"])
+
+        assert states(worker) == {"youtube_a1": "ready", "youtube_b2": "pending"}
+
+    def test_enqueue_reports_unsupported_and_queues_the_rest(self, worker):
+        """Test that an unsupported line is reported without stopping the others"""
+        ids, failures = worker.enqueue(["https://youtu.be/abc", "https://example.com/article"])
+
+        assert ids == ["youtube_abc"]
+        assert failures[0][0] == "https://example.com/article"
+        assert "not yet implemented" in str(failures[0][1])
+        assert states(worker) == {"youtube_abc": "pending"}
+
+
+class TestQueueStateMachine:
+    """Tests for claim_next and recover_stale_jobs"""
+
+    def test_claim_next_moves_to_downloading(self, worker):
+        """Test that claiming returns the job and marks it DOWNLOADING"""
+        worker.enqueue(["https://youtu.be/a1"])
+
+        conn = worker.get_connection()
+        job = worker.claim_next(conn)
+        second = worker.claim_next(conn)
+        conn.close()
+
+        assert job.id == "youtube_a1"
+        assert job.url == "https://youtu.be/a1"
+        assert second is None
+        assert states(worker) == {"youtube_a1": "downloading"}
+
+    def test_recover_stale_jobs(self, worker):
+        """Test that interrupted jobs go back to PENDING"""
+        worker.enqueue(["https://youtu.be/a1", "https://youtu.be/b2"])
+        conn = worker.get_connection()
+        worker.claim_next(conn)
+        worker.set_state(conn, "youtube_b2", "processing")
+
+        assert worker.recover_stale_jobs(conn) == 2
+        conn.close()
+
+        assert set(states(worker).values()) == {"pending"}
+
+
+class TestWork:
+    """Tests for work function"""
+
+    def test_work_drains_queue(self, worker, temp_dir, capsys):
+        """Test that workers fetch every job and record success and failure"""
+        worker.enqueue(["https://youtu.be/a1", "https://youtu.be/b2", "https://youtu.be/bad"])
+
+        def fake_fetch_youtube(url, **kwargs):
+            video_id = url.rsplit("/", 1)[1]
+            if video_id == "bad":
+                raise Exception("unavailable")
+            return fake_result(video_id, temp_dir)
+
+        with patch.object(worker, "fetch_youtube", side_effect=fake_fetch_youtube):
+            stats = worker.work(workers=2, once=True, process=False)
+
+        assert stats == {"ready": 2, "error": 1}
+        assert states(worker) == {
+            "youtube_a1": "ready",
+            "youtube_b2": "ready",
+            "youtube_bad": "error",
+        }
+
+        conn = worker.get_connection()
+        row = conn.execute("SELECT title, duration FROM sources WHERE id = 'youtube_a1'").fetchone()
+        conn.close()
+        assert row["title"] == "Video a1"
+        assert row["duration"] == 60
+
+    def test_work_recovers_crashed_jobs(self, worker, temp_dir, capsys):
+        """Test that a DOWNLOADING row from a crash is fetched on restart"""
+        worker.enqueue(["https://youtu.be/a1"])
+        conn = worker.get_connection()
+        worker.claim_next(conn)
+        conn.close()
+
+        with patch.object(worker, "fetch_youtube", return_value=fake_result("a1", temp_dir)):
+            worker.work(workers=1, once=True, process=False)
+
+        assert states(worker) == {"youtube_a1": "ready"}
+        assert "Recovered 1 interrupted jobs" in capsys.readouterr().out
@@ -233,8 +233,8 @@ class TestFetchAudio:
 
         assert result.exists()
 
-    def test_fetch_audio_rename_different_extension(self, monkeypatch, temp_dir):
-        """Test audio file rename when yt-dlp uses different extension"""
+    def test_fetch_audio_keeps_native_container(self, monkeypatch, temp_dir):
+        """Test that the native container is kept rather than renamed to mp3"""
         mock_config = MagicMock()
         mock_config.CACHE_DIR = temp_dir / "cache"
         monkeypatch.setitem(sys.modules, 'config', mock_config)
@@ -256,7 +256,7 @@ class TestFetchAudio:
         with patch('subprocess.run', side_effect=create_audio_with_different_ext):
             result = fetch_audio("https://youtube.com/watch?v=test", "test123")
 
-        assert result == cache_dir / "audio.mp3"
+        assert result == cache_dir / "audio.m4a"
         assert result.exists()
 
     def test_fetch_audio_failure(self, monkeypatch, temp_dir):
@@ -278,6 +278,98 @@ class TestFetchAudio:
                 fetch_audio("https://youtube.com/watch?v=test", "test123")
 
 
+    def test_fetch_audio_native_policy_skips_transcode(self, monkeypatch, temp_dir):
+        """Test that the default policy downloads the native stream without -x"""
+        mock_config = MagicMock()
+        mock_config.CACHE_DIR = temp_dir / "cache"
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        if 'fetcher.youtube' in sys.modules:
+            del sys.modules['fetcher.youtube']
+        from fetcher.youtube import fetch_audio, get_cache_dir
+
+        cache_dir = get_cache_dir("test123")
+
+        def create_opus_file(*args, **kwargs):
+            (cache_dir / "audio.opus").write_text("audio content")
+            return MagicMock(returncode=0)
+
+        with patch('subprocess.run', side_effect=create_opus_file) as run_mock:
+            result = fetch_audio("https://youtube.com/watch?v=test", "test123")
+
+        cmd = run_mock.call_args[0][0]
+        assert "-x" not in cmd
+        assert "--audio-format" not in cmd
+        assert str(cache_dir / "audio.%(ext)s") in cmd
+        assert result == cache_dir / "audio.opus"
+
+    def test_fetch_audio_speech_policy(self, monkeypatch, temp_dir):
+        """Test that the speech policy requests low-bitrate opus"""
+        mock_config = MagicMock()
+        mock_config.CACHE_DIR = temp_dir / "cache"
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        if 'fetcher.youtube' in sys.modules:
+            del sys.modules['fetcher.youtube']
+        from fetcher.youtube import fetch_audio, get_cache_dir
+
+        cache_dir = get_cache_dir("test123")
+
+        def create_opus_file(*args, **kwargs):
+            (cache_dir / "audio.opus").write_text("audio content")
+            return MagicMock(returncode=0)
+
+        with patch('subprocess.run', side_effect=create_opus_file) as run_mock:
+            fetch_audio("https://youtube.com/watch?v=test", "test123", policy="speech")
+
+        cmd = run_mock.call_args[0][0]
+        assert cmd[cmd.index("--audio-format") + 1] == "opus"
+        assert cmd[cmd.index("--audio-quality") + 1] == "48K"
+
+    def test_fetch_audio_unknown_policy(self, monkeypatch, temp_dir):
+        """Test that an unknown policy raises ValueError"""
+        mock_config = MagicMock()
+        mock_config.CACHE_DIR = temp_dir / "cache"
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        if 'fetcher.youtube' in sys.modules:
+            del sys.modules['fetcher.youtube']
+        from fetcher.youtube import fetch_audio
+
+        with pytest.raises(ValueError, match="Unknown audio policy"):
+            fetch_audio("https://youtube.com/watch?v=test", "test123", policy="flac")
+
+    def test_fetch_audio_no_file_written(self, monkeypatch, temp_dir):
+        """Test that a successful run without an audio file raises"""
+        mock_config = MagicMock()
+        mock_config.CACHE_DIR = temp_dir / "cache"
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        if 'fetcher.youtube' in sys.modules:
+            del sys.modules['fetcher.youtube']
+        from fetcher.youtube import fetch_audio
+
+        with patch('subprocess.run', return_value=MagicMock(returncode=0)):
+            with pytest.raises(Exception, match="no audio file written"):
+                fetch_audio("https://youtube.com/watch?v=test", "test123")
+
+    def test_find_audio(self, monkeypatch, temp_dir):
+        """Test that find_audio finds any known container and ignores partials"""
+        mock_config = MagicMock()
+        mock_config.CACHE_DIR = temp_dir / "cache"
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        if 'fetcher.youtube' in sys.modules:
+            del sys.modules['fetcher.youtube']
+        from fetcher.youtube import find_audio
+
+        assert find_audio(temp_dir) is None
+        (temp_dir / "audio.m4a.part").write_text("partial")
+        assert find_audio(temp_dir) is None
+        (temp_dir / "audio.m4a").write_text("audio")
+        assert find_audio(temp_dir) == temp_dir / "audio.m4a"
+
+
 class TestFetchTranscript:
     """Tests for fetch_transcript function"""
 
@@ -325,6 +417,8 @@ class TestFetchTranscript:
 
         assert vtt_path.exists()
         assert txt_path.exists()
+        assert (cache_dir / "transcript.cues").exists()
+        assert (cache_dir / "transcript.idx").exists()
 
     def test_fetch_transcript_fallback_to_manual_subs(self, monkeypatch, temp_dir, sample_vtt_content):
         """Test fallback to manual subtitles when auto-subs not available"""
@@ -373,6 +467,149 @@ class TestFetchTranscript:
                 fetch_transcript("https://youtube.com/watch?v=test", "test123")
 
 
+class TestInfoJsonPipeline:
+    """Tests for the single-pass info-JSON pipeline"""
+
+    def test_fetch_info_saves_and_reuses_info_json(self, monkeypatch, temp_dir):
+        """Test that the page is resolved once and info.json is reused"""
+        mock_config = MagicMock()
+        mock_config.CACHE_DIR = temp_dir / "cache"
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        if 'fetcher.youtube' in sys.modules:
+            del sys.modules['fetcher.youtube']
+        from fetcher.youtube import fetch_info
+
+        mock_result = MagicMock()
+        mock_result.returncode = 0
+        mock_result.stdout = json.dumps({"title": "Test Video"})
+
+        with patch('subprocess.run', return_value=mock_result) as run_mock:
+            info_path = fetch_info("https://youtube.com/watch?v=test", "test123")
+            fetch_info("https://youtube.com/watch?v=test", "test123")
+
+        assert run_mock.call_count == 1
+        assert json.loads(info_path.read_text())["title"] == "Test Video"
+
+    def test_fetch_metadata_from_info_json(self, monkeypatch, temp_dir):
+        """Test that metadata is read from info.json without running yt-dlp"""
+        mock_config = MagicMock()
+        mock_config.CACHE_DIR = temp_dir / "cache"
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        if 'fetcher.youtube' in sys.modules:
+            del sys.modules['fetcher.youtube']
+        from fetcher.youtube import fetch_metadata
+
+        info_path = temp_dir / "info.json"
+        info_path.write_text(json.dumps({"title": "Test Video", "channel": "Test Channel", "duration": 300}))
+
+        with patch('subprocess.run') as run_mock:
+            metadata = fetch_metadata("https://youtube.com/watch?v=test", "test123", info_path)
+
+        run_mock.assert_not_called()
+        assert metadata["title"] == "Test Video"
+        assert metadata["author"] == "Test Channel"
+
+    def test_pick_subtitle_flag(self, monkeypatch, temp_dir):
+        """Test subtitle flag selection from caption track keys"""
+        mock_config = MagicMock()
+        mock_config.CACHE_DIR = temp_dir / "cache"
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        if 'fetcher.youtube' in sys.modules:
+            del sys.modules['fetcher.youtube']
+        from fetcher.youtube import pick_subtitle_flag
+
+        assert pick_subtitle_flag({"automatic_captions": {"en": []}, "subtitles": {"en": []}}) == "--write-auto-sub"
+        assert pick_subtitle_flag({"automatic_captions": {"de": []}, "subtitles": {"en": []}}) == "--write-subs"
+        assert pick_subtitle_flag({"automatic_captions": None, "subtitles": {}}) is None
+
+    def test_fetch_transcript_from_info_json_single_run(self, monkeypatch, temp_dir, sample_vtt_content):
+        """Test that subtitles are downloaded in one run driven by info.json"""
+        mock_config = MagicMock()
+        mock_config.CACHE_DIR = temp_dir / "cache"
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        if 'fetcher.youtube' in sys.modules:
+            del sys.modules['fetcher.youtube']
+        from fetcher.youtube import fetch_transcript, get_cache_dir
+
+        cache_dir = get_cache_dir("test123")
+        info_path = cache_dir / "info.json"
+        info_path.write_text(json.dumps({"subtitles": {"en": [{"ext": "vtt"}]}}))
+
+        def create_vtt_file(*args, **kwargs):
+            (cache_dir / "transcript.en.vtt").write_text(sample_vtt_content)
+            return MagicMock(returncode=0)
+
+        with patch('subprocess.run', side_effect=create_vtt_file) as run_mock:
+            vtt_path, txt_path = fetch_transcript("https://youtube.com/watch?v=test", "test123", info_path)
+
+        assert run_mock.call_count == 1
+        cmd = run_mock.call_args[0][0]
+        assert "--write-subs" in cmd
+        assert "--load-info-json" in cmd
+        assert "https://youtube.com/watch?v=test" not in cmd
+        assert txt_path.exists()
+
+    def test_fetch_transcript_from_info_json_no_tracks(self, monkeypatch, temp_dir):
+        """Test that missing caption tracks fail without running yt-dlp"""
+        mock_config = MagicMock()
+        mock_config.CACHE_DIR = temp_dir / "cache"
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        if 'fetcher.youtube' in sys.modules:
+            del sys.modules['fetcher.youtube']
+        from fetcher.youtube import fetch_transcript
+
+        info_path = temp_dir / "info.json"
+        info_path.write_text(json.dumps({"title": "No captions"}))
+
+        with patch('subprocess.run') as run_mock:
+            with pytest.raises(Exception, match="No subtitles available"):
+                fetch_transcript("https://youtube.com/watch?v=test", "test123", info_path)
+
+        run_mock.assert_not_called()
+
+    def test_fetch_youtube_single_pass(self, monkeypatch, temp_dir, sample_vtt_content):
+        """Test that single-pass fetch resolves the page only once"""
+        mock_config = MagicMock()
+        mock_config.CACHE_DIR = temp_dir / "cache"
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        if 'fetcher.youtube' in sys.modules:
+            del sys.modules['fetcher.youtube']
+        from fetcher.youtube import fetch_youtube, get_cache_dir
+
+        cache_dir = get_cache_dir("dQw4w9WgXcQ")
+        url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+        def mock_subprocess(cmd, *args, **kwargs):
+            result = MagicMock()
+            result.returncode = 0
+            result.stdout = json.dumps({
+                "title": "Test Video",
+                "channel": "Test Channel",
+                "duration": 300,
+                "automatic_captions": {"en": []},
+            })
+            if "bestaudio/best" in cmd:
+                (cache_dir / "audio.opus").write_text("audio")
+            elif "--skip-download" in cmd:
+                (cache_dir / "transcript.en.vtt").write_text(sample_vtt_content)
+            return result
+
+        with patch('subprocess.run', side_effect=mock_subprocess) as run_mock:
+            result = fetch_youtube(url, single_pass=True)
+
+        commands = [c[0][0] for c in run_mock.call_args_list]
+        assert len(commands) == 3
+        assert sum(url in cmd for cmd in commands) == 1
+        assert result["metadata"]["title"] == "Test Video"
+        assert "info" in result["timings"]
+
+
 class TestCleanTranscript:
     """Tests for clean_transcript function"""
 
@@ -459,6 +696,125 @@ class TestCleanTranscript:
         assert "Formatted text here" in content
 
 
+class TestStreamingVttParser:
+    """Tests for iter_vtt_cues and the cue file"""
+
+    def test_iter_vtt_cues_keeps_timings(self, monkeypatch, temp_dir, sample_vtt_content):
+        """Test that each kept line carries its cue start and end"""
+        mock_config = MagicMock()
+        mock_config.CACHE_DIR = temp_dir / "cache"
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        if 'fetcher.youtube' in sys.modules:
+            del sys.modules['fetcher.youtube']
+        from fetcher.youtube import iter_vtt_cues
+
+        vtt_path = temp_dir / "test.vtt"
+        vtt_path.write_text(sample_vtt_content)
+
+        assert list(iter_vtt_cues(vtt_path)) == [
+            (0.0, 2.0, "Hello world"),
+            (2.0, 4.0, "This is a test"),
+            (6.0, 8.0, "Formatted text here"),
+        ]
+
+    def test_iter_vtt_cues_skips_notes_identifiers_and_parses_hours(self, monkeypatch, temp_dir):
+        """Test NOTE blocks and cue identifiers are skipped, long timestamps parsed"""
+        mock_config = MagicMock()
+        mock_config.CACHE_DIR = temp_dir / "cache"
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        if 'fetcher.youtube' in sys.modules:
+            del sys.modules['fetcher.youtube']
+        from fetcher.youtube import iter_vtt_cues
+
+        vtt_path = temp_dir / "test.vtt"
+        vtt_path.write_text(
+            "WEBVTT\n\nNOTE this is a comment\nstill a comment\n\n"
+            "cue-1\n01:30:34.500 --> 01:30:36.000\nLate line\n\n"
+            "05:00.000 --> 05:01.000\nShort stamp\n"
+        )
+
+        assert list(iter_vtt_cues(vtt_path)) == [
+            (5434.5, 5436.0, "Late line"),
+            (300.0, 301.0, "Short stamp"),
+        ]
+
+    def test_rolling_caption_dedupe_is_windowed(self, monkeypatch, temp_dir):
+        """Test that only repeats within the window are dropped"""
+        mock_config = MagicMock()
+        mock_config.CACHE_DIR = temp_dir / "cache"
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        if 'fetcher.youtube' in sys.modules:
+            del sys.modules['fetcher.youtube']
+        from fetcher.youtube import iter_vtt_cues
+
+        vtt_path = temp_dir / "test.vtt"
+        vtt_path.write_text(
+            "WEBVTT\n\n"
+            "00:00:00.000 --> 00:00:01.000\nchorus\n\n"
+            "00:00:01.000 --> 00:00:02.000\nchorus\nverse one\n\n"
+            "00:00:02.000 --> 00:00:03.000\nverse two\n\n"
+            "00:00:03.000 --> 00:00:04.000\nchorus\n"
+        )
+
+        texts = [text for _, _, text in iter_vtt_cues(vtt_path, window=2)]
+        assert texts == ["chorus", "verse one", "verse two", "chorus"]
+
+    def test_youtube_auto_caption_layout(self, monkeypatch, temp_dir):
+        """Test that a single-space line inside a cue does not end it"""
+        mock_config = MagicMock()
+        mock_config.CACHE_DIR = temp_dir / "cache"
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        if 'fetcher.youtube' in sys.modules:
+            del sys.modules['fetcher.youtube']
+        from fetcher.youtube import iter_vtt_cues
+
+        vtt_path = temp_dir / "test.vtt"
+        vtt_path.write_text(
+            "WEBVTT\nKind: captions\nLanguage: en\n\n"
+            "00:00:00.080 --> 00:00:02.389 align:start position:0%\n"
+            " \n"
+            "thank<00:00:00.320><c> you</c><00:00:00.560><c> for</c>\n\n"
+            "00:00:02.389 --> 00:00:02.399 align:start position:0%\n"
+            "thank you for\n"
+            " \n\n"
+            "00:00:02.399 --> 00:00:04.000 align:start position:0%\n"
+            "thank you for\n"
+            "watching<00:00:02.800><c> everyone</c>\n"
+        )
+
+        assert list(iter_vtt_cues(vtt_path)) == [
+            (0.08, 2.389, "thank you for"),
+            (2.399, 4.0, "watching everyone"),
+        ]
+
+    def test_clean_transcript_writes_cue_file(self, monkeypatch, temp_dir, sample_vtt_content):
+        """Test that the cue file lines up with transcript.txt"""
+        mock_config = MagicMock()
+        mock_config.CACHE_DIR = temp_dir / "cache"
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        if 'fetcher.youtube' in sys.modules:
+            del sys.modules['fetcher.youtube']
+        from fetcher.youtube import clean_transcript, iter_cue_file
+
+        vtt_path = temp_dir / "test.vtt"
+        txt_path = temp_dir / "test.txt"
+        cues_path = temp_dir / "test.cues"
+        vtt_path.write_text(sample_vtt_content)
+
+        count = clean_transcript(vtt_path, txt_path, cues_path)
+
+        lines = txt_path.read_text().split("\n")
+        cues = list(iter_cue_file(cues_path))
+        assert count == 3
+        assert [text for _, _, text in cues] == lines
+        assert cues[1][:2] == (2.0, 4.0)
+
+
 class TestFetchYoutube:
     """Tests for fetch_youtube main function"""
 
@@ -516,3 +872,77 @@ class TestFetchYoutube:
         assert result["type"] == "youtube"
         assert result["video_id"] == "dQw4w9WgXcQ"
         assert result["metadata"]["title"] == "Test Video"
+
+    def test_fetch_youtube_concurrent(self, monkeypatch, temp_dir, sample_vtt_content):
+        """Test concurrent fetch returns all stages with timings"""
+        mock_config = MagicMock()
+        mock_config.CACHE_DIR = temp_dir / "cache"
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        if 'fetcher.youtube' in sys.modules:
+            del sys.modules['fetcher.youtube']
+        from fetcher.youtube import fetch_youtube, get_cache_dir
+
+        cache_dir = get_cache_dir("dQw4w9WgXcQ")
+
+        def mock_subprocess(cmd, *args, **kwargs):
+            result = MagicMock()
+            result.returncode = 0
+            result.stdout = json.dumps({"title": "Test Video", "channel": "Test Channel", "duration": 300})
+            if "bestaudio/best" in cmd:
+                (cache_dir / "audio.opus").write_text("audio")
+            elif "--skip-download" in cmd:
+                (cache_dir / "transcript.en.vtt").write_text(sample_vtt_content)
+            return result
+
+        with patch('subprocess.run', side_effect=mock_subprocess):
+            result = fetch_youtube("https://www.youtube.com/watch?v=dQw4w9WgXcQ", concurrent=True)
+
+        assert result["metadata"]["title"] == "Test Video"
+        assert Path(result["audio_path"]).exists()
+        assert Path(result["txt_path"]).exists()
+        assert set(result["timings"]) == {"metadata", "audio", "transcript"}
+
+    def test_fetch_youtube_concurrent_reports_each_failure(self, monkeypatch, temp_dir):
+        """Test concurrent fetch runs every stage and reports all failures"""
+        mock_config = MagicMock()
+        mock_config.CACHE_DIR = temp_dir / "cache"
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        if 'fetcher.youtube' in sys.modules:
+            del sys.modules['fetcher.youtube']
+        from fetcher.youtube import fetch_youtube
+
+        mock_result = MagicMock()
+        mock_result.returncode = 1
+        mock_result.stderr = "network down"
+
+        with patch('subprocess.run', return_value=mock_result) as run_mock:
+            with pytest.raises(Exception) as exc_info:
+                fetch_youtube("https://www.youtube.com/watch?v=dQw4w9WgXcQ", concurrent=True)
+
+        message = str(exc_info.value)
+        assert "metadata:" in message
+        assert "audio:" in message
+        assert "transcript:" in message
+        assert run_mock.call_count >= 3
+
+    def test_fetch_youtube_serial_stops_at_first_failure(self, monkeypatch, temp_dir):
+        """Test serial fetch does not start later stages after a failure"""
+        mock_config = MagicMock()
+        mock_config.CACHE_DIR = temp_dir / "cache"
+        monkeypatch.setitem(sys.modules, 'config', mock_config)
+
+        if 'fetcher.youtube' in sys.modules:
+            del sys.modules['fetcher.youtube']
+        from fetcher.youtube import fetch_youtube
+
+        mock_result = MagicMock()
+        mock_result.returncode = 1
+        mock_result.stderr = "network down"
+
+        with patch('subprocess.run', return_value=mock_result) as run_mock:
+            with pytest.raises(Exception, match="metadata: Failed to fetch metadata"):
+                fetch_youtube("https://www.youtube.com/watch?v=dQw4w9WgXcQ")
+
+        assert run_mock.call_count == 1